@@ -0,0 +1,194 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment
+)
+from django.utils import timezone
+
+from core.utils.benchmark import APIBenchmark, compare_results
+from core.utils.benchmark_data import BenchmarkDataGenerator
+from programs.models import Program
+
+from tabulate import tabulate
+
+
+class Command(BaseCommand):
+    help = """
+Benchmarks every API endpoint against a generated dataset.
+A test database is created and filled with synthetic data
+from the given seed and scale, so runs with the same options
+are comparable. Results can be written to a JSON file and
+compared against the results of a previous run.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            dest='seed',
+            help='The seed the dataset is generated from.',
+            default=0,
+            required=False
+        )
+
+        parser.add_argument(
+            '--scale',
+            type=float,
+            dest='scale',
+            help='The size of the dataset, relative to production.',
+            default=1.0,
+            required=False
+        )
+
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            dest='iterations',
+            help='The number of times each request is repeated after the first.',
+            default=5,
+            required=False
+        )
+
+        parser.add_argument(
+            '--url-names',
+            type=str,
+            dest='url_names',
+            help='A comma separated list of the URL names to benchmark. Defaults to every API URL.',
+            default=None,
+            required=False
+        )
+
+        parser.add_argument(
+            '--output',
+            type=str,
+            dest='output',
+            help='The file to write the results to, as JSON.',
+            default=None,
+            required=False
+        )
+
+        parser.add_argument(
+            '--compare',
+            type=str,
+            dest='compare',
+            help='The results file of a previous run to compare against.',
+            default=None,
+            required=False
+        )
+
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            dest='threshold',
+            help='The percentage latency can grow by before it is reported as a regression.',
+            default=20.0,
+            required=False
+        )
+
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            dest='keepdb',
+            help='Keeps the test database, and its dataset, between runs.',
+            default=False,
+            required=False
+        )
+
+    def handle(self, *args, **options):
+        self.seed = options['seed']
+        self.scale = options['scale']
+        self.iterations = options['iterations']
+        self.url_names = options['url_names'].split(',') if options['url_names'] else None
+        self.output = options['output']
+        self.compare = options['compare']
+        self.threshold = options['threshold']
+        self.keepdb = options['keepdb']
+        self.created = {}
+        self.regressions = []
+
+        previous = None
+        if self.compare:
+            with open(self.compare) as f:
+                previous = json.load(f)
+
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            options['verbosity'],
+            interactive=False,
+            keepdb=self.keepdb,
+            aliases={'default'}
+        )
+
+        try:
+            if not Program.objects.exists():
+                self.created = BenchmarkDataGenerator(seed=self.seed, scale=self.scale).generate()
+
+            self.results = APIBenchmark(iterations=self.iterations, url_names=self.url_names).run()
+        finally:
+            teardown_databases(old_config, verbosity=options['verbosity'], keepdb=self.keepdb)
+            teardown_test_environment()
+
+        self.results.update({
+            'created': timezone.now().isoformat(),
+            'seed': self.seed,
+            'scale': self.scale,
+            'iterations': self.iterations,
+            'database': connection.vendor
+        })
+
+        if self.output:
+            with open(self.output, 'w') as f:
+                json.dump(self.results, f, indent=2)
+
+        if previous:
+            self.regressions = compare_results(previous, self.results, threshold=self.threshold)
+
+        self.print_stats()
+
+        if self.regressions:
+            raise CommandError(f"{len(self.regressions)} requests regressed compared to {self.compare}.")
+
+    def print_stats(self):
+        if self.created:
+            self.stdout.write(tabulate(sorted(self.created.items()), headers=['Model', 'Created'], tablefmt='grid'), ending='\n\n')
+
+        results = [
+            (
+                x['url_name'],
+                x['label'],
+                x['status'],
+                x['queries'],
+                f"{x['cold_ms']:.1f}",
+                f"{x['median_ms']:.1f}" if x['median_ms'] is not None else '',
+                f"{x['p95_ms']:.1f}" if x['p95_ms'] is not None else '',
+                f"{x['requests_per_second']:.1f}" if x['requests_per_second'] is not None else ''
+            )
+            for x in self.results['results']
+        ]
+
+        self.stdout.write('''
+Complete!
+
+        ''')
+
+        self.stdout.write(
+            tabulate(
+                results,
+                headers=['URL Name', 'Request', 'Status', 'Queries', 'Cold (ms)', 'Median (ms)', 'p95 (ms)', 'Requests/s'],
+                tablefmt='grid'
+            ),
+            ending='\n\n'
+        )
+
+        for url_name, reason in self.results['skipped'].items():
+            self.stdout.write(f"Skipped {url_name}: {reason}")
+
+        for regression in self.regressions:
+            self.stdout.write(
+                self.style.ERROR(f"{regression['url_name']} ({regression['label']}): {', '.join(regression['reasons'])}")
+            )
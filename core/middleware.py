@@ -0,0 +1,79 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core.utils.request_metrics import RequestMetrics, request_metrics_store
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware(object):
+    """
+    Records the database query count and time, the time
+    spent in the view and renderer, and the total latency
+    of every request. The timings are returned in a
+    Server-Timing header, and are kept by URL name for the
+    request metrics dashboard.
+
+    When REQUEST_METRICS_SLOW_QUERY_LOG_THRESHOLD is set,
+    every query of a request taking longer than that many
+    milliseconds is logged.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = getattr(settings, 'REQUEST_METRICS_SLOW_QUERY_LOG_THRESHOLD', None)
+
+        metrics = RequestMetrics(log_queries=threshold is not None)
+        request.request_metrics = metrics
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+
+            response = self.get_response(request)
+
+        metrics.finish()
+        response['Server-Timing'] = metrics.get_server_timing()
+
+        url_name = self.get_url_name(request)
+
+        if url_name:
+            request_metrics_store.record(url_name, metrics)
+
+        if threshold is not None and metrics.total_time * 1000 >= threshold:
+            self.log_queries(request, url_name, metrics)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.request_metrics.start_view()
+
+    def process_template_response(self, request, response):
+        metrics = request.request_metrics
+
+        metrics.end_view()
+        metrics.start_render()
+        response.add_post_render_callback(lambda x: metrics.end_render())
+
+        return response
+
+    def get_url_name(self, request):
+        resolver_match = getattr(request, 'resolver_match', None)
+
+        return resolver_match.view_name if resolver_match else None
+
+    def log_queries(self, request, url_name, metrics):
+        queries = '\n'.join(
+            f'{duration * 1000:.2f}ms: {sql} {params}'
+            for duration, sql, params in metrics.queries
+        )
+
+        logger.warning(
+            f'Slow request to {request.get_full_path()} ({url_name}): '
+            f'{metrics.total_time * 1000:.2f}ms, {metrics.query_count} queries\n{queries}'
+        )
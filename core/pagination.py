@@ -0,0 +1,194 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginationMixin(object):
+    """
+    Adds opt-in keyset (cursor) pagination to a
+    limit/offset pagination class.
+
+    Requests without a `cursor` param are paginated by the
+    parent class, so existing clients keep the limit/offset
+    response shape. Passing `cursor` (empty for the first
+    page) switches to keyset pagination, which orders by a
+    unique key and filters past the last seen value instead
+    of scanning with OFFSET. The total count is skipped
+    unless `with_count` is set.
+
+    The key defaults to `id`, and can be changed with the
+    `keyset_field` attribute of the pagination class or the
+    view. Prefix it with `-` for descending order.
+
+    Results are always ordered by the key, so cursors are
+    rejected for scored (searched) querysets and for any
+    other requested `ordering`.
+    """
+    keyset_field = 'id'
+    cursor_query_param = 'cursor'
+    count_query_param = 'with_count'
+    invalid_cursor_message = 'Invalid cursor'
+    unordered_cursor_message = (
+        'A cursor cannot be combined with a search or an ordering. '
+        'Use limit and offset instead.'
+    )
+
+    def is_keyset_request(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_keyset = self.is_keyset_request(request)
+
+        if not self.use_keyset:
+            return super(KeysetPaginationMixin, self).paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            self.limit = self.default_limit or self.max_limit
+
+        field = getattr(view, 'keyset_field', self.keyset_field)
+        self.descending = field.startswith('-')
+        self.field = field.lstrip('-')
+        self.model_field = queryset.model._meta.get_field(self.field)
+
+        self.check_ordering(request, queryset, field)
+
+        value, reverse = self.decode_cursor(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count = queryset.count()
+
+        # Paging backwards walks the key in the opposite
+        # direction, then flips the page back around
+        descending = self.descending != reverse
+        queryset = queryset.order_by(f"{'-' if descending else ''}{self.field}")
+
+        if value is not None:
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(**{f"{self.field}__{lookup}": value})
+
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else value is not None
+        self.has_previous = has_more if reverse else value is not None
+
+        self.first_value = self.get_key_value(results[0]) if results else None
+        self.last_value = self.get_key_value(results[-1]) if results else None
+
+        # An empty page past either end can still
+        # link back to where the client came from
+        if not results and value is not None:
+            self.first_value = self.last_value = value
+            if reverse:
+                self.has_next = True
+            else:
+                self.has_previous = True
+
+        return results
+
+    def check_ordering(self, request, queryset, field):
+        """
+        Rejects keyset requests whose results are meant to
+        be ordered by something other than the key.
+        """
+        scored = 'score' in queryset.query.annotations or 'score' in queryset.query.extra
+        ordering = request.query_params.get(api_settings.ORDERING_PARAM)
+
+        if scored or (ordering and ordering != field):
+            raise ValidationError({self.cursor_query_param: self.unordered_cursor_message})
+
+    def get_key_value(self, obj):
+        return getattr(obj, self.field)
+
+    def encode_cursor(self, value, reverse=False):
+        raw = json.dumps([value, reverse], cls=DjangoJSONEncoder)
+        token = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """
+        Returns the key value and direction stored in the
+        cursor of the request, or (None, False) for the
+        first page. Cursors that are not a [value, reverse]
+        pair, or whose value is not valid for the key
+        field, are rejected.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            raw = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+            data = json.loads(raw)
+
+            if not isinstance(data, list) or len(data) != 2:
+                raise ValueError('Cursor is not a [value, reverse] pair')
+
+            value, reverse = data
+
+            if value is None or isinstance(value, (bool, list, dict)) or not isinstance(reverse, bool):
+                raise ValueError('Cursor value or direction has the wrong type')
+
+            value = self.model_field.to_python(value)
+        except (TypeError, ValueError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return value, reverse
+
+    def get_next_link(self):
+        if not getattr(self, 'use_keyset', False):
+            return super(KeysetPaginationMixin, self).get_next_link()
+
+        if not self.has_next:
+            return None
+
+        return self.encode_cursor(self.last_value)
+
+    def get_previous_link(self):
+        if not getattr(self, 'use_keyset', False):
+            return super(KeysetPaginationMixin, self).get_previous_link()
+
+        if not self.has_previous:
+            return None
+
+        return self.encode_cursor(self.first_value, reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super(KeysetPaginationMixin, self).get_paginated_response(data)
+
+        fields = OrderedDict()
+        if self.count is not None:
+            fields['count'] = self.count
+        fields['next'] = self.get_next_link()
+        fields['previous'] = self.get_previous_link()
+        fields['results'] = data
+
+        return Response(fields)
+
+
+class KeysetPagination(KeysetPaginationMixin, LimitOffsetPagination):
+    """
+    The default limit/offset pagination with
+    opt-in keyset pagination.
+    """
+    pass
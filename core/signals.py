@@ -1,12 +1,41 @@
 from django.contrib.auth.models import User
 from core.models import ExtendedUser
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+from core.utils.autocomplete import autocomplete_index
+from images.models import ImageTag
+from programs.models import College, Department, Program
+from teledata.models import CombinedTeledata, Organization, Staff, Department as TeledataDepartment
+
 @receiver(post_save, sender=User)
 def on_user_post_save(sender, **kwargs):
     instance = kwargs.get('instance')
     created = kwargs.get('created', False)
     if created:
         ExtendedUser.objects.create(user=instance).save()
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=College)
+@receiver(post_delete, sender=College)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=CombinedTeledata)
+@receiver(post_delete, sender=CombinedTeledata)
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+@receiver(post_save, sender=TeledataDepartment)
+@receiver(post_delete, sender=TeledataDepartment)
+@receiver(post_save, sender=Staff)
+@receiver(post_delete, sender=Staff)
+@receiver(post_save, sender=ImageTag)
+@receiver(post_delete, sender=ImageTag)
+def invalidate_autocomplete_index(sender, **kwargs):
+    """
+    Invalidates the autocomplete index whenever a
+    suggested name is created, modified or deleted.
+    """
+    autocomplete_index.invalidate()
@@ -1,6 +1,246 @@
 # -*- coding: utf-8 -*-
 
 
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.utils.autocomplete import autocomplete_index
+from core.utils.benchmark import APIBenchmark, compare_results
+from core.utils.benchmark_data import BenchmarkDataGenerator
+from core.utils.phonetics import normalize_name, soundex
+from core.utils.request_metrics import request_metrics_store
+from images.models import ImageTag
+from programs.models import *
+from teledata.models import CombinedTeledata, Staff
+
+
+@override_settings(AUTOCOMPLETE_BACKGROUND_REBUILD=False)
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        level = Level.objects.create(name='Bachelors')
+        career = Career.objects.create(name='Undergraduate')
+        degree = Degree.objects.create(name='BS')
+
+        cls.biology = Program.objects.create(name='Biology', plan_code='BIO-BS', level=level, career=career, degree=degree)
+        cls.biomedical = Program.objects.create(name='Biomedical Sciences', plan_code='BMS-BS', level=level, career=career, degree=degree)
+        cls.department = Department.objects.create(full_name='Department of Biology')
+        cls.tag = ImageTag.objects.create(name='biology lab')
+
+    def setUp(self):
+        cache.clear()
+
+    def lookup(self, params):
+        response = self.client.get(reverse('api.autocomplete'), params)
+        self.assertEqual(response.status_code, 200)
+
+        return [(x['type'], x['id']) for x in response.json()['results']]
+
+    def test_suggestions_ranked(self):
+        results = self.lookup({'search': 'bio'})
+
+        # Names starting with the query first, shortest first
+        self.assertEqual(results, [
+            ('program', self.biology.pk),
+            ('image_tag', self.tag.pk),
+            ('program', self.biomedical.pk),
+            ('department', self.department.pk)
+        ])
+
+    def test_types_and_limit(self):
+        self.assertEqual(self.lookup({'search': 'bio', 'types': 'department'}), [('department', self.department.pk)])
+        self.assertEqual(len(self.lookup({'search': 'bio', 'limit': 2})), 2)
+
+    def test_lookup_does_not_query_once_built(self):
+        autocomplete_index.ensure_built()
+
+        with self.assertNumQueries(0):
+            autocomplete_index.lookup('biomed')
+
+    def test_index_rebuilt_on_change(self):
+        self.assertEqual(self.lookup({'search': 'zoo'}), [])
+
+        self.biology.name = 'Zoology'
+        self.biology.save()
+
+        self.assertEqual(self.lookup({'search': 'zoo'}), [('program', self.biology.pk)])
+
+    def test_rebuild_publishes_a_new_index(self):
+        autocomplete_index.ensure_built()
+        keys, entries, candidates = autocomplete_index._index
+
+        autocomplete_index.build()
+
+        # Lookups holding the previous index keep a consistent copy
+        self.assertIsNot(autocomplete_index._index[0], keys)
+        self.assertEqual(len(keys), len(entries))
+        self.assertEqual(autocomplete_index._index[0], keys)
+
+    def test_long_prefixes_ranked_from_candidates(self):
+        queries = [
+            ({'search': x}, {'search': x, 'types': 'department,image_tag'}, {'search': x, 'limit': 1})
+            for x in ('b', 'bi', 'bio', 'biology', 'd', 'o', 'zoo')
+        ]
+        expected = [[self.lookup(x) for x in params] for params in queries]
+
+        with mock.patch.object(autocomplete_index, 'max_scan', 1):
+            autocomplete_index.build()
+
+            self.assertIn('b', autocomplete_index._index[2])
+            self.assertEqual([[self.lookup(x) for x in params] for params in queries], expected)
+
+        autocomplete_index.build()
+
+    @override_settings(AUTOCOMPLETE_BACKGROUND_REBUILD=True)
+    def test_invalidated_index_rebuilt_in_background(self):
+        autocomplete_index.rebuild()
+
+        self.biology.name = 'Zoology'
+        self.biology.save()
+
+        with mock.patch('core.utils.autocomplete.Thread') as thread:
+            # The previous index is served until the rebuild is done
+            self.assertEqual(self.lookup({'search': 'zoo'}), [])
+            self.assertEqual(self.lookup({'search': 'zoo'}), [])
+
+        self.assertEqual(thread.call_count, 1)
+
+        with mock.patch('core.utils.autocomplete.connection'):
+            thread.call_args[1]['target'](*thread.call_args[1]['args'])
+
+        self.assertFalse(autocomplete_index.rebuilding)
+        self.assertEqual(self.lookup({'search': 'zoo'}), [('program', self.biology.pk)])
+
+
+class PhoneticsTests(TestCase):
+    def test_soundex(self):
+        # The codes MySQL's SOUNDEX() returns
+        self.assertEqual(soundex('Hello'), 'H400')
+        self.assertEqual(soundex('Robert'), 'R163')
+        self.assertEqual(soundex('Rupert'), 'R163')
+        self.assertEqual(soundex('Quadratically'), 'Q36324')
+        self.assertEqual(soundex('Tymczak'), 'T520')
+        self.assertEqual(soundex('Pfister'), 'P236')
+        self.assertEqual(soundex('Jean-Luc Picard'), 'J5421263')
+        self.assertEqual(soundex('José'), soundex('jose'))
+        self.assertEqual(soundex('407'), '')
+        self.assertIsNone(soundex(None))
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name('  José   GARCÍA '), 'jose garcia')
+        self.assertEqual(normalize_name('Straße'), 'strasse')
+        self.assertIsNone(normalize_name(None))
+
+
+@override_settings(AUTOCOMPLETE_BACKGROUND_REBUILD=False)
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='password', is_staff=True)
+        cls.user = User.objects.create_user('user', password='password')
+
+    def setUp(self):
+        cache.clear()
+        request_metrics_store.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('api.programs.list'))
+        timings = dict(x.strip().split(';')[0:2] for x in response['Server-Timing'].split(','))
+
+        self.assertEqual(set(timings.keys()), {'db', 'app', 'render', 'total'})
+        self.assertIn('queries"', response['Server-Timing'])
+
+    def test_requests_recorded_by_url_name(self):
+        for i in range(3):
+            self.client.get(reverse('api.programs.list'), {'limit': i + 1})
+
+        self.client.get(reverse('api.autocomplete'), {'search': 'bio'})
+
+        report = {x['url_name']: x for x in request_metrics_store.get_report()}
+
+        self.assertEqual(report['api.programs.list']['requests'], 3)
+        self.assertEqual(report['api.autocomplete']['requests'], 1)
+        self.assertGreater(report['api.programs.list']['queries']['p50'], 0)
+        self.assertLessEqual(
+            report['api.programs.list']['total']['p50'],
+            report['api.programs.list']['total']['max']
+        )
+
+    def test_percentiles(self):
+        ordered = list(range(1, 101))
+
+        self.assertEqual(request_metrics_store.get_percentile(ordered, 50), 50)
+        self.assertEqual(request_metrics_store.get_percentile(ordered, 95), 95)
+        self.assertEqual(request_metrics_store.get_percentile([7], 99), 7)
+
+    @override_settings(REQUEST_METRICS_SLOW_QUERY_LOG_THRESHOLD=0)
+    def test_slow_request_queries_logged(self):
+        with self.assertLogs('core.middleware', level='WARNING') as logs:
+            self.client.get(reverse('api.programs.list'))
+
+        self.assertIn('api.programs.list', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    def test_dashboard_staff_only(self):
+        url = reverse('dashboard.requests')
+        self.client.get(reverse('api.programs.list'))
+
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.login(username='user', password='password')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.login(username='staff', password='password')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('api.programs.list', [x['url_name'] for x in response.context['results']])
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.generator = BenchmarkDataGenerator(seed=1, scale=0.005)
+        cls.created = cls.generator.generate()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_dataset_generated_to_scale(self):
+        self.assertEqual(Program.objects.count(), self.generator.count('programs'))
+        self.assertEqual(Staff.objects.count(), self.generator.count('staff'))
+        self.assertEqual(
+            CombinedTeledata.objects.count(),
+            self.generator.count('staff') + self.generator.count('organizations') + self.generator.count('teledata_departments')
+        )
+        self.assertTrue(Program.objects.filter(parent_program__isnull=False).exists())
+        self.assertTrue(ProgramSearchTerm.objects.exists())
+
+    def test_benchmark_results(self):
+        results = APIBenchmark(iterations=1, url_names=['api.programs.search', 'api.programs.detail']).run()
+
+        self.assertEqual({x['url_name'] for x in results['results']}, {'api.programs.search', 'api.programs.detail'})
+
+        for result in results['results']:
+            self.assertEqual(result['status'], 200)
+            self.assertGreater(result['queries'], 0)
+            self.assertIsNotNone(result['median_ms'])
+
+    def test_compare_results(self):
+        previous = {'results': [
+            {'url_name': 'api.programs.list', 'label': 'default', 'status': 200, 'queries': 5, 'cold_ms': 10.0, 'median_ms': 2.0},
+            {'url_name': 'api.programs.detail', 'label': 'default', 'status': 200, 'queries': 5, 'cold_ms': 10.0, 'median_ms': 2.0}
+        ]}
+        current = {'results': [
+            {'url_name': 'api.programs.list', 'label': 'default', 'status': 200, 'queries': 5, 'cold_ms': 11.0, 'median_ms': 2.1},
+            {'url_name': 'api.programs.detail', 'label': 'default', 'status': 200, 'queries': 6, 'cold_ms': 10.0, 'median_ms': 3.0}
+        ]}
+
+        regressions = compare_results(previous, current, threshold=20)
+
+        self.assertEqual([x['url_name'] for x in regressions], ['api.programs.detail'])
+        self.assertEqual(regressions[0]['reasons'], ['queries 5 -> 6', 'median_ms 2.0 -> 3.0'])
@@ -24,6 +24,11 @@ urlpatterns = [
         UsageReportView.as_view(),
         name='dashboard.usage'
     ),
+    url(
+        r'manager/dashboard/requests/$',
+        RequestMetricsView.as_view(),
+        name='dashboard.requests'
+    ),
     url(
         r'manager/dashboard/programs/$',
         ProgramListing.as_view(),
@@ -39,6 +44,10 @@ urlpatterns = [
         SearchView.as_view(template_name='search.html'),
         name='search'
     ),
+    url(r'^api/v1/autocomplete/$',
+        AutocompleteView.as_view(),
+        name='api.autocomplete'
+    ),
     url(r'^api/v1/positions/$',
         OpenJobListView.as_view(),
         name='api.positions.list'
@@ -0,0 +1,263 @@
+import logging
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock, Thread
+
+from django.conf import settings
+from django.db import connection
+from unidecode import unidecode
+
+from images.models import ImageTag
+from programs.models import College, Department, Program
+from programs.utilities.generation import get_generation, bump_generation
+from teledata.models import CombinedTeledata
+
+logger = logging.getLogger(__name__)
+
+
+class AutocompleteIndex(object):
+    """
+    In-process typeahead index over program, college,
+    department, teledata and image tag names.
+
+    Every word of a name starts a key in a sorted array,
+    so "Department of Biology" is suggested for "dep",
+    "of b" and "bio". Lookups bisect the array for the
+    range of keys starting with the query and rank every
+    key in it, without touching the database. Prefixes
+    matching more than `max_scan` keys (usually one or
+    two letters) are instead answered from the best
+    `max_candidates` suggestions of each type, ranked
+    when the index is built.
+
+    The index is built once per process. After
+    `invalidate()` bumps the generation stored in the
+    database, the next lookup starts a rebuild in a
+    background thread and keeps serving the previous
+    index until it is done. A rebuilt index is published
+    in a single assignment, so concurrent lookups always
+    see matching keys and entries.
+    """
+    cache_key = 'core.autocomplete.generation'
+
+    # The most matching keys ranked for a single lookup
+    max_scan = 2000
+
+    # The suggestions of each type kept for prefixes
+    # matching more than `max_scan` keys
+    max_candidates = 50
+
+    def __init__(self):
+        self.generation = None
+        # (keys, entries, candidates), replaced as a whole on rebuild
+        self._index = ([], [], {})
+        self.lock = Lock()
+        self.rebuilding = False
+
+    def invalidate(self):
+        """
+        Marks the index as stale in every process
+        """
+        bump_generation(self.cache_key)
+
+    def normalize(self, text) -> str:
+        return ' '.join(re.findall(r'[a-z0-9]+', unidecode(str(text)).lower()))
+
+    def get_suggestions(self):
+        """
+        Yields the (label, type, id) of every suggestion
+        """
+        for pk, name in Program.objects.filter(active=True, valid=True).values_list('pk', 'name'):
+            yield name, 'program', pk
+
+        for pk, name in College.objects.values_list('pk', 'full_name'):
+            yield name, 'college', pk
+
+        for pk, name in Department.objects.values_list('pk', 'full_name'):
+            yield name, 'department', pk
+
+        teledata = CombinedTeledata.objects.filter(active=True).values_list('id', 'name', 'from_table')
+        for pk, name, from_table in teledata:
+            yield name, f"teledata.{from_table}", pk
+
+        for pk, name in ImageTag.objects.values_list('pk', 'name'):
+            yield name, 'image_tag', pk
+
+    def build(self):
+        keys = []
+
+        for label, suggestion_type, pk in self.get_suggestions():
+            words = self.normalize(label).split(' ')
+
+            if not words[0]:
+                continue
+
+            entry = (label, suggestion_type, pk, len(words))
+
+            for i in range(len(words)):
+                # Keys starting at the first word sort ahead
+                # of ones starting later in the name
+                keys.append((' '.join(words[i:]), i, entry))
+
+        keys.sort(key=lambda x: (x[0], x[1], x[2][3], x[2][0]))
+
+        keys, entries = [x[0] for x in keys], [(x[1], x[2]) for x in keys]
+
+        self._index = (keys, entries, self.build_candidates(keys, entries))
+
+    def build_candidates(self, keys, entries) -> dict:
+        """
+        Returns the best suggestions of each type for
+        every prefix matching more than `max_scan` keys.
+        """
+        candidates = {}
+        pending = [(0, len(keys), '')]
+
+        while pending:
+            start, end, parent = pending.pop()
+            length = len(parent) + 1
+            position = start
+
+            while position < end:
+                prefix = keys[position][:length]
+
+                if len(prefix) < length:
+                    # The key is the parent prefix itself
+                    position += 1
+                    continue
+
+                prefix_end = bisect_left(keys, prefix + '{', position, end)
+
+                if prefix_end - position > self.max_scan:
+                    # Queries are normalized, so never end with a space
+                    if not prefix.endswith(' '):
+                        by_type = defaultdict(list)
+
+                        for match in self.rank(entries[position:prefix_end]):
+                            by_type[match[1][1]].append(match)
+
+                        candidates[prefix] = {
+                            suggestion_type: sorted(matches, key=lambda x: x[0])[:self.max_candidates]
+                            for suggestion_type, matches in by_type.items()
+                        }
+
+                    pending.append((position, prefix_end, prefix))
+
+                position = prefix_end
+
+        return candidates
+
+    def rank(self, entries, types=None) -> list:
+        """
+        Returns the (rank, entry) of each suggestion in the
+        given entries, keeping its best ranked key.
+        """
+        matches = {}
+
+        for offset, entry in entries:
+            label, suggestion_type, pk, length = entry
+
+            if types and suggestion_type not in types:
+                continue
+
+            identity = (suggestion_type, pk)
+            rank = (offset > 0, length, label.lower())
+
+            if identity not in matches or rank < matches[identity][0]:
+                matches[identity] = (rank, entry)
+
+        return list(matches.values())
+
+    def rebuild(self, generation=None):
+        """
+        Builds the index against the given generation,
+        or the current one.
+        """
+        if generation is None:
+            generation = get_generation(self.cache_key)
+
+        self.build()
+        self.generation = generation
+
+    def rebuild_in_background(self, generation):
+        try:
+            self.rebuild(generation)
+        except Exception:
+            logger.exception('Unable to rebuild the autocomplete index')
+        finally:
+            self.rebuilding = False
+            # The thread's connection is not closed by a request
+            connection.close()
+
+    def ensure_built(self):
+        """
+        Builds the index if it has not been built yet.
+        If it has been invalidated, it is rebuilt in a
+        background thread, unless background rebuilds
+        are disabled with AUTOCOMPLETE_BACKGROUND_REBUILD.
+        """
+        generation = get_generation(self.cache_key)
+
+        if self.generation == generation:
+            return
+
+        background = self.generation is not None and getattr(settings, 'AUTOCOMPLETE_BACKGROUND_REBUILD', True)
+
+        with self.lock:
+            if self.generation == generation or self.rebuilding:
+                return
+
+            if not background:
+                self.rebuild(generation)
+                return
+
+            self.rebuilding = True
+
+        Thread(target=self.rebuild_in_background, args=(generation,), daemon=True).start()
+
+    def lookup(self, query, limit=10, types=None) -> list:
+        """
+        Returns up to `limit` suggestions whose names have
+        a word starting with the query. Names starting with
+        the query rank first, then shorter names.
+
+        Prefixes matching more than `max_scan` keys return
+        at most `max_candidates` suggestions of each type.
+        """
+        query = self.normalize(query)
+
+        if not query:
+            return []
+
+        self.ensure_built()
+
+        keys, entries, candidates = self._index
+
+        if query in candidates:
+            matches = [
+                match
+                for suggestion_type, ranked in candidates[query].items()
+                if not types or suggestion_type in types
+                for match in ranked
+            ]
+        else:
+            start = bisect_left(keys, query)
+            # Keys only contain letters, digits and spaces,
+            # which all sort before "{"
+            end = bisect_left(keys, query + '{', start)
+            matches = self.rank(entries[start:end], types)
+
+        ranked = sorted(matches, key=lambda x: x[0])[:limit]
+
+        return [
+            {
+                'label': label,
+                'type': suggestion_type,
+                'id': pk
+            }
+            for rank, (label, suggestion_type, pk, length) in ranked
+        ]
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,286 @@
+import logging
+import statistics
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.urls import NoReverseMatch, get_resolver, reverse
+
+from core.utils.request_metrics import RequestMetrics, request_metrics_store
+from images.models import Image, ImageTag
+from locations.models import Location
+from marketing.models import Quote
+from podcasts.models import PodcastCategory, PodcastEpisode, PodcastShow
+from programs.models import (
+    CIP,
+    College,
+    Department,
+    Program,
+    ProgramDescription,
+    ProgramProfile,
+    TuitionOverride
+)
+from research.models import Researcher
+from teledata.models import CombinedTeledata, Department as TeledataDepartment
+
+
+class APIBenchmark(object):
+    """
+    Times GET requests to every `api.*` URL name through
+    the Django test client, recording the latency of the
+    first (cold cache) request, the median, p95 and
+    throughput of the repeated requests, and the number
+    of queries a request runs.
+    """
+    url_name_prefix = 'api.'
+
+    # URL names that are not benchmarked, with the reason why
+    skipped = {
+        'api.positions.list': 'Fetches jobs from an external site',
+        'api.marketing.quotes.create': 'Write only',
+        'api.descriptions.create': 'Write only',
+        'api.profiles.create': 'Write only',
+        'api.tuitionoverride.create': 'Write only',
+        'api.programs.quotes': 'Write only'
+    }
+
+    # The model whose first record fills in the URL
+    # arguments of each detail URL name
+    detail_models = {
+        'api.locations.detail': Location,
+        'api.teledata.departments.detail': TeledataDepartment,
+        'api.images.detail': Image,
+        'api.marketing.quotes.single': Quote,
+        'api.podcasts.episode.summary': PodcastEpisode,
+        'api.podcasts.detail': PodcastShow,
+        'api.podcasts.details.episodelist': PodcastShow,
+        'api.colleges.detail': College,
+        'api.departments.detail': Department,
+        'api.descriptions.detail': ProgramDescription,
+        'api.profiles.detail': ProgramProfile,
+        'api.tuitionoverride.detail': TuitionOverride
+    }
+
+    def __init__(self, iterations=5, url_names=None):
+        self.iterations = iterations
+        self.url_names = url_names
+        self.client = Client(raise_request_exception=False)
+
+    def get_url_names(self) -> list:
+        """
+        Returns the name of every API URL, in the
+        order they are routed.
+        """
+        names = []
+
+        def walk(resolver):
+            for pattern in resolver.url_patterns:
+                if hasattr(pattern, 'url_patterns'):
+                    walk(pattern)
+                elif pattern.name and pattern.name.startswith(self.url_name_prefix) and pattern.name not in names:
+                    names.append(pattern.name)
+
+        walk(get_resolver())
+
+        if self.url_names:
+            names = [x for x in names if x in self.url_names]
+
+        return names
+
+    def get_kwargs(self, url_name):
+        """
+        Returns the URL arguments of the given URL name,
+        or None when there is no record to fill them in.
+        """
+        groups = get_resolver().reverse_dict[url_name][0][0][1]
+
+        if not groups:
+            return {}
+
+        if url_name == 'api.cip.detail' or url_name == 'api.cip.detail.default_year':
+            obj = CIP.objects.filter(precise__gt=0).order_by('pk').first()
+            values = {'code': obj.code, 'version': obj.version} if obj else None
+        elif url_name == 'api.podcasts.categories.detail':
+            obj = PodcastCategory.objects.order_by('pk').first()
+            values = {'slug': obj.slug} if obj else None
+        elif url_name.startswith('api.researcher.'):
+            obj = Researcher.objects.order_by('pk').first()
+            values = {'id': obj.pk, 'pk': obj.pk} if obj else None
+        elif url_name in self.detail_models:
+            obj = self.detail_models[url_name].objects.order_by('pk').first()
+            values = {'id': obj.pk, 'pk': obj.pk} if obj else None
+        else:
+            obj = Program.objects.filter(parent_program__isnull=True).order_by('pk').first()
+            values = {'id': obj.pk} if obj else None
+
+        if values is None or any(x not in values for x in groups):
+            return None
+
+        return {x: values[x] for x in groups}
+
+    def get_params(self, url_name) -> list:
+        """
+        Returns the query params of each request made
+        to the given URL name, with a label for each.
+        """
+        program_ids = list(Program.objects.order_by('pk').values_list('pk', flat=True)[:50])
+        college = College.objects.order_by('pk').first()
+        tag = ImageTag.objects.order_by('pk').first()
+        staff = CombinedTeledata.objects.filter(from_table='staff').order_by('pkid').first()
+
+        params = {
+            'api.programs.list': [
+                ('default', {}),
+                ('limit 50', {'limit': 50}),
+                ('cursor', {'cursor': '', 'limit': 50})
+            ],
+            'api.programs.search': [
+                ('search', {'search': 'biology'}),
+                ('prefix search', {'search': 'bio'}),
+                ('filtered', {'colleges': college.pk if college else '', 'subplan_code__isnull': True}),
+                ('facets', {'search': 'science', 'facets': 'true'})
+            ],
+            'api.programs.bulk': [
+                ('50 ids', {'ids': ','.join(str(x) for x in program_ids)})
+            ],
+            'api.programs.projections.bulk': [
+                ('50 ids', {'ids': ','.join(str(x) for x in program_ids)})
+            ],
+            'api.teledata.search': [
+                ('name', {'search': staff.last_name if staff else 'smith'}),
+                ('phone', {'search': staff.phone if staff else '407-823-0000'})
+            ],
+            'api.teledata.staff.list': [
+                ('default', {}),
+                ('cursor', {'cursor': ''})
+            ],
+            'api.images.search': [
+                ('tag', {'search': tag.name if tag else 'biology'})
+            ],
+            'api.colleges.search': [
+                ('search', {'search': 'science'})
+            ],
+            'api.departments.search': [
+                ('search', {'search': 'science'})
+            ],
+            'api.autocomplete': [
+                ('prefix', {'search': 'bio'}),
+                ('word', {'search': 'science'})
+            ],
+            'api.researchers.list': [
+                ('default', {}),
+                ('cursor', {'cursor': ''})
+            ]
+        }
+
+        return params.get(url_name, [('default', {})])
+
+    def run(self) -> dict:
+        """
+        Benchmarks every API URL name and returns the
+        results along with the URL names skipped.
+        """
+        results = []
+        skipped = {}
+
+        # Failing requests are reported in the results
+        # rather than logged
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.CRITICAL)
+
+        try:
+            for url_name in self.get_url_names():
+                if url_name in self.skipped:
+                    skipped[url_name] = self.skipped[url_name]
+                    continue
+
+                try:
+                    path = reverse(url_name, kwargs=self.get_kwargs(url_name))
+                except (NoReverseMatch, TypeError):
+                    skipped[url_name] = 'No records to request'
+                    continue
+
+                for label, params in self.get_params(url_name):
+                    results.append(self.measure(url_name, label, path, params))
+        finally:
+            logger.setLevel(level)
+
+        return {
+            'results': results,
+            'skipped': skipped
+        }
+
+    def measure(self, url_name, label, path, params) -> dict:
+        cache.clear()
+
+        # Counted with an execute wrapper rather than the
+        # query log, which is capped in size
+        metrics = RequestMetrics()
+
+        with connection.execute_wrapper(metrics):
+            response = self.client.get(path, params)
+
+        metrics.finish()
+
+        timings = []
+        for i in range(self.iterations):
+            started = time.perf_counter()
+            self.client.get(path, params)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+
+        return {
+            'url_name': url_name,
+            'label': label,
+            'path': path,
+            'params': params,
+            'status': response.status_code,
+            'queries': metrics.query_count,
+            'db_ms': metrics.db_time * 1000,
+            'cold_ms': metrics.total_time * 1000,
+            'median_ms': statistics.median(timings) if timings else None,
+            'p95_ms': request_metrics_store.get_percentile(timings, 95) if timings else None,
+            'max_ms': timings[-1] if timings else None,
+            'requests_per_second': len(timings) / sum(timings) * 1000 if timings else None
+        }
+
+
+def compare_results(previous, current, threshold=20.0) -> list:
+    """
+    Returns the requests of the current results that run
+    more queries, or whose cold or median latency grew by
+    more than `threshold` percent, compared to the
+    previous results.
+    """
+    previous = {(x['url_name'], x['label']): x for x in previous['results']}
+    regressions = []
+
+    for result in current['results']:
+        before = previous.get((result['url_name'], result['label']))
+
+        if before is None:
+            continue
+
+        reasons = []
+
+        if result['status'] != before['status']:
+            reasons.append(f"status {before['status']} -> {result['status']}")
+
+        if result['queries'] > before['queries']:
+            reasons.append(f"queries {before['queries']} -> {result['queries']}")
+
+        for metric in ('cold_ms', 'median_ms'):
+            if before[metric] and result[metric] and result[metric] > before[metric] * (1 + threshold / 100):
+                reasons.append(f"{metric} {before[metric]:.1f} -> {result[metric]:.1f}")
+
+        if reasons:
+            regressions.append({
+                'url_name': result['url_name'],
+                'label': result['label'],
+                'reasons': reasons
+            })
+
+    return regressions
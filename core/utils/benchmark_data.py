@@ -0,0 +1,542 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from images.models import Image, ImageTag
+from programs.models import (
+    AcademicTerm,
+    AcademicYear,
+    AdmissionDeadlineType,
+    AdmissionTerm,
+    ApplicationDeadline,
+    CIP,
+    Career,
+    College,
+    Degree,
+    Department,
+    EmploymentProjection,
+    JobPosition,
+    Level,
+    Program,
+    ProgramDescription,
+    ProgramDescriptionType,
+    ProgramOutcomeStat,
+    ProgramProfile,
+    ProgramProfileType,
+    SOC
+)
+from programs.utilities.program_careers import refresh_program_careers
+from programs.utilities.program_documents import rebuild_program_documents
+from programs.utilities.search_index import program_search_index
+from research.models import Article, Book, Grant, ResearchTerm, Researcher
+from teledata import models as teledata
+from units.models import Employee
+
+
+class BenchmarkDataGenerator(object):
+    """
+    Generates a synthetic dataset shaped like production
+    data: programs with CIPs, occupations and projections,
+    teledata staff, tagged images and researchers with
+    their works.
+
+    Records are bulk created with explicit primary keys,
+    so the same seed and scale always produce the same
+    data on an empty database.
+    """
+    # The number of records of each kind at a scale of 1
+    counts = {
+        'colleges': 13,
+        'departments': 150,
+        'cips': 1200,
+        'socs': 800,
+        'jobs': 1500,
+        'programs': 2000,
+        'buildings': 200,
+        'organizations': 300,
+        'teledata_departments': 1500,
+        'staff': 50000,
+        'image_tags': 2000,
+        'images': 100000,
+        'researchers': 1000
+    }
+
+    # The share of programs that are subplans of another program
+    subplan_ratio = 0.3
+
+    words = [
+        'Accounting', 'Aerospace', 'Analytics', 'Anthropology', 'Architecture', 'Art',
+        'Biology', 'Biomedical', 'Business', 'Chemistry', 'Communication', 'Computer',
+        'Criminal', 'Data', 'Design', 'Digital', 'Economics', 'Education', 'Electrical',
+        'Engineering', 'English', 'Environmental', 'Finance', 'Forensic', 'Games',
+        'Health', 'History', 'Hospitality', 'Industrial', 'Information', 'Journalism',
+        'Justice', 'Languages', 'Management', 'Marketing', 'Mathematics', 'Mechanical',
+        'Media', 'Medicine', 'Music', 'Nursing', 'Optics', 'Philosophy', 'Photonics',
+        'Physics', 'Policy', 'Psychology', 'Public', 'Science', 'Security', 'Social',
+        'Sociology', 'Software', 'Statistics', 'Studies', 'Systems', 'Technology',
+        'Theatre', 'Writing'
+    ]
+
+    first_names = [
+        'Aaliyah', 'Alex', 'Amanda', 'Andre', 'Anna', 'Brian', 'Carlos', 'Chen', 'Chris',
+        'Daniel', 'David', 'Diana', 'Elena', 'Emily', 'Fatima', 'Grace', 'Hannah', 'Ivan',
+        'James', 'Jessica', 'John', 'Jose', 'Karen', 'Kevin', 'Laura', 'Maria', 'Michael',
+        'Mohammed', 'Nicole', 'Olivia', 'Priya', 'Robert', 'Sarah', 'Sofia', 'Steven',
+        'Thomas', 'Wei', 'William', 'Yusuf', 'Zoe'
+    ]
+
+    last_names = [
+        'Adams', 'Brown', 'Chen', 'Davis', 'Garcia', 'Gonzalez', 'Hernandez', 'Jackson',
+        'Johnson', 'Jones', 'Kim', 'Lee', 'Lopez', 'Martin', 'Martinez', 'Miller', 'Moore',
+        'Nguyen', 'Patel', 'Perez', 'Ramirez', 'Robinson', 'Rodriguez', 'Sanchez', 'Singh',
+        'Smith', 'Taylor', 'Thomas', 'Thompson', 'Walker', 'White', 'Williams', 'Wilson',
+        'Wright', 'Young'
+    ]
+
+    batch_size = 2000
+
+    def __init__(self, seed=0, scale=1.0):
+        self.seed = seed
+        self.scale = scale
+        self.random = random.Random(seed)
+        self.created = {}
+
+        # Fixed so generated dates do not depend on the day
+        self.now = timezone.make_aware(datetime.datetime(2024, 1, 1))
+
+    def count(self, name) -> int:
+        return max(int(self.counts[name] * self.scale), 1)
+
+    def next_id(self, model) -> int:
+        return (model.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0) + 1
+
+    def phrase(self, min_words=1, max_words=3) -> str:
+        return ' '.join(self.random.sample(self.words, self.random.randint(min_words, max_words)))
+
+    def phone(self) -> str:
+        return f'407-823-{self.random.randint(0, 9999):04}'
+
+    def bulk_create(self, model, objects):
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.created[model._meta.label] = self.created.get(model._meta.label, 0) + len(objects)
+
+        return objects
+
+    def generate(self) -> dict:
+        """
+        Generates every dataset and returns the number
+        of records created, by model.
+        """
+        with transaction.atomic():
+            self.generate_programs()
+            self.generate_teledata()
+            self.generate_images()
+            self.generate_research()
+
+        program_search_index.rebuild()
+        rebuild_program_documents()
+        refresh_program_careers()
+
+        return self.created
+
+    def generate_programs(self):
+        levels = self.bulk_create(Level, [
+            Level(pk=i, name=x)
+            for i, x in enumerate(['Bachelors', 'Masters', 'Doctoral', 'Certificate', 'Minor'], self.next_id(Level))
+        ])
+        careers = self.bulk_create(Career, [
+            Career(pk=i, name=x, abbr=y)
+            for i, (x, y) in enumerate([('Undergraduate', 'UGRD'), ('Graduate', 'GRAD')], self.next_id(Career))
+        ])
+        degrees = self.bulk_create(Degree, [
+            Degree(pk=i, name=x)
+            for i, x in enumerate(['BA', 'BS', 'MA', 'MS', 'PhD', 'CRT', 'MIN'], self.next_id(Degree))
+        ])
+        term = self.bulk_create(AcademicTerm, [AcademicTerm(pk=self.next_id(AcademicTerm), full_name='Fall 2024')])[0]
+        description_type = self.bulk_create(ProgramDescriptionType, [
+            ProgramDescriptionType(pk=self.next_id(ProgramDescriptionType), name=settings.EXCERPT_DESCRIPTION_TYPE_SOURCE)
+        ])[0]
+        profile_type = self.bulk_create(ProgramProfileType, [
+            ProgramProfileType(pk=self.next_id(ProgramProfileType), name='Main Site', root_url='https://www.ucf.edu/degree/')
+        ])[0]
+
+        colleges = self.bulk_create(College, [
+            College(pk=i, full_name=f'College of {self.phrase(1, 2)}', short_name=f'C{i}')
+            for i in range(self.next_id(College), self.next_id(College) + self.count('colleges'))
+        ])
+        departments = self.bulk_create(Department, [
+            Department(pk=i, full_name=f'Department of {self.phrase(1, 2)}')
+            for i in range(self.next_id(Department), self.next_id(Department) + self.count('departments'))
+        ])
+
+        cips = self.generate_cips()
+        jobs = self.bulk_create(JobPosition, [
+            JobPosition(pk=i, name=f'{self.phrase(1, 2)} {self.random.choice(["Analyst", "Manager", "Specialist", "Engineer", "Teacher"])}')
+            for i in range(self.next_id(JobPosition), self.next_id(JobPosition) + self.count('jobs'))
+        ])
+
+        socs = self.bulk_create(SOC, [
+            SOC(pk=i, name=f'{self.phrase(1, 2)} Occupations', code=f'{self.random.randint(11, 53)}-{i % 10000:04}')
+            for i in range(self.next_id(SOC), self.next_id(SOC) + self.count('socs'))
+        ])
+        self.bulk_create(SOC.cip.through, [
+            SOC.cip.through(soc_id=soc.pk, cip_id=cip.pk)
+            for soc in socs
+            for cip in self.random.sample(cips, min(self.random.randint(1, 3), len(cips)))
+        ])
+        self.bulk_create(SOC.jobs.through, [
+            SOC.jobs.through(soc_id=soc.pk, jobposition_id=job.pk)
+            for soc in socs
+            for job in self.random.sample(jobs, min(self.random.randint(2, 5), len(jobs)))
+        ])
+
+        projections = []
+        for i, soc in enumerate(socs, self.next_id(EmploymentProjection)):
+            begin = self.random.randint(100, 20000)
+            end = begin + self.random.randint(-begin // 10, begin // 4)
+            projections.append(EmploymentProjection(
+                pk=i,
+                soc_id=soc.pk,
+                begin_employment=begin,
+                end_employment=end,
+                change=end - begin,
+                change_percentage=Decimal(round((end - begin) / begin * 100, 2)),
+                openings=self.random.randint(10, 2000)
+            ))
+        self.bulk_create(EmploymentProjection, projections)
+
+        year = self.bulk_create(AcademicYear, [AcademicYear(pk=self.next_id(AcademicYear), code='2223', display='2022-2023')])[0]
+        outcomes = self.bulk_create(ProgramOutcomeStat, [
+            ProgramOutcomeStat(
+                pk=i,
+                academic_year_id=year.pk,
+                cip_id=cip.pk,
+                employed_full_time=Decimal(self.random.randint(40, 95)) / 100,
+                continuing_education=Decimal(self.random.randint(5, 40)) / 100,
+                avg_annual_earnings=Decimal(self.random.randint(30000, 90000))
+            )
+            for i, cip in enumerate(cips[::2], self.next_id(ProgramOutcomeStat))
+        ])
+        outcomes_by_cip = {x.cip_id: x for x in outcomes}
+
+        admission_term = self.bulk_create(AdmissionTerm, [AdmissionTerm(pk=self.next_id(AdmissionTerm), name='Fall')])[0]
+        deadline_type = self.bulk_create(AdmissionDeadlineType, [
+            AdmissionDeadlineType(pk=self.next_id(AdmissionDeadlineType), name='Domestic')
+        ])[0]
+        deadlines = self.bulk_create(ApplicationDeadline, [
+            ApplicationDeadline(
+                pk=i,
+                admission_term_id=admission_term.pk,
+                career_id=career.pk,
+                deadline_type_id=deadline_type.pk,
+                month=self.random.randint(1, 12),
+                day=self.random.randint(1, 28)
+            )
+            for i, career in enumerate(careers, self.next_id(ApplicationDeadline))
+        ])
+
+        programs = []
+        parents = []
+        start = self.next_id(Program)
+
+        for i in range(start, start + self.count('programs')):
+            parent = self.random.choice(parents) if parents and self.random.random() < self.subplan_ratio else None
+            name = f'{parent.name} {self.phrase(1, 1)} Track' if parent else self.phrase(1, 3)
+            career = self.random.choice(careers)
+
+            program = Program(
+                pk=i,
+                name=name,
+                plan_code=parent.plan_code if parent else f'P{i}-{self.random.choice(degrees).name}',
+                subplan_code=f'S{i}' if parent else None,
+                level_id=self.random.choice(levels).pk,
+                career_id=career.pk,
+                degree_id=self.random.choice(degrees).pk,
+                online=self.random.random() < 0.2,
+                parent_program_id=parent.pk if parent else None,
+                start_term_id=term.pk,
+                credit_hours=self.random.randint(12, 120),
+                excerpt=f'Study {name.lower()}.',
+                active=self.random.random() < 0.95
+            )
+            programs.append(program)
+
+            if parent is None:
+                parents.append(program)
+
+        self.bulk_create(Program, programs)
+
+        program_colleges = []
+        program_departments = []
+        program_cips = []
+        program_jobs = []
+        program_outcomes = []
+        program_deadlines = []
+
+        for program in programs:
+            # Subplans take their colleges and departments from their parent
+            if program.parent_program_id is None:
+                for college in self.random.sample(colleges, min(self.random.randint(1, 2), len(colleges))):
+                    program_colleges.append(Program.colleges.through(program_id=program.pk, college_id=college.pk))
+
+                program_departments.append(
+                    Program.departments.through(program_id=program.pk, department_id=self.random.choice(departments).pk)
+                )
+
+            cip = self.random.choice(cips)
+            program_cips.append(Program.cip.through(program_id=program.pk, cip_id=cip.pk))
+
+            if cip.pk in outcomes_by_cip:
+                program_outcomes.append(
+                    Program.outcomes.through(program_id=program.pk, programoutcomestat_id=outcomes_by_cip[cip.pk].pk)
+                )
+
+            for job in self.random.sample(jobs, min(self.random.randint(0, 5), len(jobs))):
+                program_jobs.append(Program.jobs.through(program_id=program.pk, jobposition_id=job.pk))
+
+            for deadline in deadlines:
+                if deadline.career_id == program.career_id:
+                    program_deadlines.append(
+                        Program.application_deadlines.through(program_id=program.pk, applicationdeadline_id=deadline.pk)
+                    )
+
+        self.bulk_create(Program.colleges.through, program_colleges)
+        self.bulk_create(Program.departments.through, program_departments)
+        self.bulk_create(Program.cip.through, program_cips)
+        self.bulk_create(Program.jobs.through, program_jobs)
+        self.bulk_create(Program.outcomes.through, program_outcomes)
+        self.bulk_create(Program.application_deadlines.through, program_deadlines)
+
+        self.bulk_create(ProgramDescription, [
+            ProgramDescription(
+                pk=i,
+                description_type_id=description_type.pk,
+                description=f'<p>Study {program.name.lower()}. {self.phrase(3, 6)}.</p>',
+                program_id=program.pk
+            )
+            for i, program in enumerate(programs, self.next_id(ProgramDescription))
+        ])
+        self.bulk_create(ProgramProfile, [
+            ProgramProfile(
+                pk=i,
+                profile_type_id=profile_type.pk,
+                url=f'https://www.ucf.edu/degree/program-{program.pk}/',
+                primary=True,
+                program_id=program.pk
+            )
+            for i, program in enumerate([x for x in programs if x.parent_program_id is None], self.next_id(ProgramProfile))
+        ])
+
+    def generate_cips(self) -> list:
+        """
+        Generates a CIP hierarchy and returns the
+        precise CIPs programs can be assigned to.
+        """
+        cips = []
+        precise = []
+        pk = self.next_id(CIP)
+
+        areas = max(self.count('cips') // 30, 1)
+
+        for area in range(1, areas + 1):
+            cips.append(CIP(pk=pk, name=f'{self.phrase(1, 2).upper()}.', description='Area', code=f'{area:02}', area=area, subarea=0, precise=0))
+            pk += 1
+
+            for subarea in range(1, 6):
+                cips.append(CIP(
+                    pk=pk,
+                    name=f'{self.phrase(1, 2).upper()}.',
+                    description='Subarea',
+                    code=f'{area:02}.{subarea:02}',
+                    area=area,
+                    subarea=subarea,
+                    precise=0
+                ))
+                pk += 1
+
+                for code in range(1, 6):
+                    cip = CIP(
+                        pk=pk,
+                        name=f'{self.phrase(1, 3)}.',
+                        description='Precise',
+                        code=f'{area:02}.{subarea:02}{code:02}',
+                        area=area,
+                        subarea=subarea,
+                        precise=code
+                    )
+                    cips.append(cip)
+                    precise.append(cip)
+                    pk += 1
+
+        self.bulk_create(CIP, cips)
+
+        return precise
+
+    def generate_teledata(self):
+        buildings = self.bulk_create(teledata.Building, [
+            teledata.Building(pk=i, name=f'{self.phrase(1, 2)} Building', abbr=f'B{i}', import_id=i)
+            for i in range(self.next_id(teledata.Building), self.next_id(teledata.Building) + self.count('buildings'))
+        ])
+        organizations = self.bulk_create(teledata.Organization, [
+            teledata.Organization(
+                pk=i,
+                name=f'{self.phrase(1, 2)} Office',
+                bldg_id=self.random.choice(buildings).pk,
+                room=str(self.random.randint(100, 499)),
+                phone=self.phone()
+            )
+            for i in range(self.next_id(teledata.Organization), self.next_id(teledata.Organization) + self.count('organizations'))
+        ])
+        departments = self.bulk_create(teledata.Department, [
+            teledata.Department(
+                pk=i,
+                org_id=self.random.choice(organizations).pk,
+                name=self.phrase(1, 2)[:50],
+                bldg_id=self.random.choice(buildings).pk,
+                room=str(self.random.randint(100, 499)),
+                phone=self.phone()
+            )
+            for i in range(self.next_id(teledata.Department), self.next_id(teledata.Department) + self.count('teledata_departments'))
+        ])
+
+        start = self.next_id(teledata.Staff)
+        self.bulk_create(teledata.Staff, [
+            teledata.Staff(
+                pk=i,
+                first_name=self.random.choice(self.first_names),
+                last_name=self.random.choice(self.last_names),
+                dept_id=self.random.choice(departments).pk,
+                job_position=f'{self.phrase(1, 2)} {self.random.choice(["Coordinator", "Director", "Professor", "Specialist"])}'[:100],
+                bldg_id=self.random.choice(buildings).pk,
+                room=str(self.random.randint(100, 499)),
+                phone=self.phone(),
+                email=f'staff{i}@ucf.edu',
+                active=self.random.random() < 0.97
+            )
+            for i in range(start, start + self.count('staff'))
+        ])
+
+        # Departments are commonly searched for by keyword
+        content_type = ContentType.objects.get_for_model(teledata.Department)
+        start = self.next_id(teledata.Keyword)
+        self.bulk_create(teledata.Keyword, [
+            teledata.Keyword(pk=i, phrase=self.phrase(1, 2).lower(), content_type_id=content_type.pk, object_id=d.pk)
+            for i, d in enumerate(departments, start)
+        ])
+
+        # Build the combined records the way the teledata import does
+        label = teledata.CombinedTeledata._meta.label
+        self.created[label] = self.created.get(label, 0) + teledata.CombinedTeledata.objects.update_data(self.batch_size)
+
+    def generate_images(self):
+        names = [x.lower() for x in self.words]
+        while len(names) < self.count('image_tags'):
+            names.append(f'{self.phrase(2, 2).lower()} {len(names)}')
+
+        tags = self.bulk_create(ImageTag, [
+            ImageTag(pk=i, name=name, source=settings.APP_NAME)
+            for i, name in enumerate(names[:self.count('image_tags')], self.next_id(ImageTag))
+        ])
+
+        start = self.next_id(Image)
+        images = []
+        for i in range(start, start + self.count('images')):
+            taken = self.now - datetime.timedelta(days=self.random.randint(0, 3650))
+            images.append(Image(
+                pk=i,
+                filename=f'image-{i}',
+                extension='jpg',
+                source_id=str(i),
+                source_created=taken,
+                source_modified=taken,
+                photo_taken=taken,
+                location=self.random.choice(['Main Campus', 'Downtown', 'Lake Nona', 'Rosen']),
+                width_full=self.random.choice([1920, 2400, 4000]),
+                height_full=self.random.choice([1080, 1600, 3000]),
+                caption=self.phrase(2, 5)
+            ))
+        self.bulk_create(Image, images)
+
+        self.bulk_create(Image.tags.through, [
+            Image.tags.through(image_id=image.pk, imagetag_id=tag.pk)
+            for image in images
+            for tag in self.random.sample(tags, min(self.random.randint(1, 5), len(tags)))
+        ])
+
+    def generate_research(self):
+        staff_ids = list(teledata.Staff.objects.order_by('pk').values_list('pk', flat=True))
+
+        terms = self.bulk_create(ResearchTerm, [
+            ResearchTerm(pk=i, term_name=word)
+            for i, word in enumerate(self.words, self.next_id(ResearchTerm))
+        ])
+
+        start = self.next_id(Employee)
+        employees = []
+        for i in range(start, start + self.count('researchers')):
+            first_name = self.random.choice(self.first_names)
+            last_name = self.random.choice(self.last_names)
+            employees.append(Employee(
+                pk=i,
+                ext_employee_id=f'{i:07}'[-7:],
+                full_name=f'{first_name} {last_name}',
+                first_name=first_name,
+                last_name=last_name,
+                prefix=self.random.choice([None, 'Dr'])
+            ))
+        self.bulk_create(Employee, employees)
+
+        researchers = self.bulk_create(Researcher, [
+            Researcher(
+                pk=i,
+                employee_record_id=employee.pk,
+                teledata_record_id=self.random.choice(staff_ids) if staff_ids else None,
+                biography=f'Researches {self.phrase(2, 4).lower()}.'
+            )
+            for i, employee in enumerate(employees, self.next_id(Researcher))
+        ])
+        self.bulk_create(Researcher.research_terms.through, [
+            Researcher.research_terms.through(researcher_id=researcher.pk, researchterm_id=term.pk)
+            for researcher in researchers
+            for term in self.random.sample(terms, 3)
+        ])
+
+        # Works use multi-table inheritance, which
+        # bulk_create does not support
+        for researcher in researchers:
+            for i in range(self.random.randint(0, 4)):
+                article = Article.objects.create(
+                    aa_article_id=self.random.randint(1, 10 ** 8),
+                    article_title=self.phrase(3, 6),
+                    journal_name=f'Journal of {self.phrase(1, 2)}',
+                    article_year=self.random.randint(2000, 2024)
+                )
+                article.researchers.add(researcher)
+                self.created['research.Article'] = self.created.get('research.Article', 0) + 1
+
+            if self.random.random() < 0.2:
+                book = Book.objects.create(
+                    aa_book_id=self.random.randint(1, 10 ** 8),
+                    isbn=f'{self.random.randint(10 ** 12, 10 ** 13 - 1)}',
+                    book_title=self.phrase(2, 5)
+                )
+                book.researchers.add(researcher)
+                self.created['research.Book'] = self.created.get('research.Book', 0) + 1
+
+            if self.random.random() < 0.3:
+                grant = Grant.objects.create(
+                    aa_grant_id=self.random.randint(1, 10 ** 8),
+                    agency_name='National Science Foundation',
+                    grant_name=self.phrase(3, 6),
+                    total_dollars=self.random.randint(10000, 2000000),
+                    is_research=True,
+                    principle_investigator=self.random.random() < 0.5
+                )
+                grant.researchers.add(researcher)
+                self.created['research.Grant'] = self.created.get('research.Grant', 0) + 1
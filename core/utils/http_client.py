@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ConcurrentClient(object):
+    """
+    Fetches JSON from many URLs at once on a bounded pool
+    of threads. Requests share one session, so connections
+    are reused, and failed requests are retried with
+    exponential backoff.
+    """
+    retry_statuses = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_workers=8, retries=3, backoff_factor=0.5, timeout=30):
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.retry_statuses,
+            allowed_methods=frozenset(['GET'])
+        )
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_json(self, url, params=None):
+        """
+        Returns the decoded JSON response of a GET request,
+        raising a `requests.RequestException` if it fails.
+        """
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+
+        return response.json()
+
+    def get_json_many(self, requests_by_key) -> dict:
+        """
+        Requests every `(url, params)` pair of the given dict
+        concurrently and returns the decoded responses by the
+        same keys. The first failed request is raised.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                key: executor.submit(self.get_json, url, params)
+                for key, (url, params) in requests_by_key.items()
+            }
+
+            return {key: future.result() for key, future in futures.items()}
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,51 @@
+import re
+
+from unidecode import unidecode
+
+
+# The Soundex digit of each letter from A to Z. Vowels
+# and H, W and Y are 0, which is never written.
+soundex_codes = dict(zip('ABCDEFGHIJKLMNOPQRSTUVWXYZ', '01230120022455012623010202'))
+
+
+def soundex(text):
+    """
+    Returns the Soundex code of a string the way MySQL's
+    SOUNDEX() does, so codes computed here can replace
+    `SOUNDS LIKE` comparisons. Multiple words are coded
+    as one, codes are at least four characters long and
+    never truncated, and repeated digits are dropped even
+    when vowels separate them. Accents are ignored.
+    """
+    if text is None:
+        return None
+
+    letters = re.sub(r'[^A-Z]', '', unidecode(str(text)).upper())
+
+    if not letters:
+        return ''
+
+    retval = letters[0]
+    last_code = soundex_codes[letters[0]]
+
+    for letter in letters[1:]:
+        code = soundex_codes[letter]
+
+        if code != '0' and code != last_code:
+            retval += code
+            last_code = code
+
+    return retval.ljust(4, '0')
+
+
+def normalize_name(text):
+    """
+    Returns a name case folded, without accents and with
+    its whitespace collapsed, so names compare equal the
+    way they do under a case and accent insensitive
+    collation.
+    """
+    if text is None:
+        return None
+
+    return ' '.join(unidecode(str(text)).casefold().split())
@@ -0,0 +1,175 @@
+import math
+import time
+from collections import deque
+from threading import Lock
+
+from django.conf import settings
+
+
+class RequestMetrics(object):
+    """
+    The number of database queries and the time spent in
+    the database, the view, the renderer and in total
+    for a single request. Times are in seconds.
+
+    The instance is installed as a database execute
+    wrapper, so it sees every query the request runs.
+    """
+    def __init__(self, log_queries=False):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.app_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+        self.queries = [] if log_queries else None
+
+        self.view_started = None
+        self.view_db_time = 0.0
+        self.render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.query_count += 1
+            self.db_time += duration
+
+            if self.queries is not None:
+                self.queries.append((duration, sql, params))
+
+    def start_view(self):
+        self.view_started = time.perf_counter()
+        self.view_db_time = self.db_time
+
+    def end_view(self):
+        """
+        Records the time the view spent outside of the
+        database, which for API views is mostly spent
+        serializing.
+        """
+        if self.view_started is None:
+            return
+
+        elapsed = time.perf_counter() - self.view_started
+        self.app_time = max(elapsed - (self.db_time - self.view_db_time), 0.0)
+        self.view_started = None
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def end_render(self):
+        if self.render_started is None:
+            return
+
+        self.render_time = time.perf_counter() - self.render_started
+        self.render_started = None
+
+    def finish(self):
+        self.end_view()
+        self.end_render()
+        self.total_time = time.perf_counter() - self.started
+
+    def get_timings(self) -> dict:
+        """
+        Returns the timings of the request in milliseconds
+        """
+        return {
+            'db': self.db_time * 1000,
+            'app': self.app_time * 1000,
+            'render': self.render_time * 1000,
+            'total': self.total_time * 1000
+        }
+
+    def get_server_timing(self) -> str:
+        """
+        Returns the value of the Server-Timing header
+        """
+        descriptions = {
+            'db': f'{self.query_count} queries',
+            'app': 'View',
+            'render': 'Render',
+            'total': 'Total'
+        }
+
+        return ', '.join(
+            f'{name};dur={duration:.2f};desc="{descriptions[name]}"'
+            for name, duration in self.get_timings().items()
+        )
+
+
+class RequestMetricsStore(object):
+    """
+    Keeps the metrics of the most recent requests to each
+    URL name and reports their percentiles.
+
+    Samples are kept in memory, so each process reports
+    on the requests it has served since it started.
+    """
+    metrics = ('queries', 'db', 'app', 'render', 'total')
+    percentiles = (50, 95, 99)
+
+    def __init__(self):
+        self.samples = {}
+        self.lock = Lock()
+
+    def get_sample_size(self) -> int:
+        return getattr(settings, 'REQUEST_METRICS_SAMPLE_SIZE', 1000)
+
+    def record(self, url_name, metrics):
+        timings = metrics.get_timings()
+        sample = (metrics.query_count,) + tuple(timings[x] for x in self.metrics[1:])
+
+        with self.lock:
+            if url_name not in self.samples:
+                self.samples[url_name] = deque(maxlen=self.get_sample_size())
+
+            self.samples[url_name].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples = {}
+
+    def get_percentile(self, ordered, percentile):
+        """
+        Returns the nearest rank percentile of the
+        given sorted values.
+        """
+        rank = max(math.ceil(percentile / 100 * len(ordered)), 1)
+
+        return ordered[rank - 1]
+
+    def get_report(self) -> list:
+        """
+        Returns the request count and the percentiles of
+        each metric for every URL name, slowest first.
+        """
+        with self.lock:
+            samples = {x: list(y) for x, y in self.samples.items()}
+
+        report = []
+
+        for url_name, values in samples.items():
+            row = {
+                'url_name': url_name,
+                'requests': len(values)
+            }
+
+            for i, metric in enumerate(self.metrics):
+                ordered = sorted(x[i] for x in values)
+
+                row[metric] = {
+                    f'p{x}': self.get_percentile(ordered, x)
+                    for x in self.percentiles
+                }
+                row[metric]['max'] = ordered[-1]
+
+            report.append(row)
+
+        return sorted(report, key=lambda x: (-x['total']['p95'], x['url_name']))
+
+
+request_metrics_store = RequestMetricsStore()
@@ -13,7 +13,7 @@ from django.http import Http404, HttpRequest
 from django.views.generic.base import TemplateView
 from django.views.generic import ListView, FormView
 from django.db.models import Q, Count, Max
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
@@ -32,6 +32,8 @@ from django.contrib.contenttypes.models import ContentType
 from auditlog.models import LogEntry
 
 from .utils.jobs_utils import get_cached_jobs, set_cached_jobs
+from .utils.autocomplete import autocomplete_index
+from .utils.request_metrics import request_metrics_store
 
 import settings
 import logging
@@ -592,6 +594,57 @@ class UsageReportView(LoginRequiredMixin, TitleContextMixin, TemplateView):
 
         return ctx
 
+class RequestMetricsView(LoginRequiredMixin, UserPassesTestMixin, TitleContextMixin, TemplateView):
+    """
+    Reports the percentiles of the query counts and timings
+    of recent requests by URL name, slowest first. Only
+    available to staff.
+    """
+    template_name = 'dashboard/request-metrics.html'
+    title = 'Request Metrics'
+    heading = 'Request Metrics'
+    local = settings.LOCAL
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx['results'] = request_metrics_store.get_report()
+        ctx['sample_size'] = request_metrics_store.get_sample_size()
+
+        return ctx
+
+
+class AutocompleteView(APIView):
+    """
+    Returns typeahead suggestions for the `search` param
+    from the in-process autocomplete index. Suggestions
+    can be limited with `limit` and `types`, e.g.
+    `?search=bio&types=program,college&limit=5`.
+    """
+    default_limit = 10
+    max_limit = 25
+
+    def get(self, request, format=None):
+        search = request.query_params.get('search', '')
+
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+
+        limit = max(1, min(limit, self.max_limit))
+
+        types = request.query_params.get('types', None)
+        types = set(x.strip() for x in types.split(',') if x.strip()) if types else None
+
+        return Response({
+            'search': search,
+            'results': autocomplete_index.lookup(search, limit=limit, types=types)
+        })
+
+
 class OpenJobListView(APIView):
     def get(self, request):
         # Retrieve limit and offset from query parameters
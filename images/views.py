@@ -5,6 +5,8 @@ from django.shortcuts import render
 from rest_framework import generics
 from rest_framework.filters import OrderingFilter, SearchFilter
 
+from core.pagination import KeysetPagination
+
 from images.models import *
 from images.serializers import *
 
@@ -12,6 +14,7 @@ from images.serializers import *
 class ImageListView(generics.ListAPIView):
     queryset = Image.objects.all()
     serializer_class = ImageSerializer
+    pagination_class = KeysetPagination
 
 
 class ImageDetailView(generics.RetrieveAPIView):
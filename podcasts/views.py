@@ -2,6 +2,8 @@ from rest_framework import generics
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 
+from core.pagination import KeysetPagination
+
 from podcasts.models import (
     PodcastShow,
     PodcastEpisode,
@@ -29,6 +31,7 @@ class PodcastShowListView(generics.ListAPIView):
     queryset = PodcastShow.objects.all()
     serializer_class = PodcastShowSerializer
     filter_class = PodcastShowListFilter
+    pagination_class = KeysetPagination
 
 
 class PodcastShowDetailView(generics.RetrieveAPIView):
@@ -48,6 +51,7 @@ class PodcastEpisodeListView(generics.ListAPIView):
     queryset = PodcastEpisode.objects.all()
     lookup_field = 'id'
     filter_class = PodcastEpisodeListFilter
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.request.query_params.get('fields', None) == 'id':
@@ -71,6 +75,7 @@ class PodcastShowEpisodeListView(generics.ListAPIView):
     """
     lookup_field = 'id'
     filter_class = PodcastEpisodeListFilter
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         show_id = self.kwargs.get('id', None)
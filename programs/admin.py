@@ -7,6 +7,8 @@ from django.utils.html import format_html_join, mark_safe
 from django_mysql.models import ListCharField
 
 from .models import *
+from .utilities.program_documents import refresh_program_documents
+from .utilities.response_cache import invalidate_response_cache
 
 # Register your models here.
 
@@ -99,6 +101,8 @@ class ProgramAdmin(admin.ModelAdmin):
 
     def make_active(self, request, queryset):
         rows_updated = queryset.update(active=True)
+        refresh_program_documents(queryset.values_list('pk', flat=True))
+        invalidate_response_cache()
         if rows_updated == 1:
             message_bit = '1 program was'
         else:
@@ -111,6 +115,8 @@ class ProgramAdmin(admin.ModelAdmin):
 
     def make_inactive(self, request, queryset):
         rows_updated = queryset.update(active=False)
+        refresh_program_documents(queryset.values_list('pk', flat=True))
+        invalidate_response_cache()
         if rows_updated == 1:
             message_bit = '1 program was'
         else:
@@ -6,3 +6,7 @@ from django.apps import AppConfig
 
 class ProgramsConfig(AppConfig):
     name = 'programs'
+
+    def ready(self):
+        import programs.signals
+        return super().ready()
@@ -1,13 +1,43 @@
 import django_filters
 from django_filters import rest_framework as filters
 
+from django.db.models import Case, FloatField, Value, When
+from rest_framework.filters import OrderingFilter
+
 from programs.models import *
+from programs.utilities.search_index import program_search_index
 
 
 class ProgramFilter(django_filters.FilterSet):
-    search = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    search = filters.CharFilter(method='filter_search')
     subplan_code__isnull = filters.BooleanFilter(field_name='subplan_code', lookup_expr='isnull')
 
+    def filter_search(self, queryset, name, value):
+        """
+        Limits results to programs matching the search
+        index, annotated with their relevance `score`.
+
+        Until the index has been built, programs whose
+        name contains the search are returned unranked.
+        """
+        if not program_search_index.is_built():
+            return queryset.filter(name__icontains=value).annotate(
+                score=Value(0.0, output_field=FloatField())
+            )
+
+        scores = program_search_index.search(value)
+
+        if not scores:
+            return queryset.none()
+
+        return queryset.filter(pk__in=scores.keys()).annotate(
+            score=Case(
+                *[When(pk=pk, then=Value(score)) for pk, score in scores.items()],
+                default=Value(0.0),
+                output_field=FloatField()
+            )
+        )
+
     class Meta:
         model = Program
         fields = (
@@ -27,6 +57,67 @@ class ProgramFilter(django_filters.FilterSet):
         )
 
 
+class ProgramSearchDocumentFilter(django_filters.FilterSet):
+    """
+    Accepts the same params as ProgramFilter,
+    applied to program search documents.
+    """
+    search = filters.CharFilter(method='filter_search')
+    subplan_code__isnull = filters.BooleanFilter(field_name='subplan_code', lookup_expr='isnull')
+    colleges = filters.NumberFilter(method='filter_ids')
+    departments = filters.NumberFilter(method='filter_ids')
+    level = filters.NumberFilter(field_name='level_id')
+    career = filters.NumberFilter(field_name='career_id')
+    degree = filters.NumberFilter(field_name='degree_id')
+    parent_program = filters.NumberFilter(field_name='parent_program_id')
+
+    filter_search = ProgramFilter.filter_search
+
+    def filter_ids(self, queryset, name, value):
+        field_name = {'colleges': 'college_ids', 'departments': 'department_ids'}[name]
+
+        return queryset.filter(**{f"{field_name}__contains": f"|{int(value)}|"})
+
+    class Meta:
+        model = ProgramSearchDocument
+        fields = (
+            'search',
+            'valid',
+            'active',
+            'plan_code',
+            'subplan_code',
+            'subplan_code__isnull',
+            'online',
+            'colleges',
+            'departments',
+            'level',
+            'career',
+            'degree',
+            'parent_program'
+        )
+
+
+class ProgramSearchOrderingFilter(OrderingFilter):
+    """
+    Orders search results by relevance unless another
+    ordering is requested. Ordering by `score` is ignored
+    when there is no search, since nothing is scored.
+    """
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view) or []
+        scored = 'score' in queryset.query.annotations
+
+        if not scored:
+            ordering = [x for x in ordering if x.lstrip('-') != 'score']
+        elif not ordering:
+            ordering = ['-score', 'pk']
+
+        if ordering:
+            return queryset.order_by(*ordering)
+
+        return queryset
+
+
 class CollegeFilter(django_filters.FilterSet):
     search = filters.CharFilter(field_name='full_name', lookup_expr='icontains')
 
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from programs.utilities.program_documents import (
+    check_program_documents,
+    refresh_program_documents
+)
+from programs.utilities.response_cache import invalidate_response_cache
+
+from tabulate import tabulate
+
+
+class Command(BaseCommand):
+    help = """
+Reports program search documents that have drifted from
+the program data they were built from: documents that are
+missing, out of date, or left over from deleted programs.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            dest='fix',
+            help='Refreshes the documents that have drifted.',
+            default=False,
+            required=False
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            help='The number of programs to compare at a time.',
+            default=200,
+            required=False
+        )
+
+    def handle(self, *args, **options):
+        self.fix = options['fix']
+        self.batch_size = options['batch_size']
+
+        self.drift = check_program_documents(batch_size=self.batch_size)
+        drifted = [x for ids in self.drift.values() for x in ids]
+
+        if self.fix and drifted:
+            refresh_program_documents(drifted)
+            invalidate_response_cache()
+
+        self.print_stats()
+
+        if drifted and not self.fix:
+            raise CommandError(f"{len(drifted)} program documents have drifted. Run with --fix to refresh them.")
+
+    def print_stats(self):
+        results = [
+            ("Missing Documents", len(self.drift['missing'])),
+            ("Stale Documents", len(self.drift['stale'])),
+            ("Orphaned Documents", len(self.drift['orphaned']))
+        ]
+
+        for name, ids in self.drift.items():
+            if ids:
+                self.stdout.write(f"{name.title()}: {', '.join(str(x) for x in ids)}")
+
+        self.stdout.write(tabulate(results, tablefmt='grid'), ending='\n\n')
+
+        if self.fix:
+            self.stdout.write(self.style.SUCCESS("Refreshed all drifted documents."))
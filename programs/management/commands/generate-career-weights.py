@@ -1,15 +1,55 @@
 import os
 
-from typing import List, Optional
+from collections import namedtuple
+from typing import Dict, List, Optional
 from django.core.management.base import BaseCommand, CommandParser, CommandError
 
 from progress.bar import Bar
 
 from csv import DictWriter
+import numpy
 import requests
 import spacy
 
 from spacy.language import Language
+from spacy.tokens import Doc
+
+from programs.models import Program
+
+
+TokenVectors = namedtuple('TokenVectors', ['vectors', 'orths'])
+
+
+def get_token_vectors(doc: Doc) -> TokenVectors:
+    """
+    Returns the unit length vectors and orth IDs of the
+    tokens of a document. Tokens without a vector keep
+    a zero vector, so they are similar to nothing.
+    """
+    vectors = numpy.zeros((len(doc), doc.vocab.vectors_length), dtype='float32')
+    orths = numpy.zeros(len(doc), dtype='uint64')
+
+    for i, token in enumerate(doc):
+        vectors[i] = token.vector
+        orths[i] = token.orth
+
+    norms = numpy.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = numpy.divide(vectors, norms, out=numpy.zeros_like(vectors), where=norms > 0)
+
+    return TokenVectors(vectors, orths)
+
+
+def boost_similarities(similarities: numpy.ndarray) -> numpy.ndarray:
+    """
+    Doubles similarities over 0.9 and adds half
+    again to similarities over 0.75.
+    """
+    return numpy.where(
+        similarities > 0.9,
+        similarities * 2,
+        numpy.where(similarities > 0.75, similarities * 1.5, similarities)
+    )
+
 
 class ProgramCareer:
     def __init__(self, career_name, career_id, weight=None):
@@ -26,49 +66,45 @@ class ProgramCareerRanker:
         self.careers = career_data
         self.nlp = nlp
 
-    def rank_careers(self):
-        program_name_tokens = self.nlp(self.program_name)
+    def rank_careers(self, program_tokens: TokenVectors = None, career_tokens: Dict[str, TokenVectors] = None):
+        """
+        Weights each career by the boosted similarity of
+        every pair of program and career name tokens,
+        averaged over the number of tokens. The token
+        vectors are parsed here unless they are given.
+        """
+        if not self.careers:
+            return
 
-        for career in self.careers:
-            sim_total = 0.0
+        if program_tokens is None:
+            program_tokens = get_token_vectors(self.nlp(self.program_name))
 
-            career_tokens = self.nlp(career.career_name)
-            for token1 in program_name_tokens:
-                for token2 in career_tokens:
-                    sim = token1.similarity(token2)
-                    if sim > 0.9:
-                        sim_total += sim * 2
-                    elif sim > 0.75:
-                        sim_total += sim * 1.5
-                    else:
-                        sim_total += sim
+        if career_tokens is None:
+            career_tokens = {x.career_name: get_token_vectors(self.nlp(x.career_name)) for x in self.careers}
 
-            career.weight = sim_total / (len(program_name_tokens) + len(career_tokens))
+        tokens = [career_tokens[x.career_name] for x in self.careers]
+        lengths = numpy.array([len(x.orths) for x in tokens])
 
+        vectors = numpy.concatenate([x.vectors for x in tokens])
+        orths = numpy.concatenate([x.orths for x in tokens])
 
-class TokenizedWord:
-    def __init__(self, phrase='', nlp=None):
-        self.phrase = phrase
-        self.nlp = nlp
-        self.__tokenize()
+        # Every program token against every career token at once
+        similarities = program_tokens.vectors @ vectors.T
 
-    def __tokenize(self):
-        self.tokens = self.nlp(self.phrase)
+        # spaCy treats the same word as identical,
+        # whether or not it has a vector
+        similarities[program_tokens.orths[:, None] == orths[None, :]] = 1.0
 
-    def get_similarity(self, tokens) -> float:
-        similarity_total = 0.0
+        totals = numpy.bincount(
+            numpy.repeat(numpy.arange(len(tokens)), lengths),
+            weights=boost_similarities(similarities).sum(axis=0),
+            minlength=len(tokens)
+        )
 
-        for token1 in self.tokens:
-            for token2 in tokens:
-                similarity = token1.similarity(token2)
-                if similarity > 0.9:
-                    similarity_total += similarity * 2
-                elif similarity > 0.75:
-                    similarity_total += similarity * 1.5
-                else:
-                    similarity_total += similarity
+        lengths = lengths + len(program_tokens.orths)
 
-        return similarity_total / (len(self.tokens) + len(tokens))
+        for career, total, length in zip(self.careers, totals, lengths):
+            career.weight = float(total / length) if length else 0.0
 
 
 class Command(BaseCommand):
@@ -78,7 +114,9 @@ class Command(BaseCommand):
         parser.add_argument(
             'search_service_url',
             type=str,
-            help='The base URL of the search service instance the weights are being generated for, e.g. https://search.cm.ucf.edu/api/v1'
+            nargs='?',
+            default=None,
+            help='The base URL of the search service instance the weights are being generated for, e.g. https://search.cm.ucf.edu/api/v1. When omitted, programs are read from the local database.'
         )
 
         parser.add_argument(
@@ -87,10 +125,30 @@ class Command(BaseCommand):
             help='The path where the output CSV file should be written'
         )
 
+        parser.add_argument(
+            '--processes',
+            type=int,
+            dest='processes',
+            help='The number of processes used to parse program and career names.',
+            default=1,
+            required=False
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            help='The number of names parsed at a time.',
+            default=1000,
+            required=False
+        )
+
 
     def handle(self, **options):
-        self.base_url = self.__untrailing_slashit(options['search_service_url'])
+        self.base_url = self.__untrailing_slashit(options['search_service_url']) if options['search_service_url'] else None
         self.output_file = self.__verify_path(options['output_file'])
+        self.processes = options['processes']
+        self.batch_size = options['batch_size']
         self.nlp = spacy.load('en_core_web_lg')
 
         if not self.output_file:
@@ -98,11 +156,18 @@ class Command(BaseCommand):
 
         self.rankers: List[ProgramCareerRanker] = []
 
-        self.stdout.write(self.style.NOTICE("Gathering programs from the search service..."))
-        self.__gather_programs()
+        if self.base_url:
+            self.stdout.write(self.style.NOTICE("Gathering programs from the search service..."))
+            self.__gather_programs()
 
-        self.stdout.write(self.style.NOTICE("Gathering careers from the search service and creating rankers..."))
-        self.__create_rankers()
+            self.stdout.write(self.style.NOTICE("Gathering careers from the search service and creating rankers..."))
+            self.__create_rankers()
+        else:
+            self.stdout.write(self.style.NOTICE("Gathering programs and careers from the database and creating rankers..."))
+            self.__create_local_rankers()
+
+        self.stdout.write(self.style.NOTICE("Parsing program and career names..."))
+        self.__parse_names()
 
         self.stdout.write(self.style.NOTICE("Ranking careers..."))
         self.__weight_jobs()
@@ -154,6 +219,57 @@ class Command(BaseCommand):
                 ProgramCareerRanker(program, careers, self.nlp)
             )
 
+    def __create_local_rankers(self) -> None:
+        """
+        Creates the rankers from the programs and careers
+        in the database, in the same shape the search
+        service returns them.
+        """
+        careers = {}
+
+        jobs = Program.jobs.through.objects.order_by(
+            'program_id', 'jobposition__name'
+        ).values_list(
+            'program_id', 'jobposition__name'
+        )
+
+        for program_id, name in jobs:
+            names = careers.setdefault(program_id, [])
+            if name not in names:
+                names.append(name)
+
+        for program in Program.objects.prefetch_related('colleges__unit_college').order_by('pk'):
+            program_data = {
+                'id': program.pk,
+                'name': program.name,
+                'colleges': [{'name': x.name} for x in program.colleges.all()]
+            }
+
+            self.rankers.append(
+                ProgramCareerRanker(
+                    program_data,
+                    [ProgramCareer(x, None) for x in careers.get(program.pk, [])],
+                    self.nlp
+                )
+            )
+
+    def __pipe(self, texts: List[str]) -> List[TokenVectors]:
+        # Only the tokenizer is needed for token vectors
+        with self.nlp.select_pipes(disable=self.nlp.pipe_names):
+            return [
+                get_token_vectors(x)
+                for x in self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.processes)
+            ]
+
+    def __parse_names(self):
+        """
+        Parses each program name, and each career name
+        once no matter how many programs list it.
+        """
+        self.program_tokens = self.__pipe([x.program_name for x in self.rankers])
+
+        career_names = sorted(set(y.career_name for x in self.rankers for y in x.careers))
+        self.career_tokens = dict(zip(career_names, self.__pipe(career_names)))
 
     def __weight_jobs(self):
         self.bar = Bar(
@@ -161,9 +277,9 @@ class Command(BaseCommand):
             max=len(self.rankers)
         )
 
-        for ranker in self.rankers:
+        for ranker, program_tokens in zip(self.rankers, self.program_tokens):
             self.bar.next()
-            ranker.rank_careers()
+            ranker.rank_careers(program_tokens, self.career_tokens)
 
         self.bar.finish()
 
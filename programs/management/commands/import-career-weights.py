@@ -1,5 +1,8 @@
 from django.core.management.base import BaseCommand, CommandParser, CommandError
-from programs.models import Program, JobPosition, WeightedJobPosition
+from django.db import connections, transaction
+from programs.models import Program, JobPosition, ProgramCareer, WeightedJobPosition
+from programs.utilities.career_rankings import refresh_career_rankings
+from programs.utilities.program_careers import refresh_program_careers
 
 import argparse
 import csv
@@ -65,18 +68,37 @@ class Command(BaseCommand):
         if mime_type != 'text/csv':
             raise CommandError('File provided is not a CSV file')
 
-        # Remove existing records
-        if not self.keep_existing:
-            self.__remove_existing_data()
+        with transaction.atomic():
+            # Remove existing records
+            if not self.keep_existing:
+                self.__remove_existing_data()
 
-        # Import new data
-        self.__import_data(self.file)
+            # Import new data
+            program_ids = self.__import_data(self.file)
+
+        # Weights are written in bulk, which skips the signals
+        # that keep rankings and careers up to date
+        program_ids = None if not self.keep_existing else program_ids
+        refresh_career_rankings(program_ids)
+        refresh_program_careers(program_ids, sources=[ProgramCareer.SOURCE_WEIGHTED])
 
 
     def __remove_existing_data(self):
-        WeightedJobPosition.objects.all().delete()
+        # Deleted with a single DELETE instead of sending a
+        # signal per row, since everything is refreshed once
+        # the import finishes. Nothing references the table.
+        connection = connections[WeightedJobPosition.objects.db]
+
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {0}'.format(
+                connection.ops.quote_name(WeightedJobPosition._meta.db_table)
+            ))
 
     def __import_data(self, csv_file):
+        """
+        Imports every row of the CSV and returns the IDs
+        of the programs whose weights were imported.
+        """
         try:
             csv_reader = csv.DictReader(csv_file, fieldnames=self.fieldnames)
             # Skip the first row
@@ -84,50 +106,82 @@ class Command(BaseCommand):
         except csv.Error:
             raise CommandError('CSV does not have valid headers or is malformed.')
 
+        if not self.using_codefields:
+            self.programs = {str(x): x for x in Program.objects.values_list('pk', flat=True)}
+        else:
+            self.programs = {
+                (plan_code, subplan_code): pk
+                for pk, plan_code, subplan_code in Program.objects.values_list('pk', 'plan_code', 'subplan_code')
+            }
+
+        self.jobs = {}
+        for pk, name in JobPosition.objects.order_by('pk').values_list('pk', 'name'):
+            self.jobs.setdefault(name, pk)
+
+        # Later rows for the same program and job win
+        weights = {}
         for row in csv_reader:
-            self.__add_weighted_job(row)
+            weighted_job = self.__get_weighted_job(row)
+
+            if weighted_job:
+                program_id, job_id, weight = weighted_job
+                weights[(program_id, job_id)] = weight
 
+        existing = {
+            (x.program_id, x.job_id): x
+            for x in WeightedJobPosition.objects.filter(program_id__in=set(x[0] for x in weights))
+        }
 
-    def __add_weighted_job(self, weighted_job):
+        updated = []
+        created = []
+
+        for (program_id, job_id), weight in weights.items():
+            if (program_id, job_id) in existing:
+                record = existing[(program_id, job_id)]
+                record.weight = weight
+                updated.append(record)
+            else:
+                created.append(WeightedJobPosition(program_id=program_id, job_id=job_id, weight=weight))
+
+        WeightedJobPosition.objects.bulk_update(updated, ['weight'], batch_size=500)
+        WeightedJobPosition.objects.bulk_create(created, batch_size=500)
+
+        return set(x[0] for x in weights)
+
+
+    def __get_weighted_job(self, weighted_job):
+        """
+        Returns the program ID, job ID and weight
+        of a row, or None if the program or job
+        cannot be found.
+        """
         if not self.using_codefields:
             program_id = weighted_job['program_id']
+            program_key = program_id
         else:
             plan_code = weighted_job['plan_code']
             subplan_code = weighted_job['subplan_code'] if weighted_job['subplan_code'] != '' else None
+            program_id = f"{plan_code} {subplan_code or ''}".strip()
+            program_key = (plan_code, subplan_code)
 
         career_name = weighted_job['career']
-        weight = self.force_weight if self.force_weight is not None else weighted_job['weight']
+        weight = self.force_weight if self.force_weight is not None else float(weighted_job['weight'])
 
-        program = None
-        job = None
+        program = self.programs.get(program_key)
+        job = self.jobs.get(career_name)
 
-        try:
-            if not self.using_codefields:
-                program = Program.objects.get(id=program_id)
-            else:
-                program = Program.objects.get(plan_code=plan_code, subplan_code=subplan_code)
-                
-        except Program.DoesNotExist:
+        if program is None:
             self.stderr.write(self.style.ERROR(f"Program with id {program_id} does not exist."))
 
-        try:
-            job = JobPosition.objects.get(name=career_name)
-        except JobPosition.DoesNotExist:
+        if job is None:
             if self.using_codefields:
                 job = JobPosition(name=career_name)
                 job.save()
+                job = self.jobs[career_name] = job.pk
             else:
                 self.stderr.write(self.style.ERROR(f"JobPosition with name {career_name} does not exist."))
 
-        if program and job:
-            try:
-                existing = WeightedJobPosition.objects.get(program=program, job=job)
-                existing.weight = weight
-                existing.save()
-            except WeightedJobPosition.DoesNotExist:
-                new_wjp = WeightedJobPosition(
-                    program=program,
-                    job=job,
-                    weight=weight
-                )
-                new_wjp.save()
+        if program is None or job is None:
+            return None
+
+        return program, job, weight
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.conf import settings
 from programs.utilities.oscar import Oscar
 from programs.utilities.catalog_match import CatalogEntry, MatchableProgram
+from programs.utilities.response_cache import invalidate_response_cache
 
 from programs.models import (
     Program,
@@ -188,6 +189,9 @@ class Command(BaseCommand):
             self.__setup_curriculum_processing()
             self.__update_programs()
 
+            # Make sure cached API responses reflect the import
+            invalidate_response_cache()
+
             self.__print_stats()
 
     def __print_stats(self):
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
-from programs.models import CIP
+from programs.models import CIP, ProgramCareer
+from programs.utilities.cip_index import cip_index
+from programs.utilities.program_careers import refresh_program_careers
 
 import argparse
 import csv
@@ -49,6 +51,12 @@ class Command(BaseCommand):
 
             self.create_or_update_cip(title, definition, code)
 
+        # Make sure every process rebuilds its CIP index
+        cip_index.invalidate()
+
+        # Recompute the careers programs get from their occupations
+        self.careers = refresh_program_careers(sources=[ProgramCareer.SOURCE_SOC])
+
 
     def print_stats(self):
         stats = """
@@ -58,10 +66,15 @@ All Finished Importing!
 Processed: {0}
 Created:   {1}
 Updated:   {2}
+
+Program Careers Created: {3}
+Program Careers Deleted: {4}
         """.format(
             self.processed,
             self.created,
-            self.updated
+            self.updated,
+            self.careers['created'],
+            self.careers['deleted']
         )
 
         print(stats)
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 from programs.models import *
+from programs.utilities.import_hashes import ImportHashes
 
 import requests
 import ssl
@@ -31,6 +32,7 @@ Imports URLs for ProgramProfiles from a WordPress blog
     profiles_created = 0
     profiles_updated = 0
     profiles_skipped = 0
+    profiles_unchanged = 0
     profiles_removed = 0
 
     progress_bar = None
@@ -76,6 +78,14 @@ Imports URLs for ProgramProfiles from a WordPress blog
             default=False
         )
 
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            dest='full',
+            help='Reprocesses every degree, including degrees unchanged since the last import.',
+            default=False
+        )
+
     def handle(self, *args, **options):
         self.path = options['path']
         profile_type = options['profile_type']
@@ -83,13 +93,21 @@ Imports URLs for ProgramProfiles from a WordPress blog
         self.plan_code_field = options['plan_code_field']
         self.subplan_code_field = options['subplan_code_field']
         self.remove_stale = options['remove_stale']
+        self.full = options['full']
+        self.found_profiles = []
 
         try:
             self.profile_type = ProgramProfileType.objects.get(name=profile_type)
         except:
             raise CommandError("\"{0}\" is not a valid ProgramProfileType.".format(profile_type))
 
+        self.hashes = ImportHashes(f'import-profiles:{self.profile_type.pk}', full=self.full)
+        self.existing_profiles = {
+            x.program_id: x for x in ProgramProfile.objects.filter(profile_type=self.profile_type)
+        }
+
         self.import_profiles()
+        self.hashes.save()
 
         if self.progress_bar:
             self.progress_bar.finish()
@@ -148,6 +166,20 @@ Imports URLs for ProgramProfiles from a WordPress blog
                 self.degrees_skipped += 1
                 continue
 
+            hash_data = {
+                'link': program['link'],
+                'primary': self.set_primary
+            }
+
+            existing = self.existing_profiles.get(prg_obj.pk)
+
+            if existing and self.hashes.is_unchanged(prg_obj.pk, hash_data):
+                self.found_profiles.append(existing.id)
+                self.profiles_unchanged += 1
+                continue
+
+            self.hashes.update(prg_obj.pk, hash_data)
+
             try:
                 existing = ProgramProfile.objects.get(program=prg_obj, profile_type=self.profile_type)
                 self.found_profiles.append(existing.id)
@@ -185,6 +217,7 @@ Imports URLs for ProgramProfiles from a WordPress blog
             ("Profiles Created", self.profiles_created),
             ("Profiles Updated", self.profiles_updated),
             ("Profiles Skipped (No Update Needed)", self.profiles_skipped),
+            ("Profiles Skipped (Unchanged Since Last Import)", self.profiles_unchanged),
             ("Profiles Removed (Stale)", self.profiles_removed)
         ]
 
@@ -1,8 +1,18 @@
 from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
 from django.utils import timezone
 from django.conf import settings
 from programs.models import *
-
+from programs.utilities.audit_log import bulk_log_changes
+from programs.utilities.import_hashes import ImportHashes
+from programs.utilities.program_careers import refresh_program_careers
+from programs.utilities.program_documents import refresh_program_documents
+from programs.utilities.projection_totals import invalidate_projection_totals
+from programs.utilities.response_cache import invalidate_response_cache
+from programs.utilities.search_index import program_search_index
+from core.utils.autocomplete import autocomplete_index
+
+import copy
 import requests
 from auditlog.context import set_actor
 import re
@@ -30,6 +40,7 @@ class Command(BaseCommand):
     programs_gained_locations = 0
     programs_lost_locations = 0
     programs_updated = 0
+    programs_unchanged = 0
     colleges_added = 0
     departments_added = 0
     # Refers to colleges being removed from a program
@@ -48,6 +59,19 @@ class Command(BaseCommand):
     lost_locations_programs = []
     # A list of inactive programs found in APIM data
     inactive_programs = []
+    # The fields of a program the import sets
+    program_fields = [
+        'name',
+        'valid',
+        'has_locations',
+        'career',
+        'degree',
+        'level',
+        'online',
+        'start_term'
+    ]
+    # The program relationships the import sets
+    relation_fields = ['colleges', 'departments', 'cip']
 
     def add_arguments(self, parser):
         parser.add_argument('path', type=str, help='The url of the APIM API.')
@@ -86,6 +110,15 @@ class Command(BaseCommand):
             required=False
         )
 
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            dest='full',
+            help='Reprocesses every plan, including plans unchanged since the last import.',
+            default=False,
+            required=False
+        )
+
     def handle(self, *args, **options):
         self.new_modified_date = timezone.now()
         path = options['path']
@@ -93,6 +126,7 @@ class Command(BaseCommand):
         self.use_internal_mapping = options['use_internal_mapping']
         self.list_inactive = options['list_inactive']
         self.cip_version = options['cip_version']
+        self.full = options['full']
         response = requests.get(path)
         self.actor_id = getattr(settings, 'IMPORT_USER_ID', 1)
 
@@ -100,58 +134,292 @@ class Command(BaseCommand):
             mapping_resp = requests.get(mapping_path)
             self.mappings = mapping_resp.json()
         elif self.use_internal_mapping:
-            self.mappings = CollegeOverride.objects.all()
+            self.mappings = list(CollegeOverride.objects.select_related('college'))
         else:
             self.mappings = None
 
         with set_actor(self.actor_id):
             data = response.json()
 
-            # Create/update programs from feed data
-            for d in data:
-                if self.program_is_valid(d):
-                    program = self.add_program(d)
-
-                    if len(d['SubPlans']) > 0:
-                        for sp in d['SubPlans']:
-                            if self.subplan_is_valid(sp):
-                                self.add_subplan(sp, program)
-                            else:
-                                self.programs_skipped += 1
-                else:
-                    self.programs_skipped += 1
-
-            self.invalidate_stale_programs()
-            self.__create_import_record()
+            with transaction.atomic():
+                self.__load_existing_data()
+
+                # Create/update programs from feed data
+                for d in data:
+                    if self.program_is_valid(d):
+                        if self.program_is_unchanged(d):
+                            continue
+
+                        program = self.add_program(d)
+
+                        if len(d['SubPlans']) > 0:
+                            for sp in d['SubPlans']:
+                                if self.subplan_is_valid(sp):
+                                    self.add_subplan(sp, program)
+                                else:
+                                    self.programs_skipped += 1
+                    else:
+                        self.programs_skipped += 1
+
+                self.__save_programs()
+                self.__save_hashes()
+                self.invalidate_stale_programs()
+                self.__write_audit_log()
+                self.__create_import_record()
+
+            self.__refresh_program_data()
+
+            # Make sure cached API responses reflect the import
+            invalidate_response_cache()
             self.print_results()
 
             return 0
 
+    def __load_existing_data(self):
+        """
+        Loads the lookup tables, every existing program
+        and the program relationships the import manages,
+        so records are matched and diffed in memory.
+        """
+        self.programs = []
+        self.revalidated_programs = []
+        self.invalidated_programs = []
+        self.gained_locations_programs = []
+        self.lost_locations_programs = []
+        self.inactive_programs = []
+
+        self.career_lookup = self.__get_lookup(Career, lambda x: (x.name, x.abbr))
+        self.degree_lookup = self.__get_lookup(Degree, lambda x: x.name)
+        self.level_lookup = self.__get_lookup(Level, lambda x: x.name)
+        self.college_lookup = self.__get_lookup(College, lambda x: (x.full_name, x.short_name))
+        self.department_lookup = self.__get_lookup(Department, lambda x: x.full_name)
+        self.term_lookup = self.__get_lookup(AcademicTerm, lambda x: x.full_name)
+        self.cip_lookup = self.__get_lookup(CIP.objects.filter(version=self.cip_version), lambda x: x.code)
+
+        self.colleges_by_pk = {x.pk: x for x in self.college_lookup.values()}
+        self.departments_by_pk = {x.pk: x for x in self.department_lookup.values()}
+        self.cip_versions = dict(CIP.objects.values_list('pk', 'version'))
+
+        # Programs keyed by their plan and subplan codes
+        self.existing_programs = {}
+        self.original_programs = {}
+
+        # Related objects are loaded up front for the audit log
+        programs = Program.objects.select_related(
+            'level',
+            'career',
+            'degree',
+            'parent_program',
+            'active_comments_author',
+            'start_term'
+        ).order_by('pk')
+
+        for program in programs:
+            self.existing_programs.setdefault((program.plan_code, program.subplan_code), program)
+            self.original_programs[program.pk] = copy.copy(program)
+
+        self.all_programs = list(self.existing_programs.values())
+
+        # The related IDs of each program, and the
+        # through records that relate them
+        self.existing_relations = {}
+
+        for field_name in self.relation_fields:
+            field = Program._meta.get_field(field_name)
+            column = f'{field.m2m_reverse_field_name()}_id'
+            relations = self.existing_relations[field_name] = {}
+
+            for pk, program_id, related_id in field.remote_field.through.objects.values_list('pk', 'program_id', column):
+                relations.setdefault(program_id, {})[related_id] = pk
+
+        self.hashes = ImportHashes('import-programs', full=self.full)
+        self.processed_records = []
+        self.unchanged_programs = []
+
+        self.processed_programs = {}
+        self.created_programs = []
+        self.updated_programs = []
+        self.relations = {}
+
+    def __get_lookup(self, queryset, get_key) -> dict:
+        if not isinstance(queryset, models.QuerySet):
+            queryset = queryset.objects.all()
+
+        lookup = {}
+
+        for obj in queryset.order_by('pk'):
+            lookup.setdefault(get_key(obj), obj)
+
+        return lookup
+
+    def __get_or_create(self, lookup, key, model, **fields):
+        """
+        Returns the object in the lookup with the given
+        key, creating it if it does not exist yet.
+        """
+        if key not in lookup:
+            lookup[key] = model.objects.create(**fields)
+
+        return lookup[key]
+
+    def __get_relation(self, key, program, field_name) -> set:
+        """
+        Returns the related IDs of a program, as set by this
+        import so far or as they exist in the database.
+        """
+        if key in self.relations:
+            return set(self.relations[key][field_name])
+
+        if program.pk is None:
+            return set()
+
+        return set(self.existing_relations[field_name].get(program.pk, {}).keys())
+
+    def __save_programs(self):
+        """
+        Writes new programs, the changed fields of existing
+        programs and changed relationships in bulk.
+        """
+        # Subplans are created once their parent programs have IDs
+        self.__bulk_create_programs([x for x in self.created_programs if x.subplan_code is None])
+        self.__bulk_create_programs([x for x in self.created_programs if x.subplan_code is not None])
+
+        ProgramAuditData.objects.bulk_create([
+            ProgramAuditData(program=x, jobs_source='') for x in self.created_programs
+        ], batch_size=500)
+
+        created_ids = set(x.pk for x in self.created_programs)
+        created_through = {x: [] for x in self.relation_fields}
+        deleted_through = {x: [] for x in self.relation_fields}
+
+        for key, program in self.processed_programs.items():
+            changed = False
+
+            for field_name in self.relation_fields:
+                field = Program._meta.get_field(field_name)
+                through = field.remote_field.through
+                existing = self.existing_relations[field_name].get(program.pk, {})
+                related_ids = self.relations[key][field_name]
+
+                for related_id in related_ids - set(existing.keys()):
+                    created_through[field_name].append(
+                        through(**{'program_id': program.pk, f'{field.m2m_reverse_field_name()}_id': related_id})
+                    )
+                    changed = True
+
+                for related_id in set(existing.keys()) - related_ids:
+                    deleted_through[field_name].append(existing[related_id])
+                    changed = True
+
+            if program.pk in created_ids:
+                continue
+
+            original = self.original_programs[program.pk]
+
+            if changed or any(
+                getattr(program, Program._meta.get_field(x).attname) != getattr(original, Program._meta.get_field(x).attname)
+                for x in self.program_fields
+            ):
+                program.modified = self.new_modified_date
+                self.updated_programs.append(program)
+
+        Program.objects.bulk_update(self.updated_programs, self.program_fields + ['modified'], batch_size=500)
+
+        for field_name in self.relation_fields:
+            through = Program._meta.get_field(field_name).remote_field.through
+            pks = deleted_through[field_name]
+
+            for i in range(0, len(pks), 500):
+                through.objects.filter(pk__in=pks[i:i + 500]).delete()
+
+            through.objects.bulk_create(created_through[field_name], batch_size=500)
+
+        self.programs = [x.pk for x in self.processed_programs.values()] + [x.pk for x in self.unchanged_programs]
+
+    def __save_hashes(self):
+        for program, hash_data in self.processed_records:
+            self.hashes.update(program.pk, hash_data)
+
+        self.hashes.save()
+
+    def __bulk_create_programs(self, programs):
+        if not programs:
+            return
+
+        last_pk = Program.objects.aggregate(last_pk=models.Max('pk'))['last_pk'] or 0
+
+        Program.objects.bulk_create(programs, batch_size=500)
+
+        # Not every database returns the IDs of bulk created rows
+        if any(x.pk is None for x in programs):
+            pks = {
+                (plan_code, subplan_code): pk
+                for pk, plan_code, subplan_code in Program.objects.filter(
+                    pk__gt=last_pk
+                ).values_list('pk', 'plan_code', 'subplan_code')
+            }
+
+            for program in programs:
+                program.pk = pks[(program.plan_code, program.subplan_code)]
+
+    def __write_audit_log(self):
+        """
+        Writes the audit log entries model signals would
+        have written had programs been saved one by one.
+        """
+        changes = [(None, x) for x in self.created_programs]
+        changes += [
+            (self.original_programs[x.pk], x)
+            for x in self.updated_programs + self.invalidated_program_objects
+        ]
+
+        bulk_log_changes(changes, actor_id=self.actor_id)
+
+    def __refresh_program_data(self):
+        """
+        Refreshes the search index, search documents
+        and careers of changed programs, which are
+        kept up to date by signals bulk writes skip.
+        """
+        program_ids = set(
+            x.pk for x in self.created_programs + self.updated_programs + self.invalidated_program_objects
+        )
+
+        # Search documents include the parent program
+        # and subplans of a program
+        related_ids = set(program_ids)
+
+        for program in self.all_programs + self.created_programs:
+            if program.pk in program_ids and program.parent_program_id:
+                related_ids.add(program.parent_program_id)
+            elif program.parent_program_id in program_ids:
+                related_ids.add(program.pk)
+
+        program_search_index.index_programs(program_ids)
+        refresh_program_documents(related_ids)
+        refresh_program_careers(program_ids, sources=[ProgramCareer.SOURCE_SOC])
+        invalidate_projection_totals()
+        autocomplete_index.invalidate()
+
     def __create_import_record(self):
         """
         Creates a record of the import and stats
         for use in the Communicator Dashboard
         """
         try:
-            record = ProgramImportRecord.objects.create(
-                start_date_time = self.new_modified_date,
-                end_date_time = timezone.now(),
-                programs_processed = self.programs_processed,
-            )
-
-            record.save()
-
-            record.programs_created.set(Program.objects.filter(
-                created__gte=self.new_modified_date
-            ))
+            with transaction.atomic():
+                record = ProgramImportRecord.objects.create(
+                    start_date_time = self.new_modified_date,
+                    end_date_time = timezone.now(),
+                    programs_processed = self.programs_processed,
+                )
 
-            record.programs_modified.set(Program.objects.filter(
-                created__lt=self.new_modified_date,
-                modified__gte=self.new_modified_date
-            ))
+                record.save()
 
-            record.programs_invalidated.set(self.invalidated_programs)
-            record.programs_revalidated.set(self.revalidated_programs)
+                record.programs_created.set(self.created_programs)
+                record.programs_modified.set(self.updated_programs + self.invalidated_program_objects)
+                record.programs_invalidated.set(self.invalidated_programs)
+                record.programs_revalidated.set(self.revalidated_programs)
 
             self.stdout.write(self.style.SUCCESS("Successfully wrote import record!"))
 
@@ -260,26 +528,88 @@ class Command(BaseCommand):
         return program_name
 
 
+    def get_college_mapping(self, plan_code):
+        """
+        Returns the full and short name of the college
+        a plan is mapped to, if it is mapped to one.
+        """
+        if not self.mappings:
+            return None
+
+        if self.use_internal_mapping:
+            mapping = [x for x in self.mappings if x.plan_code == plan_code and x.subplan_code == None]
+
+            return (mapping[0].college.full_name, mapping[0].college.short_name) if mapping else None
+
+        mapping = [x for x in self.mappings['programs'] if x['plan_code'] == plan_code and x['subplan_code'] == None]
+
+        return (mapping[0]['college']['name'], mapping[0]['college']['short_name']) if mapping else None
+
+    def get_hash_data(self, data):
+        """
+        Returns everything a plan and its subplans are
+        imported from: the APIM data, the college it is
+        mapped to and the CIP it resolves to.
+        """
+        cip = self.cip_lookup.get(data['CIP']) if data['CIP'] else None
+
+        return {
+            'data': data,
+            'college_mapping': self.get_college_mapping(data['Plan']),
+            'cip': cip.pk if cip else None
+        }
+
+    def program_is_unchanged(self, data):
+        """
+        Returns whether a plan and its subplans are unchanged
+        since the last import. Unchanged programs are counted
+        as processed, so they are not invalidated.
+        """
+        subplans = [x for x in data['SubPlans'] if self.subplan_is_valid(x)]
+        programs = [self.existing_programs.get((data['Plan'], None))] + [
+            self.existing_programs.get((data['Plan'], x['Subplan'])) for x in subplans
+        ]
+
+        if any(x is None or x.pk is None or not x.valid for x in programs):
+            return False
+
+        if not self.hashes.is_unchanged(programs[0].pk, self.get_hash_data(data)):
+            return False
+
+        self.unchanged_programs += programs
+        self.programs_processed += len(programs)
+        self.programs_unchanged += len(programs)
+        self.programs_skipped += len(data['SubPlans']) - len(subplans)
+
+        return True
+
     def add_program(self, data):
         program = None
         self.programs_processed += 1
         program_exists = False
+        hash_data = copy.deepcopy(self.get_hash_data(data))
 
         # Correct college name issue
         data['College_Full'] = self.common_replace(data['College_Full'])
 
-        try:
-            program = Program.objects.get(plan_code=data['Plan'], subplan_code__isnull=True)
+        key = (data['Plan'], None)
+        program = self.existing_programs.get(key)
+
+        if program is not None:
             program.name = unidecode(data['PlanName'])
             self.programs_updated += 1
             program_exists = True
-        except Program.DoesNotExist:
+        else:
             program = Program(
                 name=unidecode(data['PlanName']),
                 plan_code=data['Plan']
             )
+            self.existing_programs[key] = program
+            self.created_programs.append(program)
             self.programs_added += 1
 
+        self.processed_records.append((program, hash_data))
+
         # Ensure the program is marked as valid
         if not program.valid:
             program.valid = True
@@ -307,15 +637,13 @@ class Command(BaseCommand):
         # what other downstream effects this will have.
         abbr = data['Career'] if not career == 'Professional' else 'PROF'
 
-        career, created = Career.objects.get_or_create(
-            name=career, abbr=abbr
+        program.career = self.__get_or_create(
+            self.career_lookup, (career, abbr), Career, name=career, abbr=abbr
         )
 
-        program.career = career
-
         # Handle degree
-        degree, created = Degree.objects.get_or_create(
-            name=data['Meta Data'][0]['Degree']
+        degree = self.__get_or_create(
+            self.degree_lookup, data['Meta Data'][0]['Degree'], Degree, name=data['Meta Data'][0]['Degree']
         )
 
         program.degree = degree
@@ -330,116 +658,88 @@ class Command(BaseCommand):
         else:
             temp_level = data['Level']
 
-        level, created = Level.objects.get_or_create(name=temp_level)
-
-        program.level = level
+        program.level = self.__get_or_create(self.level_lookup, temp_level, Level, name=temp_level)
 
         if self.program_is_online(data):
             program.online = True
 
         program.name = self.set_program_name(program)
 
-        program.save()
-
-        self.programs.append(program.id)
-
-        mapping = None
-
-        if self.mappings:
-            if self.use_internal_mapping:
-                try:
-                    mapping = self.mappings.filter(plan_code=data['Plan'], subplan_code=None)
-                except:
-                    mapping = None
-            else:
-                mapping = [x for x in self.mappings['programs'] if x['plan_code'] == data['Plan'] and x['subplan_code'] == None]
+        mapping = self.get_college_mapping(data['Plan'])
 
         if mapping:
-            if self.use_internal_mapping:
-                mapping = mapping[0]
-                data['College_Full'] = mapping.college.full_name
-                data['CollegeShort'] = mapping.college.short_name
-            else:
-                mapping = mapping[0]
-                data['College_Full'] = mapping['college']['name']
-                data['CollegeShort'] = mapping['college']['short_name']
+            data['College_Full'], data['CollegeShort'] = mapping
 
 
         # Handle Colleges
-        college, create = College.objects.get_or_create(
+        college_key = (data['College_Full'], data['CollegeShort'])
+
+        if college_key not in self.college_lookup:
+            self.colleges_added += 1
+
+        college = self.__get_or_create(
+            self.college_lookup,
+            college_key,
+            College,
             full_name=data['College_Full'],
             short_name=data['CollegeShort']
         )
-
-        program.colleges.add(college)
-
-        college_removed = False
+        self.colleges_by_pk[college.pk] = college
 
         # Remove non-primary colleges
-        for c in program.colleges.all():
-            if c.short_name != college.short_name:
-                program.colleges.remove(c)
-                if college_removed == False:
-                    college_removed = True
-
+        existing_colleges = self.__get_relation(key, program, 'colleges')
+        colleges = set(
+            x for x in existing_colleges if self.colleges_by_pk[x].short_name == college.short_name
+        ) | {college.pk}
 
-        if college_removed:
+        if existing_colleges - colleges:
             self.colleges_changed += 1
 
         # Handle Departments
-        department, create = Department.objects.get_or_create(
-            full_name=data['Dept_Full']
+        if data['Dept_Full'] not in self.department_lookup:
+            self.departments_added += 1
+
+        department = self.__get_or_create(
+            self.department_lookup, data['Dept_Full'], Department, full_name=data['Dept_Full']
         )
+        self.departments_by_pk[department.pk] = department
 
-        if "school" in department.full_name.lower():
+        if "school" in department.full_name.lower() and not department.school:
             department.school = True
             department.save()
 
-        program.departments.add(department)
-
-        department_removed = False
+        existing_departments = self.__get_relation(key, program, 'departments')
+        departments = set(
+            x for x in existing_departments if self.departments_by_pk[x].full_name == department.full_name
+        ) | {department.pk}
 
-        for d in program.departments.all():
-            if d.full_name != department.full_name:
-                program.departments.remove(d)
-                if department_removed == False:
-                    department_removed = True
-
-        if department_removed:
+        if existing_departments - departments:
             self.departments_changed += 1
 
         # Remove any existing relationship to a current-version CIP
         # if it exists (in case the CIP changed in this import
         # for some reason).
-        existing_cips = program.cip.filter(version=self.cip_version)
-        if existing_cips.exists():
-            program.cip.remove(*existing_cips)
+        cips = set(
+            x for x in self.__get_relation(key, program, 'cip') if self.cip_versions[x] != self.cip_version
+        )
 
         # Add an existing, current-version CIP object to the program.
-        if data['CIP']:
-            try:
-                cip = CIP.objects.get(version=self.cip_version, code=data['CIP'])
-                program.cip.add(cip)
-            except CIP.DoesNotExist:
-                pass
+        if data['CIP'] and data['CIP'] in self.cip_lookup:
+            cips.add(self.cip_lookup[data['CIP']].pk)
 
         if data['Meta Data'][0]['TermStart'] is not None:
             term_start_full = data['Meta Data'][0]['TermStart'];
-            academic_term = None
-
-            try:
-                academic_term = AcademicTerm.objects.get(full_name=term_start_full)
-            except AcademicTerm.DoesNotExist:
-                academic_term = AcademicTerm(full_name=term_start_full)
-                academic_term.save()
-
-            if academic_term is not None:
-                program.start_term = academic_term
 
+            program.start_term = self.__get_or_create(
+                self.term_lookup, term_start_full, AcademicTerm, full_name=term_start_full
+            )
 
-        program.modified = self.new_modified_date
-
-        program.save()
+        self.processed_programs[key] = program
+        self.relations[key] = {
+            'colleges': colleges,
+            'departments': departments,
+            'cip': cips
+        }
 
         return program
 
@@ -448,22 +748,22 @@ class Command(BaseCommand):
         self.programs_processed += 1
         program_exists = False
 
-        try:
-            program = Program.objects.get(
-                plan_code=parent.plan_code,
-                subplan_code=data['Subplan']
-            )
+        key = (parent.plan_code, data['Subplan'])
+        program = self.existing_programs.get(key)
 
+        if program is not None:
             program.name = unidecode(data['Subplan_Name'])
             self.programs_updated += 1
             program_exists = True
-        except Program.DoesNotExist:
+        else:
             program = Program(
                 name=unidecode(data['Subplan_Name']),
                 plan_code=parent.plan_code,
                 subplan_code=data['Subplan'],
                 parent_program=parent
             )
+            self.existing_programs[key] = program
+            self.created_programs.append(program)
             self.programs_added += 1
 
         # Ensure the program is marked as valid
@@ -491,68 +791,40 @@ class Command(BaseCommand):
         program.level = parent.level
 
         # Handle degree
-        degree, created = Degree.objects.get_or_create(
-            name=data['Meta Data'][0]['Degree']
+        program.degree = self.__get_or_create(
+            self.degree_lookup, data['Meta Data'][0]['Degree'], Degree, name=data['Meta Data'][0]['Degree']
         )
 
-        program.degree = degree
-
         if self.program_is_online(data):
             program.online = True
 
-        program.save()
-
-        self.programs.append(program.id)
+        parent_relations = self.relations[(parent.plan_code, None)]
 
         # Handle CIP. Subplans should always use the
         # parent program's CIP(s)
-        for cip in parent.cip.all():
-            program.cip.add(cip)
-
-        # Handle Colleges and Departments
-        for college in parent.colleges.all():
-            program.colleges.add(college)
-
-        college_removed = False
-
-        # Remove non-primary colleges
-        for college in program.colleges.exclude(pk__in=parent.colleges.all().values_list('pk', flat=True)):
-            program.colleges.remove(college)
-            college_removed = True
+        cips = self.__get_relation(key, program, 'cip') | parent_relations['cip']
 
-        if college_removed:
+        # Handle Colleges and Departments, removing
+        # any the parent program does not have
+        if self.__get_relation(key, program, 'colleges') - parent_relations['colleges']:
             self.colleges_changed += 1
 
-        for department in parent.departments.all():
-            program.departments.add(department)
-
-        department_removed = False
-
-        # Remove non-primary departments
-        for department in program.departments.exclude(pk__in=parent.departments.all().values_list('pk', flat=True)):
-            program.departments.remove(department)
-            department_removed = True
-
-        if department_removed:
+        if self.__get_relation(key, program, 'departments') - parent_relations['departments']:
             self.departments_changed += 1
 
         if data['Meta Data'][0]['TermStart'] is not None:
             term_start_full = data['Meta Data'][0]['TermStart'];
-            academic_term = None
 
-            try:
-                academic_term = AcademicTerm.objects.get(full_name=term_start_full)
-            except AcademicTerm.DoesNotExist:
-                academic_term = AcademicTerm(full_name=term_start_full)
-                academic_term.save()
-
-            if academic_term is not None:
-                program.start_term = academic_term
-
-
-        program.modified = self.new_modified_date
+            program.start_term = self.__get_or_create(
+                self.term_lookup, term_start_full, AcademicTerm, full_name=term_start_full
+            )
 
-        program.save()
+        self.processed_programs[key] = program
+        self.relations[key] = {
+            'colleges': set(parent_relations['colleges']),
+            'departments': set(parent_relations['departments']),
+            'cip': cips
+        }
 
     def program_is_online(self, data):
         """
@@ -590,17 +862,20 @@ class Command(BaseCommand):
         """
         Invalidate all programs not processed during the import
         """
-        stale_programs = Program.objects.filter(
-            valid=True,
-            modified__lt=self.new_modified_date
-        )
+        processed = set(x.pk for x in list(self.processed_programs.values()) + self.unchanged_programs)
+
+        self.invalidated_program_objects = [
+            x for x in self.all_programs if x.valid and x.pk not in processed
+        ]
 
-        for program in stale_programs:
+        for program in self.invalidated_program_objects:
             program.valid = False
-            program.save()
+            program.modified = self.new_modified_date
             self.invalidated_programs.append(program.pk)
 
-        self.programs_invalidated += stale_programs.count()
+        Program.objects.bulk_update(self.invalidated_program_objects, ['valid', 'modified'], batch_size=500)
+
+        self.programs_invalidated += len(self.invalidated_program_objects)
 
     def print_results(self):
         """
@@ -611,6 +886,7 @@ class Command(BaseCommand):
             ('Programs Processed', self.programs_processed),
             ('Programs Created', self.programs_added),
             ('Programs Updated', self.programs_updated),
+            ('Programs Unchanged', self.programs_unchanged),
             ('Programs Invalidated', self.programs_invalidated),
             ('Programs Revalidated', self.programs_revalidated),
             ('Programs that Gained Active Locations', self.programs_gained_locations),
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 from programs.models import *
+from programs.utilities.program_careers import refresh_program_careers
 
 import argparse
 import decimal
@@ -79,6 +80,9 @@ class Command(BaseCommand):
         # Assigns the projection data to records
         self.assign_projections()
 
+        # Recompute the careers programs get from their occupations
+        self.careers = refresh_program_careers(sources=[ProgramCareer.SOURCE_SOC])
+
         # Print results
         self.print_results()
 
@@ -187,12 +191,19 @@ Projection records skipped:   {2}
 
 Job Positions Created:        {3}
 Job Positions Assigned:       {4}
+
+-----------------------------------
+
+Program Careers Created:      {5}
+Program Careers Deleted:      {6}
         """.format(
             self.projection_count,
             self.projections_added,
             self.projections_skipped,
             self.jobs_added,
-            self.jobs_assigned
+            self.jobs_assigned,
+            self.careers['created'],
+            self.careers['deleted']
         )
 
         print(retval)
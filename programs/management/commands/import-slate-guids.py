@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
 from programs.models import *
+from programs.utilities.program_documents import refresh_program_documents
+from programs.utilities.response_cache import invalidate_response_cache
 
 import decimal
 import itertools
@@ -22,6 +24,7 @@ class Command(BaseCommand):
     guid_data = []
     rows_matched_count = 0
     rows_skipped_count = 0
+    rows_unchanged_count = 0
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -44,10 +47,20 @@ class Command(BaseCommand):
             default=logging.WARNING,
             required=False
         )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Saves every matched program, including programs whose GUID is unchanged.',
+            dest='full',
+            default=False,
+            required=False
+        )
 
     def handle(self, *args, **options):
         self.career = 'Graduate' if options['graduate'] is True else 'Undergraduate'
         self.loglevel = options['loglevel']
+        self.full = options['full']
+        self.programs_matched = set()
 
         # Set logging level
         logging.basicConfig(stream=sys.stdout, level=self.loglevel)
@@ -110,29 +123,11 @@ class Command(BaseCommand):
         """
         Handles assignment of GUIDs to programs by career type.
         """
-        # If we have new GUID data to process, delete any existing data.
+        # If we have new GUID data to process, existing GUIDs
+        # missing from it are cleared once it is assigned.
         # Otherwise, abort this process:
         if len(self.guid_data):
-            print((
-                (
-                    'Deleting all existing GUID values '
-                    'for {0} Programs.'
-                ).format(
-                    self.career
-                )
-            ))
-
-            # Clear existing GUIDs on all programs in self.programs:
-            if self.programs_count:
-                if self.career == 'Undergraduate':
-                    # Add logic here if/when we get access to
-                    # undergraduate Slate IDs:
-                    pass
-                else:
-                    self.programs.update(
-                        graduate_slate_id=None
-                    )
-            else:
+            if not self.programs_count:
                 print (
                     'No programs to process. Assignment of new '
                     'GUIDs aborted.'
@@ -163,7 +158,9 @@ class Command(BaseCommand):
         Handles assignment of GUIDs from `self.guid_data` for
         Graduate Programs.
         """
-        career = Career.objects.get(name=self.career)
+        programs = {}
+        for program in self.programs:
+            programs.setdefault((program.plan_code, program.subplan_code), program)
 
         for row in self.guid_data:
             # If any of these keys are missing, skip!
@@ -178,13 +175,9 @@ class Command(BaseCommand):
 
             # Make sure the program specified in this row of data
             # is valid before proceeding any further:
-            try:
-                program = Program.objects.get(
-                    plan_code=plan_code,
-                    subplan_code=subplan_code,
-                    career=career
-                )
-            except Program.DoesNotExist:
+            program = programs.get((plan_code, subplan_code))
+
+            if program is None:
                 logging.warning(
                     (
                         'Cannot find existing {0} Program with plan '
@@ -199,8 +192,12 @@ class Command(BaseCommand):
                 )
                 self.rows_skipped_count += 1
             else:
-                program.graduate_slate_id = guid
-                program.save()
+                # Only save programs whose GUID changed
+                if not self.full and program.graduate_slate_id == guid:
+                    self.rows_unchanged_count += 1
+                else:
+                    program.graduate_slate_id = guid
+                    program.save()
 
                 self.rows_matched_count += 1
                 self.programs_matched.add(program)
@@ -217,6 +214,31 @@ class Command(BaseCommand):
                     )
                 )
 
+        print((
+            (
+                'Clearing GUID values of {0} Programs '
+                'missing from the GUID data.'
+            ).format(
+                self.career
+            )
+        ))
+
+        cleared = list(
+            self.programs.exclude(
+                pk__in=[x.pk for x in self.programs_matched]
+            ).exclude(
+                graduate_slate_id=None
+            ).values_list('pk', flat=True)
+        )
+
+        if cleared:
+            Program.objects.filter(pk__in=cleared).update(graduate_slate_id=None)
+
+            # The GUIDs are cleared in bulk, which does not send the
+            # signals that refresh documents and clear the cache
+            refresh_program_documents(cleared)
+            invalidate_response_cache()
+
     def print_results(self):
         print((
             'Finished import of {0} Program GUID data.'
@@ -255,3 +277,10 @@ class Command(BaseCommand):
             self.rows_skipped_count,
             self.career
         ))
+
+        print((
+            'Left {0} unchanged {1} GUIDs as they were.'
+        ).format(
+            self.rows_unchanged_count,
+            self.career
+        ))
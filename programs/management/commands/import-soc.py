@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 from programs.models import *
+from programs.utilities.program_careers import refresh_program_careers
 
 import logging
 import sys
@@ -71,6 +72,9 @@ class Command(BaseCommand):
         # Assign outcome data to existing programs:
         self.assign_socs()
 
+        # Recompute the careers programs get from their occupations
+        self.careers = refresh_program_careers(sources=[ProgramCareer.SOURCE_SOC])
+
         # Print results
         self.print_results()
 
@@ -133,3 +137,5 @@ class Command(BaseCommand):
         print('Created:   {0} ({1}%)'.format(self.socs_added, round(created_percent)))
         print('Updated:   {0} ({1}%)'.format(self.socs_updated, round(updated_percent)))
         print('Skipped:   {0} ({1}%)'.format(self.socs_skipped, round(skipped_percent)))
+        print('\nProgram careers created: {0}'.format(self.careers['created']))
+        print('Program careers deleted: {0}'.format(self.careers['deleted']))
@@ -1,7 +1,15 @@
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
 from programs.models import *
+from programs.utilities.audit_log import bulk_log_changes
+from programs.utilities.import_hashes import ImportHashes
+from programs.utilities.program_documents import refresh_program_documents
+from programs.utilities.response_cache import invalidate_response_cache
+from core.utils.http_client import ConcurrentClient
 
 from urllib.parse import urlencode
+import copy
 import requests
 import json
 import re
@@ -15,21 +23,60 @@ class Command(BaseCommand):
     program_count = 0
     program_skipped = 0
     update_count = 0
+    unchanged_count = 0
     mapping_found = 0
 
     def add_arguments(self, parser):
         parser.add_argument('path', type=str, help='The url of the Student Accounts tuition feed')
 
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            dest='full',
+            help='Updates every program, including programs whose tuition is unchanged since the last import.',
+            default=False,
+            required=False
+        )
+
+        parser.add_argument(
+            '--threads',
+            type=int,
+            dest='threads',
+            help='The number of fee schedules to fetch at once.',
+            default=8,
+            required=False
+        )
+
+        parser.add_argument(
+            '--retries',
+            type=int,
+            dest='retries',
+            help='The number of times a failed request is retried.',
+            default=3,
+            required=False
+        )
+
     def handle(self, *args, **options):
         path = options['path']
+        self.full = options['full']
+        self.fee_schedules = {}
+
+        self.mappings = list(TuitionOverride.objects.prefetch_related('required_fees'))
 
-        self.mappings = TuitionOverride.objects.all()
+        # Overrides are looked up by tuition code when summing
+        # fees and by plan and subplan code when updating programs
+        self.tuition_code_mappings = self.get_mapping_index(lambda x: x.tuition_code)
+        self.program_mappings = self.get_mapping_index(lambda x: (x.plan_code, x.subplan_code))
 
-        # Set the fee_schedules to the array
-        self.set_fee_schedules(path)
+        with ConcurrentClient(max_workers=options['threads'], retries=options['retries']) as self.client:
+            try:
+                # Set the fee_schedules to the array
+                self.set_fee_schedules(path)
 
-        # Set the data for each fee_schedule
-        self.set_fee_data(path)
+                # Set the data for each fee_schedule
+                self.set_fee_data(path)
+            except requests.RequestException as e:
+                raise CommandError(f"Unable to fetch tuition data: {e}")
 
         # Update programs
         self.update_programs()
@@ -37,6 +84,20 @@ class Command(BaseCommand):
         # Print Results
         self.print_results()
 
+    def get_mapping_index(self, get_key) -> dict:
+        """
+        Returns the overrides keyed by the given key.
+        Keys shared by more than one override map to
+        None, so neither is used.
+        """
+        index = {}
+
+        for mapping in self.mappings:
+            key = get_key(mapping)
+            index[key] = None if key in index else mapping
+
+        return index
+
     def set_fee_schedules(self, path):
         query = urlencode({
             'schoolYear': 'current'
@@ -44,9 +105,7 @@ class Command(BaseCommand):
 
         request_url = '{0}?{1}'.format(path, query)
 
-        response = requests.get(request_url)
-
-        schedules = response.json()
+        schedules = self.client.get_json(request_url)
 
         for schedule in schedules:
             if schedule['Program'] not in list(self.fee_schedules.keys()) \
@@ -59,6 +118,8 @@ class Command(BaseCommand):
                 }
 
     def set_fee_data(self, path):
+        request_urls = {}
+
         for schedule in self.fee_schedules:
             values = self.fee_schedules[schedule]
 
@@ -68,13 +129,12 @@ class Command(BaseCommand):
                 'feeType'   : values['type']
             })
 
-            request_url = '{0}?{1}'.format(path, query)
-
-            response = requests.get(request_url)
-
-            data = response.json()
+            request_urls[schedule] = ('{0}?{1}'.format(path, query), None)
 
+        for schedule, data in self.client.get_json_many(request_urls).items():
+            # Schedules without fees have no tuition to set
             if len(data) == 0:
+                del self.fee_schedules[schedule]
                 continue
 
             resident = 0
@@ -94,10 +154,7 @@ class Command(BaseCommand):
         fee_name = fee['FeeName']
 
         # Find a mapping if there is one
-        try:
-            mapping = self.mappings.get(tuition_code=fee['Program'])
-        except:
-            mapping = None
+        mapping = self.tuition_code_mappings.get(fee['Program'])
 
         # Check mappings
         if mapping:
@@ -109,15 +166,15 @@ class Command(BaseCommand):
         return '(Per Hour)' not in fee_name and '(Per Term)' not in fee_name and '(Annual)' not in fee_name
 
     def update_programs(self):
-        programs = Program.objects.all()
+        programs = Program.objects.select_related('level')
         self.program_count = programs.count()
+        hashes = ImportHashes('import-tuition', full=self.full)
+        modified = timezone.now()
+        changes = []
 
         for program in programs:
             # Check for skip override
-            try:
-                mapping = self.mappings.get(plan_code=program.plan_code, subplan_code=program.subplan_code)
-            except:
-                mapping = None
+            mapping = self.program_mappings.get((program.plan_code, program.subplan_code))
 
             # Empty values if skip is true then continue
             if mapping and mapping.skip:
@@ -133,11 +190,34 @@ class Command(BaseCommand):
 
             if schedule_code in self.fee_schedules:
                 values = self.fee_schedules[schedule_code]
+
+                if hashes.is_unchanged(program.pk, values):
+                    self.unchanged_count += 1
+                    continue
+
+                original = copy.copy(program)
                 program.resident_tuition = values['res']
                 program.nonresident_tuition = values['nonres']
                 program.tuition_type = values['type']
+                program.modified = modified
                 self.update_count += 1
-                program.save()
+                changes.append((original, program))
+
+                hashes.update(program.pk, values)
+
+        # Programs are saved together, so the work their
+        # save signals do is done once for all of them
+        with transaction.atomic():
+            Program.objects.bulk_update(
+                [x[1] for x in changes],
+                ['resident_tuition', 'nonresident_tuition', 'tuition_type', 'modified'],
+                batch_size=500
+            )
+            bulk_log_changes(changes)
+            hashes.save()
+
+        refresh_program_documents([x[1].pk for x in changes])
+        invalidate_response_cache()
 
 
     def get_schedule_code(self, program, mapping):
@@ -158,17 +238,19 @@ class Command(BaseCommand):
         return None
 
     def print_results(self):
-        success_perc_number = float(self.update_count) / float(self.program_count) * 100
+        success_perc_number = float(self.update_count + self.unchanged_count) / float(self.program_count) * 100
         success_perc_str = str(round(success_perc_number, 2))
 
         print("""
 Successfully update tuition data.
 Updated    : {0}
-Exceptions : {1}
-Skipped    : {2}
-Success %  : {3}%
+Unchanged  : {1}
+Exceptions : {2}
+Skipped    : {3}
+Success %  : {4}%
         """.format(
             self.update_count,
+            self.unchanged_count,
             self.mapping_found,
             self.program_skipped,
             success_perc_str
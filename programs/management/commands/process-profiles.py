@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
 from programs.models import *
+from programs.utilities.program_documents import refresh_program_documents
+from programs.utilities.response_cache import invalidate_response_cache
 
 import settings
 from tabulate import tabulate
@@ -21,36 +23,56 @@ the settings_local.py file.
         Handles the process-profiles command.
         """
         self.update_programs()
+
+        # Primary flags are bulk updated, which does not send
+        # the signals that refresh documents and clear the cache
+        refresh_program_documents(self.updated_program_ids)
+        invalidate_response_cache()
+
         self.print_stats()
 
     def update_programs(self):
         """
-        Handles updating the programs
+        Handles updating the programs. Profile rules are
+        compiled once and all profiles are loaded up front,
+        so primary flags are written in two bulk updates.
         """
-        programs = Program.objects.all()
+        rules = ProgramProfileType.objects.get_profile_rules()
+        programs = Program.objects.prefetch_related('profiles')
+
+        set_primary = []
+        unset_primary = []
+        self.updated_program_ids = []
 
         for program in programs:
             self.programs_processed += 1
 
-            profile_type = program.primary_profile_type
+            profile_type = next((rule.profile_type for rule in rules if rule.matches(program)), None)
 
             if profile_type == None:
                 self.programs_unable += 1
                 continue
 
-            profile = program.profiles.filter(profile_type=profile_type).first()
+            profiles = sorted(program.profiles.all(), key=lambda x: x.pk)
+            profile = next((x for x in profiles if x.profile_type_id == profile_type.pk), None)
 
             if profile is not None:
                 if profile.primary == False:
-                    profile.primary = True
-                    profile.save()
-                    program.profiles.exclude(pk=profile.pk).update(primary=False)
+                    set_primary.append(profile.pk)
+                    unset_primary.extend(x.pk for x in profiles if x.pk != profile.pk and x.primary)
+                    self.updated_program_ids.append(program.pk)
                     self.programs_updated += 1
                 else:
                     self.programs_no_change += 1
             else:
                 self.programs_missing += 1
 
+        if set_primary:
+            ProgramProfile.objects.filter(pk__in=set_primary).update(primary=True)
+
+        if unset_primary:
+            ProgramProfile.objects.filter(pk__in=unset_primary).update(primary=False)
+
     def print_stats(self):
         results = [
             ("Programs Processed", self.programs_processed),
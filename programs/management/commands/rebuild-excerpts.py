@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from programs.models import Program, ProgramDescription
+from programs.utilities.program_documents import refresh_program_documents
+from programs.utilities.response_cache import invalidate_response_cache
+
+from progress.bar import ChargingBar
+from tabulate import tabulate
+
+
+class Command(BaseCommand):
+    help = """
+Rebuilds the stored excerpt of every program from its
+source catalog description (EXCERPT_DESCRIPTION_TYPE_SOURCE).
+    """
+
+    programs_processed = 0
+    programs_updated = 0
+    programs_cleared = 0
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            help='The number of programs to write per query.',
+            default=500,
+            required=False
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+
+        self.rebuild_excerpts()
+
+        # Excerpts are bulk updated, which does not send the
+        # signals that refresh documents and clear the cache
+        refresh_program_documents(self.changed_program_ids)
+        invalidate_response_cache()
+
+        self.print_stats()
+
+    def rebuild_excerpts(self):
+        """
+        Regenerates all excerpts in memory and writes
+        back only the ones that changed.
+        """
+        descriptions = dict(
+            ProgramDescription.objects.filter(
+                description_type__name=settings.EXCERPT_DESCRIPTION_TYPE_SOURCE
+            ).values_list('program_id', 'description')
+        )
+
+        programs = Program.objects.only('id', 'excerpt')
+        progress = ChargingBar('Rebuilding excerpts...', max=programs.count())
+        changed = []
+
+        for program in programs.iterator():
+            progress.next()
+            self.programs_processed += 1
+
+            excerpt = Program.generate_excerpt(descriptions.get(program.pk))
+
+            if excerpt != program.excerpt:
+                if excerpt:
+                    self.programs_updated += 1
+                else:
+                    self.programs_cleared += 1
+
+                program.excerpt = excerpt
+                changed.append(program)
+
+        progress.finish()
+
+        Program.objects.bulk_update(changed, ['excerpt'], batch_size=self.batch_size)
+
+        self.changed_program_ids = [x.pk for x in changed]
+
+    def print_stats(self):
+        results = [
+            ("Programs Processed", self.programs_processed),
+            ("Excerpts Updated", self.programs_updated),
+            ("Excerpts Cleared", self.programs_cleared)
+        ]
+
+        self.stdout.write('''
+Complete!
+
+        ''')
+
+        self.stdout.write(tabulate(results, tablefmt='grid'), ending='\n\n')
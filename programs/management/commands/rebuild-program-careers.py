@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from programs.models import ProgramCareer
+from programs.utilities.program_careers import refresh_program_careers
+
+from tabulate import tabulate
+
+
+class Command(BaseCommand):
+    help = """
+Recomputes the careers of every program from its jobs, the
+occupations of its current CIP and its weighted job
+positions. Careers are kept up to date by the imports and
+as programs change, so this is only needed after bulk
+updates or to populate them the first time.
+    """
+
+    def handle(self, *args, **options):
+        self.results = refresh_program_careers()
+
+        self.print_stats()
+
+    def print_stats(self):
+        results = [
+            ("Careers Created", self.results['created']),
+            ("Careers Deleted", self.results['deleted'])
+        ] + [
+            (f"{label} Careers", ProgramCareer.objects.filter(source=source).count())
+            for source, label in ProgramCareer.sources
+        ]
+
+        self.stdout.write('''
+Complete!
+
+        ''')
+
+        self.stdout.write(tabulate(results, tablefmt='grid'), ending='\n\n')
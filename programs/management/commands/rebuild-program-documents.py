@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from programs.utilities.program_documents import rebuild_program_documents
+from programs.utilities.response_cache import invalidate_response_cache
+
+from tabulate import tabulate
+
+
+class Command(BaseCommand):
+    help = """
+Rebuilds the search document of every program. Documents
+are kept up to date as programs change, so this is only
+needed after bulk updates or changes to how programs are
+serialized.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            help='The number of programs to serialize at a time.',
+            default=200,
+            required=False
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+
+        self.documents_written = rebuild_program_documents(batch_size=self.batch_size)
+
+        invalidate_response_cache()
+
+        self.print_stats()
+
+    def print_stats(self):
+        results = [
+            ("Documents Written", self.documents_written)
+        ]
+
+        self.stdout.write('''
+Complete!
+
+        ''')
+
+        self.stdout.write(tabulate(results, tablefmt='grid'), ending='\n\n')
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from programs.models import Program, ProgramSearchTerm
+from programs.utilities.search_index import program_search_index
+
+from tabulate import tabulate
+
+
+class Command(BaseCommand):
+    help = """
+Rebuilds the program search index from scratch. The index
+is kept up to date as programs change, so this is only
+needed after bulk updates or changes to how programs are
+indexed.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            help='The number of programs to index at a time.',
+            default=200,
+            required=False
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+
+        self.postings_written = program_search_index.rebuild(batch_size=self.batch_size)
+
+        self.print_stats()
+
+    def print_stats(self):
+        results = [
+            ("Programs Indexed", Program.objects.count()),
+            ("Terms Indexed", ProgramSearchTerm.objects.values('term').distinct().count()),
+            ("Postings Written", self.postings_written)
+        ]
+
+        self.stdout.write('''
+Complete!
+
+        ''')
+
+        self.stdout.write(tabulate(results, tablefmt='grid'), ending='\n\n')
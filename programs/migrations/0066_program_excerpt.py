@@ -0,0 +1,43 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    def forward(apps, schema_editor):
+        from programs.models import Program as CurrentProgram
+
+        Program = apps.get_model('programs', 'Program')
+        ProgramDescription = apps.get_model('programs', 'ProgramDescription')
+
+        descriptions = dict(
+            ProgramDescription.objects.filter(
+                description_type__name=settings.EXCERPT_DESCRIPTION_TYPE_SOURCE
+            ).values_list('program_id', 'description')
+        )
+
+        changed = []
+        for program in Program.objects.filter(pk__in=descriptions.keys()).only('id', 'excerpt'):
+            program.excerpt = CurrentProgram.generate_excerpt(descriptions[program.pk])
+            changed.append(program)
+
+        Program.objects.bulk_update(changed, ['excerpt'], batch_size=500)
+
+
+    dependencies = [
+        ('programs', '0065_program_quotes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='excerpt',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(
+            forward,
+            reverse_code=migrations.RunPython.noop
+        )
+    ]
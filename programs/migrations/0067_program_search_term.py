@@ -0,0 +1,69 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:03
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Prefetch
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    def forward(apps, schema_editor):
+        from programs.utilities.search_index import program_search_index
+
+        Program = apps.get_model('programs', 'Program')
+        CIP = apps.get_model('programs', 'CIP')
+        ProgramDescription = apps.get_model('programs', 'ProgramDescription')
+        ProgramSearchTerm = apps.get_model('programs', 'ProgramSearchTerm')
+
+        programs = Program.objects.select_related(
+            'degree'
+        ).prefetch_related(
+            Prefetch('cip', queryset=CIP.objects.filter(version=settings.CIP_CURRENT_VERSION)),
+            'colleges',
+            'departments',
+            'jobs',
+            Prefetch('descriptions', queryset=ProgramDescription.objects.only('program_id', 'description'))
+        )
+
+        program_ids = list(Program.objects.values_list('pk', flat=True))
+
+        for i in range(0, len(program_ids), 200):
+            postings = []
+            for program in programs.filter(pk__in=program_ids[i:i + 200]):
+                postings += [
+                    ProgramSearchTerm(
+                        program_id=x.program_id,
+                        term=x.term,
+                        frequency=x.frequency,
+                        document_length=x.document_length
+                    )
+                    for x in program_search_index.build_postings(program)
+                ]
+
+            ProgramSearchTerm.objects.bulk_create(postings, batch_size=1000)
+
+
+    dependencies = [
+        ('programs', '0066_program_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramSearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=100)),
+                ('frequency', models.FloatField()),
+                ('document_length', models.FloatField()),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='programs.program')),
+            ],
+            options={
+                'unique_together': {('term', 'program')},
+            },
+        ),
+        migrations.RunPython(
+            forward,
+            reverse_code=migrations.RunPython.noop
+        )
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0067_program_search_term'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramSearchDocument',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=500)),
+                ('plan_code', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('subplan_code', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('level_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('career_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('degree_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('parent_program_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('online', models.BooleanField(default=False)),
+                ('valid', models.BooleanField(default=True)),
+                ('active', models.BooleanField(default=True)),
+                ('has_locations', models.BooleanField(default=True)),
+                ('college_ids', models.TextField(blank=True, default='')),
+                ('department_ids', models.TextField(blank=True, default='')),
+                ('payload', models.JSONField(default=dict)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
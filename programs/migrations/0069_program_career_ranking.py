@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0068_program_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramCareerRanking',
+            fields=[
+                ('program', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='career_ranking', serialize=False, to='programs.program')),
+                ('careers', models.JSONField(default=list)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WeightedJobPosition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.FloatField(default=0.0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weighted_positions', to='programs.jobposition')),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weighted_jobs', to='programs.program')),
+            ],
+            options={
+                'unique_together': {('program', 'job')},
+            },
+        ),
+    ]
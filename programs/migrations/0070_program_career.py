@@ -0,0 +1,64 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:28
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    def forward(apps, schema_editor):
+        Program = apps.get_model('programs', 'Program')
+        WeightedJobPosition = apps.get_model('programs', 'WeightedJobPosition')
+        ProgramCareer = apps.get_model('programs', 'ProgramCareer')
+
+        # Programs with more than one current CIP have no
+        # current CIP, so they have no SOC careers
+        cips = Program.cip.through.objects.filter(cip__version=settings.CIP_CURRENT_VERSION)
+        ambiguous = cips.values('program_id').annotate(cips=Count('cip_id')).filter(cips__gt=1).values('program_id')
+
+        sources = {
+            'manual': Program.jobs.through.objects.values_list('program_id', 'jobposition_id'),
+            'soc': cips.exclude(
+                program_id__in=ambiguous
+            ).filter(
+                cip__occupations__version=settings.SOC_CURRENT_VERSION,
+                cip__occupations__jobs__isnull=False
+            ).values_list(
+                'program_id', 'cip__occupations__jobs'
+            ),
+            'weighted': WeightedJobPosition.objects.values_list('program_id', 'job_id')
+        }
+
+        careers = [
+            ProgramCareer(program_id=program_id, job_id=job_id, source=source)
+            for source, jobs in sources.items()
+            for program_id, job_id in set(jobs)
+        ]
+
+        ProgramCareer.objects.bulk_create(careers, batch_size=500)
+
+
+    dependencies = [
+        ('programs', '0069_program_career_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramCareer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('manual', 'Manual'), ('soc', 'SOC'), ('weighted', 'Weighted')], max_length=8)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='program_careers', to='programs.jobposition')),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='career_jobs', to='programs.program')),
+            ],
+            options={
+                'unique_together': {('program', 'source', 'job')},
+            },
+        ),
+        migrations.RunPython(
+            forward,
+            reverse_code=migrations.RunPython.noop
+        )
+    ]
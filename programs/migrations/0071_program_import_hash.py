@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0070_program_career'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramImportHash',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('hash', models.CharField(max_length=64)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_hashes', to='programs.program')),
+            ],
+            options={
+                'unique_together': {('source', 'program')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0071_program_import_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheGeneration',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('generation', models.CharField(max_length=32)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
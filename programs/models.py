@@ -22,6 +22,8 @@ from auditlog.models import AuditlogHistoryField
 
 from bs4 import BeautifulSoup
 
+from programs.utilities.generation import get_generation, bump_generation
+
 logger = logging.getLogger()
 
 # Create your models here.
@@ -244,12 +246,82 @@ class EmploymentProjection(models.Model):
         return '20{0}'.format(self.report[2:4])
 
 
+class ProgramProfileRule(object):
+    """
+    A compiled PROGRAM_PROFILE rule. The rule matches a
+    program when it has no conditions, or when any of
+    its conditions match.
+    """
+    def __init__(self, conditions, profile_type):
+        self.conditions = conditions
+        self.profile_type = profile_type
+
+    def matches(self, program) -> bool:
+        if not self.conditions:
+            return True
+
+        return any(getattr(program, attname) == value for attname, value in self.conditions)
+
+
+class ProgramProfileTypeManager(models.Manager):
+    rules_cache_key = 'programs.profile_rules.generation'
+    rules = None
+    rules_generation = None
+
+    def invalidate_profile_rules(self):
+        """
+        Marks the compiled profile rules as stale in
+        every process.
+        """
+        bump_generation(self.rules_cache_key)
+
+    def get_profile_rules(self):
+        """
+        Returns settings.PROGRAM_PROFILE compiled into a
+        list of ProgramProfileRules, with field names
+        and profile types resolved up front. Rules whose
+        profile type does not exist are skipped.
+
+        The compiled rules are kept per process until the
+        generation stored in the database is bumped, which
+        other processes see within
+        CACHE_GENERATION_CHECK_INTERVAL seconds.
+        """
+        generation = get_generation(self.rules_cache_key)
+
+        if self.rules is not None and self.rules_generation == generation:
+            return self.rules
+
+        profile_types = {
+            x.name: x for x in self.filter(name__in=[rule['value'] for rule in settings.PROGRAM_PROFILE])
+        }
+
+        rules = []
+
+        for rule in settings.PROGRAM_PROFILE:
+            if rule['value'] not in profile_types:
+                continue
+
+            conditions = tuple(
+                (Program._meta.get_field(condition['field']).attname, condition['value'])
+                for condition in rule['conditions']
+            )
+
+            rules.append(ProgramProfileRule(conditions, profile_types[rule['value']]))
+
+        self.rules = rules
+        self.rules_generation = generation
+
+        return rules
+
+
 class ProgramProfileType(models.Model):
     """
     Types of program profiles, e.g. Main Site, UCF Online
     """
     name = models.CharField(max_length=255, null=False, blank=False)
     root_url = models.URLField(null=False, blank=False)
+    objects = ProgramProfileTypeManager()
 
     def __str__(self):
         return self.name
@@ -263,7 +335,7 @@ class ProgramDescriptionTypeManager(models.Manager):
     def excerpt_description_type(self):
         try:
             return self.get(name=settings.EXCERPT_DESCRIPTION_TYPE_SOURCE)
-        except ProgramDescription.DoesNotExist:
+        except ProgramDescriptionType.DoesNotExist:
             return None
 
 
@@ -534,6 +606,7 @@ class Program(models.Model):
     history = AuditlogHistoryField()
     highlights = models.JSONField(default=list, blank=True)
     quotes = models.ManyToManyField(Quote, related_name='programs', blank=True)
+    excerpt = models.TextField(null=False, blank=True, default='')
 
 
     class Meta:
@@ -545,16 +618,44 @@ class Program(models.Model):
     def __unicode__(self):
         return self.name
 
-    @property
-    def excerpt(self) -> str:
-        try:
-            desc = self.descriptions.get(description_type=ProgramDescriptionType.objects.excerpt_description_type)
-            soup = BeautifulSoup(desc.description, features='lxml')
-            return Truncator(soup.get_text()).words(25, '...')
+    def is_prefetched(self, related_name) -> bool:
+        """
+        Returns whether or not the given relationship
+        has already been loaded via prefetch_related.
+        """
+        return related_name in getattr(self, '_prefetched_objects_cache', {})
 
-        except ProgramDescription.DoesNotExist:
+    @staticmethod
+    def generate_excerpt(description: str) -> str:
+        """
+        Returns a plain text, truncated excerpt
+        of the given description markup.
+        """
+        if not description:
             return ''
 
+        soup = BeautifulSoup(description, features='lxml')
+        return Truncator(soup.get_text()).words(25, '...')
+
+    def update_excerpt(self) -> str:
+        """
+        Regenerates the stored excerpt from the program's
+        source catalog description. The excerpt is written
+        directly to the database so the program's modified
+        date and history are left untouched.
+        """
+        try:
+            desc = self.descriptions.get(description_type__name=settings.EXCERPT_DESCRIPTION_TYPE_SOURCE)
+            excerpt = Program.generate_excerpt(desc.description)
+        except ProgramDescription.DoesNotExist:
+            excerpt = ''
+
+        if excerpt != self.excerpt:
+            self.excerpt = excerpt
+            Program.objects.filter(pk=self.pk).update(excerpt=excerpt)
+
+        return excerpt
+
     @property
     def program_code(self):
         """
@@ -578,6 +679,9 @@ class Program(models.Model):
 
     @property
     def has_online(self):
+        if self.is_prefetched('subplans'):
+            return any(x.online for x in self.subplans.all())
+
         if self.subplans.filter(online=True).count() > 0:
             return True
 
@@ -585,6 +689,15 @@ class Program(models.Model):
 
     @property
     def current_cip(self) -> CIP:
+        if self.is_prefetched('cip'):
+            cips = [x for x in self.cip.all() if x.version == settings.CIP_CURRENT_VERSION]
+
+            if len(cips) > 1:
+                logger.error(f"The program {self.name} has two CIPS for CIP version {settings.CIP_CURRENT_VERSION}!")
+                return None
+
+            return cips[0] if cips else None
+
         try:
             return self.cip.get(version=settings.CIP_CURRENT_VERSION)
         except CIP.MultipleObjectsReturned:
@@ -613,56 +726,72 @@ class Program(models.Model):
     @property
     def careers(self):
         return JobPosition.objects.filter(
-            pk__in=self.current_occupations.filter(jobs__isnull=False).values_list('jobs', flat=True).distinct()
+            program_careers__program=self,
+            program_careers__source=ProgramCareer.SOURCE_SOC
         )
 
     @property
     def primary_profile_type(self):
-        rules = settings.PROGRAM_PROFILE
+        for rule in ProgramProfileType.objects.get_profile_rules():
+            if rule.matches(self):
+                return rule.profile_type
 
-        retval = None
+        return None
 
-        for rule in rules:
-            conditions_met = False
+    def resolve_primary_profile_url(self, profiles):
+        """
+        Returns the primary profile URL of the program
+        given a list of all of its profiles.
+        """
+        profiles = sorted(profiles, key=lambda x: x.pk)
+        primary_profile = next((x for x in profiles if x.primary), None)
 
-            # If there are no conditions, then the conditions are met.
-            # This should only apply to the 'default' assignment.
-            if len(rule['conditions']) < 1:
-                conditions_met = True
+        if primary_profile:
+            return primary_profile.url
+
+        primary_profile_type = self.primary_profile_type
 
-            for condition in rule['conditions']:
-                field_obj = Program._meta.get_field(condition['field'])
-                field_val = field_obj.value_from_object(self)
-                if field_val == condition['value']:
-                    conditions_met = True
+        if primary_profile_type:
+            fallback_profile = next(
+                (x for x in profiles if x.profile_type_id == primary_profile_type.pk),
+                None
+            )
 
-            if conditions_met == True:
-                try:
-                    profile_type = ProgramProfileType.objects.get(name=rule['value'])
-                    return profile_type
-                except:
-                    continue
+            if fallback_profile:
+                return fallback_profile.url
+            else:
+                return primary_profile_type.root_url
 
         return None
 
     @property
     def primary_profile_url(self):
-        primary_profile = self.profiles.filter(primary=True).first()
+        return self.resolve_primary_profile_url(self.profiles.all())
 
-        if primary_profile:
-            return primary_profile.url
-        else:
-            primary_profile_type = self.primary_profile_type
+    @staticmethod
+    def get_primary_profile_urls(programs) -> dict:
+        """
+        Returns the primary profile URL of each of the
+        given programs, keyed by program ID. Profiles not
+        already prefetched are loaded in a single query.
+        """
+        programs = list(programs)
+        profiles = {x.pk: [] for x in programs}
 
-            if primary_profile_type:
-                fallback_profile = self.profiles.filter(profile_type=primary_profile_type).first()
+        unloaded = [x.pk for x in programs if not x.is_prefetched('profiles')]
 
-                if fallback_profile:
-                    return fallback_profile.url
-                else:
-                    return primary_profile_type.root_url
+        for program in programs:
+            if program.is_prefetched('profiles'):
+                profiles[program.pk] = list(program.profiles.all())
 
-        return None
+        if unloaded:
+            for profile in ProgramProfile.objects.filter(program_id__in=unloaded):
+                profiles[profile.program_id].append(profile)
+
+        return {
+            x.pk: x.resolve_primary_profile_url(profiles[x.pk])
+            for x in programs
+        }
 
     @property
     def has_descriptions(self):
@@ -740,6 +869,149 @@ class ProgramDescription(models.Model):
         return '{0} {1}'.format(self.program.name, self.description_type.name)
 
 
+class ProgramSearchTerm(models.Model):
+    """
+    A posting in the program search index: a term found
+    in the searchable text of a program, with its field
+    weighted frequency
+    """
+    term = models.CharField(max_length=100, null=False, blank=False, db_index=True)
+    frequency = models.FloatField(null=False, blank=False)
+    # Stored on every posting so ranking doesn't need a second lookup
+    document_length = models.FloatField(null=False, blank=False)
+    program = models.ForeignKey(
+        Program,
+        null=False,
+        blank=False,
+        related_name='search_terms',
+        on_delete=models.CASCADE
+    )
+
+    class Meta:
+        unique_together = ('term', 'program')
+
+    def __str__(self):
+        return '{0} {1}'.format(self.program_id, self.term)
+
+
+class ProgramSearchDocument(models.Model):
+    """
+    A denormalized copy of a program, used to list and
+    filter programs without joining their relations.
+    Stores the serialized program along with the columns
+    programs are filtered and counted by.
+    """
+    # The ID of the program the document was built from
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=500, null=False, blank=False)
+    plan_code = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    subplan_code = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    level_id = models.IntegerField(null=True, blank=True, db_index=True)
+    career_id = models.IntegerField(null=True, blank=True, db_index=True)
+    degree_id = models.IntegerField(null=True, blank=True, db_index=True)
+    parent_program_id = models.IntegerField(null=True, blank=True, db_index=True)
+    online = models.BooleanField(default=False)
+    valid = models.BooleanField(default=True)
+    active = models.BooleanField(default=True)
+    has_locations = models.BooleanField(default=True)
+    # Pipe delimited, e.g. |1|4|, so a single ID can be matched with `contains`
+    college_ids = models.TextField(null=False, blank=True, default='')
+    department_ids = models.TextField(null=False, blank=True, default='')
+    payload = models.JSONField(default=dict)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class WeightedJobPosition(models.Model):
+    """
+    A job position related to a program, weighted by
+    how closely it relates to the program
+    """
+    program = models.ForeignKey(
+        Program,
+        null=False,
+        blank=False,
+        related_name='weighted_jobs',
+        on_delete=models.CASCADE
+    )
+    job = models.ForeignKey(
+        JobPosition,
+        null=False,
+        blank=False,
+        related_name='weighted_positions',
+        on_delete=models.CASCADE
+    )
+    weight = models.FloatField(default=0.0)
+
+    class Meta:
+        unique_together = ('program', 'job')
+
+    def __str__(self):
+        return '{0} {1} ({2})'.format(self.program_id, self.job_id, self.weight)
+
+
+class ProgramCareerRanking(models.Model):
+    """
+    The names of a program's weighted job positions,
+    highest weight first. Rebuilt whenever weights
+    change, so ranked careers are read in one query.
+    """
+    program = models.OneToOneField(
+        Program,
+        primary_key=True,
+        related_name='career_ranking',
+        on_delete=models.CASCADE
+    )
+    careers = models.JSONField(default=list)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{0} Career Ranking'.format(self.program_id)
+
+
+class ProgramCareer(models.Model):
+    """
+    A job position a program leads to and where the
+    relationship comes from: the program's own jobs,
+    the occupations of its current CIP or its weighted
+    job positions. Recomputed when any of those change,
+    so careers are read without walking CIP and SOC.
+    """
+    SOURCE_MANUAL = 'manual'
+    SOURCE_SOC = 'soc'
+    SOURCE_WEIGHTED = 'weighted'
+
+    sources = (
+        (SOURCE_MANUAL, 'Manual'),
+        (SOURCE_SOC, 'SOC'),
+        (SOURCE_WEIGHTED, 'Weighted')
+    )
+
+    program = models.ForeignKey(
+        Program,
+        null=False,
+        blank=False,
+        related_name='career_jobs',
+        on_delete=models.CASCADE
+    )
+    job = models.ForeignKey(
+        JobPosition,
+        null=False,
+        blank=False,
+        related_name='program_careers',
+        on_delete=models.CASCADE
+    )
+    source = models.CharField(max_length=8, null=False, blank=False, choices=sources)
+
+    class Meta:
+        unique_together = ('program', 'source', 'job')
+
+    def __str__(self):
+        return '{0} {1} ({2})'.format(self.program_id, self.job_id, self.source)
+
+
 class Fee(models.Model):
     fee_name = models.CharField(max_length=255, null=False, blank=False)
 
@@ -877,6 +1149,45 @@ class ProgramImportRecord(models.Model):
         return self.programs_revalidated.count()
 
 
+
+class ProgramImportHash(models.Model):
+    """
+    A hash of the source record an importer last
+    processed for a program, so unchanged records
+    can be skipped on the next import.
+    """
+    program = models.ForeignKey(
+        Program,
+        null=False,
+        blank=False,
+        related_name='import_hashes',
+        on_delete=models.CASCADE
+    )
+    source = models.CharField(max_length=255, null=False, blank=False)
+    hash = models.CharField(max_length=64, null=False, blank=False)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('source', 'program')
+
+    def __str__(self):
+        return '{0} {1} Import Hash'.format(self.program_id, self.source)
+
+
+class CacheGeneration(models.Model):
+    """
+    The current generation of a set of cached or
+    in-process data. Stored in the database so every
+    process sees a bump, whichever cache backend
+    each process is configured with.
+    """
+    key = models.CharField(max_length=255, null=False, blank=False, unique=True)
+    generation = models.CharField(max_length=32, null=False, blank=False)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{0} Cache Generation'.format(self.key)
+
 auditlog.register(Program, serialize_data=True, m2m_fields={'jobs'})
 auditlog.register(ProgramDescription, serialize_data=True)
 
@@ -1,7 +1,12 @@
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
+from django.db.models import Prefetch
+from collections import OrderedDict
+
 from programs.models import *
+from programs.utilities.cip_index import cip_index
+from programs.utilities.program_resources import ProgramResources
 import warnings
 
 from drf_dynamic_fields import DynamicFieldsMixin
@@ -278,36 +283,27 @@ class CIPSerializer(serializers.ModelSerializer):
         model = CIP
 
     def get_area_detail(self, obj):
-        try:
-            cip = CIP.objects.get(area=obj.area, subarea=0, precise=0, version=obj.version)
-        except:
-            return None
+        cip = cip_index.get_area(obj)
 
-        if cip == obj:
+        if cip is None or cip == obj:
             return None
 
         ser = CIPSimpleSerializer(cip)
         return ser.data
 
     def get_subarea_detail(self, obj):
-        try:
-            cip = CIP.objects.get(area=obj.area, subarea=obj.subarea, precise=0, version=obj.version)
-        except:
-            return None
+        cip = cip_index.get_subarea(obj)
 
-        if cip == obj:
+        if cip is None or cip == obj:
             return None
 
         ser = CIPSimpleSerializer(cip)
         return ser.data
 
     def get_precise_detail(self, obj):
-        try:
-            cip = CIP.objects.get(area=obj.area, subarea=obj.subarea, precise=obj.precise, version=obj.version)
-        except:
-            return None
+        cip = cip_index.get_precise(obj)
 
-        if cip == obj:
+        if cip is None or cip == obj:
             return None
 
         ser = CIPSimpleSerializer(cip)
@@ -374,6 +370,85 @@ class ApplicationDeadlineSerializer(serializers.ModelSerializer):
         )
         model = ApplicationDeadline
 
+class ProgramDocumentSerializer(serializers.BaseSerializer):
+    """
+    Returns the stored payload of a program document,
+    limited to the fields ProgramSerializer would return
+    for the request, with links to other API resources
+    made absolute.
+    """
+    def get_field_names(self) -> set:
+        if 'document_fields' not in self.context:
+            self.context['document_fields'] = set(
+                ProgramSerializer(context=self.context).fields.keys()
+            )
+
+        return self.context['document_fields']
+
+    def to_representation(self, instance):
+        fields = self.get_field_names()
+
+        return OrderedDict(
+            (key, self.absolutize(value))
+            for key, value in instance.payload.items()
+            if key in fields
+        )
+
+    def absolutize(self, value):
+        request = self.context.get('request', None)
+
+        if request is None:
+            return value
+
+        if isinstance(value, str):
+            if value.startswith(reverse('api.core')):
+                return request.build_absolute_uri(value)
+            return value
+
+        if isinstance(value, dict):
+            return OrderedDict((k, self.absolutize(v)) for k, v in value.items())
+
+        if isinstance(value, list):
+            return [self.absolutize(x) for x in value]
+
+        return value
+
+
+class ProgramResourcesSerializer(serializers.BaseSerializer):
+    """
+    Serializes the resources loaded by ProgramResources
+    for a single program, in the same shape as the view
+    each resource is linked to.
+    """
+    def to_representation(self, instance):
+        return {
+            name: getattr(self, f"get_{name}")(value)
+            for name, value in instance.items()
+        }
+
+    def get_outcomes(self, value):
+        return {
+            'by_year': ProgramOutcomeStatSerializer(instance=value['by_year'], many=True).data,
+            'latest': ProgramOutcomeStatSerializer(instance=value['latest'], many=False).data
+        }
+
+    def get_projection_totals(self, value):
+        return EmploymentProjectionTotalsSerializer(value, many=False).data
+
+    def get_careers(self, value):
+        return value
+
+    def get_application_deadlines(self, value):
+        return {
+            'application_deadlines': ApplicationDeadlineSerializer(
+                instance=value['application_deadlines'],
+                many=True,
+                read_only=True
+            ).data,
+            'application_requirements': value['application_requirements']
+        }
+
+
 class AcademicTermSerializer(serializers.ModelSerializer):
     class Meta:
         fields = (
@@ -385,6 +460,25 @@ class AcademicTermSerializer(serializers.ModelSerializer):
         model = AcademicTerm
 
 
+class ProgramListSerializer(serializers.ListSerializer):
+    """
+    Resolves values that are cheaper to compute for a
+    whole page of programs at once before serializing
+    each program.
+    """
+    def to_representation(self, data):
+        programs = list(data.all() if isinstance(data, models.Manager) else data)
+
+        if 'primary_profile_url' in self.child.fields:
+            self.context['primary_profile_urls'] = Program.get_primary_profile_urls(programs)
+
+        expand = self.child.get_expand()
+        if expand:
+            self.context['program_resources'] = ProgramResources(programs, expand).load()
+
+        return super(ProgramListSerializer, self).to_representation(programs)
+
+
 class ProgramSerializer(DynamicFieldSetMixin, serializers.ModelSerializer):
     level = serializers.StringRelatedField(many=False)
     career = serializers.StringRelatedField(many=False)
@@ -424,36 +518,75 @@ class ProgramSerializer(DynamicFieldSetMixin, serializers.ModelSerializer):
     )
     start_term = AcademicTermSerializer(many=False, read_only=True)
 
-    excerpt = serializers.SerializerMethodField()
+    excerpt = serializers.CharField(read_only=True)
+
+    primary_profile_url = serializers.SerializerMethodField()
 
     area_of_interest = serializers.SerializerMethodField()
     subarea_of_interest = serializers.SerializerMethodField()
 
-    def get_excerpt(self, obj: Program):
-        return obj.excerpt
+    def get_expand(self) -> list:
+        """
+        Returns the names of the linked resources
+        to return inline instead of as URLs.
+        """
+        return [
+            x for x in self.context.get('expand', [])
+            if x in ProgramResources.names and x in self.fields
+        ]
+
+    def to_representation(self, instance):
+        ret = super(ProgramSerializer, self).to_representation(instance)
+
+        expand = self.get_expand()
+        if not expand:
+            return ret
+
+        resources = self.context.get('program_resources', {})
+        if instance.pk not in resources:
+            resources = ProgramResources([instance], expand).load()
+
+        ret.update(ProgramResourcesSerializer(resources[instance.pk]).data)
+
+        return ret
+
+    def get_primary_profile_url(self, obj: Program):
+        urls = self.context.get('primary_profile_urls', {})
+
+        if obj.pk in urls:
+            return urls[obj.pk]
+
+        return obj.primary_profile_url
 
     def get_area_of_interest(self, obj: Program):
-        if obj.current_cip is None:
+        current_cip = obj.current_cip
+
+        if current_cip is None:
             return None
 
-        try:
-            top_level_cip = CIP.objects.get(code=obj.current_cip.area_code_str, version=settings.CIP_CURRENT_VERSION)
-            cip_name = top_level_cip.name.title()
-            return cip_name
-        except CIP.DoesNotExist:
+        top_level_cip = cip_index.get_by_code(current_cip.area_code_str, settings.CIP_CURRENT_VERSION)
+
+        if top_level_cip is None:
             return None
 
+        return top_level_cip.name.title()
+
     def get_subarea_of_interest(self, obj: Program):
-        if obj.current_cip is None:
+        current_cip = obj.current_cip
+
+        if current_cip is None:
             return None
 
-        try:
-            subarea_cip = CIP.objects.get(code=f"{obj.current_cip.area_code_str}.{obj.current_cip.subarea_code_str}", version=settings.CIP_CURRENT_VERSION)
-            cip_name = subarea_cip.name.title()
-            return cip_name
-        except CIP.DoesNotExist:
+        subarea_cip = cip_index.get_by_code(
+            f"{current_cip.area_code_str}.{current_cip.subarea_code_str}",
+            settings.CIP_CURRENT_VERSION
+        )
+
+        if subarea_cip is None:
             return None
 
+        return subarea_cip.name.title()
+
     class Meta:
         fields = (
             'id',
@@ -496,6 +629,114 @@ class ProgramSerializer(DynamicFieldSetMixin, serializers.ModelSerializer):
             "identifiers": "id,name,plan_code,subplan_code,cip_code,parent_program",
         }
         model = Program
+        list_serializer_class = ProgramListSerializer
+
+    @staticmethod
+    def get_query_plan():
+        """
+        Returns the related data each field needs loaded
+        up front, keyed by field name. Each entry may
+        define `select_related`, `prefetch_related` and
+        `annotate` values to apply to the queryset.
+        """
+        descriptions = Prefetch(
+            'descriptions',
+            queryset=ProgramDescription.objects.select_related('description_type')
+        )
+        profiles = Prefetch(
+            'profiles',
+            queryset=ProgramProfile.objects.select_related('profile_type')
+        )
+        cip = Prefetch('cip')
+
+        return {
+            'descriptions': {
+                'prefetch_related': [descriptions]
+            },
+            'profiles': {
+                'prefetch_related': [profiles]
+            },
+            'primary_profile_url': {
+                'prefetch_related': [profiles]
+            },
+            'colleges': {
+                'prefetch_related': [
+                    Prefetch('colleges', queryset=College.objects.select_related('unit_college'))
+                ]
+            },
+            'departments': {
+                'prefetch_related': [
+                    Prefetch('departments', queryset=Department.objects.select_related('unit_department'))
+                ]
+            },
+            'has_online': {
+                'prefetch_related': [Prefetch('subplans')]
+            },
+            'subplans': {
+                'prefetch_related': [Prefetch('subplans')]
+            },
+            'quotes': {
+                'prefetch_related': [Prefetch('quotes')]
+            },
+            'parent_program': {
+                'select_related': ['parent_program']
+            },
+            'start_term': {
+                'select_related': ['start_term']
+            },
+            'level': {
+                'select_related': ['level']
+            },
+            'career': {
+                'select_related': ['career']
+            },
+            'degree': {
+                'select_related': ['degree']
+            },
+            'area_of_interest': {
+                'prefetch_related': [cip]
+            },
+            'subarea_of_interest': {
+                'prefetch_related': [cip]
+            },
+        }
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields):
+        """
+        Applies the select_related, prefetch_related and
+        annotations needed to serialize the given fields,
+        so that a page of programs is serialized in a
+        constant number of queries.
+        """
+        query_plan = cls.get_query_plan()
+
+        select_related = []
+        prefetch_related = {}
+        annotations = {}
+
+        for field in fields:
+            plan = query_plan.get(field, {})
+
+            for lookup in plan.get('select_related', []):
+                if lookup not in select_related:
+                    select_related.append(lookup)
+
+            for prefetch in plan.get('prefetch_related', []):
+                prefetch_related.setdefault(prefetch.prefetch_to, prefetch)
+
+            annotations.update(plan.get('annotate', {}))
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related.values())
+
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
+        return queryset
 
 
 class CollegeOverrideSerializer(serializers.ModelSerializer):
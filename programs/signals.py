@@ -0,0 +1,483 @@
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from programs.models import (
+    CIP,
+    SOC,
+    ApplicationDeadline,
+    AcademicTerm,
+    Career,
+    College,
+    Degree,
+    Level,
+    Department,
+    EmploymentProjection,
+    JobPosition,
+    Program,
+    ProgramDescription,
+    ProgramDescriptionType,
+    ProgramProfile,
+    ProgramOutcomeStat,
+    ProgramProfileType,
+    ProgramCareer,
+    WeightedJobPosition
+)
+from marketing.models import Quote
+from programs.utilities.cip_index import cip_index
+from programs.utilities.response_cache import invalidate_response_cache
+from programs.utilities.projection_totals import invalidate_projection_totals
+from programs.utilities.search_index import program_search_index
+from programs.utilities.program_documents import refresh_program_documents
+from programs.utilities.career_rankings import refresh_career_rankings
+from programs.utilities.program_careers import refresh_program_careers
+
+
+@receiver(post_save, sender=CIP)
+@receiver(post_delete, sender=CIP)
+def invalidate_cip_index(sender, **kwargs):
+    """
+    Invalidates the in-process CIP index whenever
+    a CIP is created, modified or deleted.
+    """
+    cip_index.invalidate()
+
+
+@receiver(post_save, sender=ProgramDescription)
+def update_program_excerpt(sender, instance=None, raw=False, **kwargs):
+    """
+    Regenerates the stored program excerpt whenever
+    its source catalog description is saved.
+    """
+    if raw:
+        return
+
+    if instance.description_type.name == settings.EXCERPT_DESCRIPTION_TYPE_SOURCE:
+        Program.objects.filter(pk=instance.program_id).update(
+            excerpt=Program.generate_excerpt(instance.description)
+        )
+
+
+@receiver(post_delete, sender=ProgramDescription)
+def clear_program_excerpt(sender, instance=None, **kwargs):
+    """
+    Clears the stored program excerpt when its
+    source catalog description is deleted.
+    """
+    if instance.description_type_id is None:
+        return
+
+    is_source = ProgramDescriptionType.objects.filter(
+        pk=instance.description_type_id,
+        name=settings.EXCERPT_DESCRIPTION_TYPE_SOURCE
+    ).exists()
+
+    if is_source:
+        Program.objects.filter(pk=instance.program_id).update(excerpt='')
+
+
+def get_related_program_ids(sender, instance) -> list:
+    """
+    Returns the IDs of the programs related
+    to the given object.
+    """
+    lookup = {
+        College: 'colleges',
+        Department: 'departments',
+        JobPosition: 'jobs',
+        CIP: 'cip',
+        Degree: 'degree',
+        Level: 'level',
+        Career: 'career',
+        AcademicTerm: 'start_term',
+        Quote: 'quotes'
+    }[sender]
+
+    return list(Program.objects.filter(**{lookup: instance}).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Program)
+def index_program(sender, instance=None, raw=False, **kwargs):
+    """
+    Re-indexes a program for search whenever it is saved
+    """
+    if raw:
+        return
+
+    program_search_index.index_programs([instance.pk])
+
+
+@receiver(post_save, sender=ProgramDescription)
+@receiver(post_delete, sender=ProgramDescription)
+def index_program_descriptions(sender, instance=None, raw=False, **kwargs):
+    """
+    Re-indexes a program for search whenever
+    one of its descriptions changes.
+    """
+    if raw:
+        return
+
+    program_search_index.index_programs([instance.program_id])
+
+
+@receiver(post_save, sender=College)
+@receiver(post_save, sender=Department)
+@receiver(post_save, sender=Degree)
+@receiver(post_save, sender=JobPosition)
+@receiver(post_save, sender=CIP)
+def index_related_programs(sender, instance=None, created=False, raw=False, **kwargs):
+    """
+    Re-indexes the programs related to a college,
+    department, degree, job or CIP when it is renamed.
+    New objects have no programs yet.
+    """
+    if raw or created:
+        return
+
+    program_ids = get_related_program_ids(sender, instance)
+
+    if program_ids:
+        program_search_index.index_programs(program_ids)
+
+
+def index_program_relations(sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs):
+    """
+    Re-indexes programs whenever their searchable
+    many-to-many relations change.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        program_search_index.index_programs([instance.pk])
+    elif pk_set:
+        program_search_index.index_programs(pk_set)
+
+
+for field_name in ('colleges', 'departments', 'jobs', 'cip'):
+    m2m_changed.connect(
+        index_program_relations,
+        sender=getattr(Program, field_name).through,
+        dispatch_uid=f'index_program_relations_{field_name}'
+    )
+
+
+@receiver(post_save, sender=ProgramProfileType)
+@receiver(post_delete, sender=ProgramProfileType)
+def invalidate_profile_rules(sender, **kwargs):
+    """
+    Invalidates the compiled PROGRAM_PROFILE rules
+    whenever a profile type is modified.
+    """
+    ProgramProfileType.objects.invalidate_profile_rules()
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=ProgramDescription)
+@receiver(post_delete, sender=ProgramDescription)
+@receiver(post_save, sender=ProgramProfile)
+@receiver(post_delete, sender=ProgramProfile)
+@receiver(post_save, sender=ProgramProfileType)
+@receiver(post_delete, sender=ProgramProfileType)
+@receiver(post_save, sender=College)
+@receiver(post_delete, sender=College)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=CIP)
+@receiver(post_delete, sender=CIP)
+@receiver(post_save, sender=SOC)
+@receiver(post_delete, sender=SOC)
+@receiver(post_save, sender=EmploymentProjection)
+@receiver(post_delete, sender=EmploymentProjection)
+@receiver(post_save, sender=ProgramOutcomeStat)
+@receiver(post_delete, sender=ProgramOutcomeStat)
+@receiver(post_save, sender=ApplicationDeadline)
+@receiver(post_delete, sender=ApplicationDeadline)
+@receiver(post_save, sender=JobPosition)
+@receiver(post_delete, sender=JobPosition)
+def invalidate_program_responses(sender, **kwargs):
+    """
+    Invalidates cached program API responses whenever
+    data they are built from is modified.
+    """
+    invalidate_response_cache()
+
+
+@receiver(post_save, sender=CIP)
+@receiver(post_delete, sender=CIP)
+@receiver(post_save, sender=SOC)
+@receiver(post_delete, sender=SOC)
+@receiver(post_save, sender=EmploymentProjection)
+@receiver(post_delete, sender=EmploymentProjection)
+def invalidate_program_projection_totals(sender, **kwargs):
+    """
+    Invalidates cached projection totals whenever
+    the data they are aggregated from is modified.
+    """
+    invalidate_projection_totals()
+
+
+@receiver(m2m_changed, sender=Program.cip.through)
+@receiver(m2m_changed, sender=SOC.cip.through)
+def invalidate_program_projection_totals_m2m(sender, action, **kwargs):
+    """
+    Invalidates cached projection totals whenever
+    programs or occupations are mapped to other CIPs.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_projection_totals()
+
+
+def invalidate_program_responses_m2m(sender, action, **kwargs):
+    """
+    Invalidates cached program API responses whenever
+    one of a program's many-to-many relations changes.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_response_cache()
+
+
+for field in Program._meta.many_to_many + SOC._meta.many_to_many:
+    m2m_changed.connect(
+        invalidate_program_responses_m2m,
+        sender=field.remote_field.through,
+        dispatch_uid=f'invalidate_program_responses_{field.model.__name__}_{field.name}'
+    )
+
+
+# Program search documents. These receivers are connected
+# after the excerpt receivers, so documents include the
+# updated excerpt.
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+def refresh_program_document(sender, instance=None, raw=False, **kwargs):
+    """
+    Refreshes the search document of a program, and of
+    its parent program and subplans, which link to it.
+    """
+    if raw:
+        return
+
+    program_ids = [
+        x for x in (instance.pk, instance.parent_program_id) if x is not None
+    ]
+
+    # Subplans include their parent program's name
+    program_ids += Program.objects.filter(
+        parent_program_id=instance.pk
+    ).values_list('pk', flat=True)
+
+    refresh_program_documents(program_ids)
+
+
+@receiver(post_save, sender=ProgramDescription)
+@receiver(post_delete, sender=ProgramDescription)
+@receiver(post_save, sender=ProgramProfile)
+@receiver(post_delete, sender=ProgramProfile)
+def refresh_program_document_children(sender, instance=None, raw=False, **kwargs):
+    """
+    Refreshes the search document of a program whenever
+    one of its descriptions or profiles changes.
+    """
+    if raw:
+        return
+
+    refresh_program_documents([instance.program_id])
+
+
+@receiver(post_save, sender=College)
+@receiver(post_save, sender=Department)
+@receiver(post_save, sender=CIP)
+@receiver(post_save, sender=Degree)
+@receiver(post_save, sender=Level)
+@receiver(post_save, sender=Career)
+@receiver(post_save, sender=AcademicTerm)
+@receiver(post_save, sender=Quote)
+def refresh_related_program_documents(sender, instance=None, created=False, raw=False, **kwargs):
+    """
+    Refreshes the search documents of the programs
+    related to an object when it is modified.
+    """
+    if raw or created:
+        return
+
+    refresh_program_documents(get_related_program_ids(sender, instance))
+
+
+@receiver(pre_save, sender=ProgramProfileType)
+def store_previous_profile_type_name(sender, instance=None, raw=False, **kwargs):
+    """
+    Stores the name a profile type is saved over, since
+    PROGRAM_PROFILE rules refer to profile types by name.
+    """
+    if raw or instance.pk is None:
+        instance._previous_name = None
+        return
+
+    instance._previous_name = ProgramProfileType.objects.filter(
+        pk=instance.pk
+    ).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=ProgramProfileType)
+@receiver(post_delete, sender=ProgramProfileType)
+def refresh_profile_type_program_documents(sender, instance=None, raw=False, **kwargs):
+    """
+    Refreshes the search documents of the programs with a
+    profile of a profile type when it changes, and of the
+    programs without a primary profile that can fall back
+    to it. Profiles removed along with a deleted profile
+    type refresh their programs' documents themselves.
+    """
+    if raw:
+        return
+
+    names = {instance.name, getattr(instance, '_previous_name', None)}
+
+    # Programs matching any rule for the profile type may
+    # fall back to it, whichever rule ends up applying
+    fallback = [
+        Q(**{x['field']: x['value'] for x in rule['conditions']})
+        for rule in settings.PROGRAM_PROFILE
+        if rule['value'] in names
+    ]
+
+    program_ids = set(
+        Program.objects.filter(profiles__profile_type_id=instance.pk).values_list('pk', flat=True)
+    )
+
+    if fallback:
+        program_ids.update(
+            Program.objects.filter(
+                reduce(operator.or_, fallback)
+            ).exclude(
+                profiles__primary=True
+            ).values_list('pk', flat=True)
+        )
+
+    refresh_program_documents(program_ids)
+
+
+def refresh_program_document_relations(sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs):
+    """
+    Refreshes the search documents of programs
+    whose many-to-many relations change.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        refresh_program_documents([instance.pk])
+    elif pk_set:
+        refresh_program_documents(pk_set)
+
+
+for field in Program._meta.many_to_many:
+    m2m_changed.connect(
+        refresh_program_document_relations,
+        sender=field.remote_field.through,
+        dispatch_uid=f'refresh_program_document_relations_{field.name}'
+    )
+
+
+@receiver(post_save, sender=WeightedJobPosition)
+@receiver(post_delete, sender=WeightedJobPosition)
+def refresh_program_career_ranking(sender, instance=None, raw=False, **kwargs):
+    """
+    Refreshes the career ranking of a program
+    whenever one of its weights changes.
+    """
+    if raw:
+        return
+
+    refresh_career_rankings([instance.program_id])
+    refresh_program_careers([instance.program_id], sources=[ProgramCareer.SOURCE_WEIGHTED])
+
+
+@receiver(post_save, sender=JobPosition)
+def refresh_job_career_rankings(sender, instance=None, created=False, raw=False, **kwargs):
+    """
+    Refreshes the career rankings listing a job
+    position when it is renamed.
+    """
+    if raw or created:
+        return
+
+    refresh_career_rankings(
+        instance.weighted_positions.values_list('program_id', flat=True)
+    )
+
+
+def refresh_program_career_relations(sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs):
+    """
+    Refreshes the careers of programs whose
+    jobs or CIPs change.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    source = ProgramCareer.SOURCE_MANUAL if sender is Program.jobs.through else ProgramCareer.SOURCE_SOC
+
+    if not reverse:
+        refresh_program_careers([instance.pk], sources=[source])
+    elif action == 'post_clear':
+        # The programs that were cleared are no longer known
+        refresh_program_careers(sources=[source])
+    else:
+        refresh_program_careers(pk_set, sources=[source])
+
+
+for field_name in ('jobs', 'cip'):
+    m2m_changed.connect(
+        refresh_program_career_relations,
+        sender=getattr(Program, field_name).through,
+        dispatch_uid=f'refresh_program_career_relations_{field_name}'
+    )
+
+
+def refresh_occupation_careers(sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs):
+    """
+    Refreshes the careers of programs whose CIPs
+    gain or lose an occupation, or whose occupations
+    gain or lose a job.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if sender is SOC.cip.through:
+        if reverse:
+            cip_ids = [instance.pk]
+        elif action == 'post_clear':
+            # The CIPs that were cleared are no longer known
+            cip_ids = None
+        else:
+            cip_ids = pk_set
+    elif not reverse:
+        cip_ids = instance.cip.values_list('pk', flat=True)
+    elif action == 'post_clear':
+        # The occupations that were cleared are no longer known
+        cip_ids = None
+    else:
+        cip_ids = SOC.cip.through.objects.filter(soc_id__in=pk_set).values_list('cip_id', flat=True)
+
+    if cip_ids is None:
+        refresh_program_careers(sources=[ProgramCareer.SOURCE_SOC])
+    else:
+        refresh_program_careers(
+            Program.cip.through.objects.filter(cip_id__in=cip_ids).values_list('program_id', flat=True),
+            sources=[ProgramCareer.SOURCE_SOC]
+        )
+
+
+for field_name in ('jobs', 'cip'):
+    m2m_changed.connect(
+        refresh_occupation_careers,
+        sender=getattr(SOC, field_name).through,
+        dispatch_uid=f'refresh_occupation_careers_{field_name}'
+    )
@@ -1,6 +1,1383 @@
 # -*- coding: utf-8 -*-
 
 
-from django.test import TestCase
+import base64
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+import requests
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from auditlog.models import LogEntry
+from django.urls import reverse
+
+from programs.models import *
+from programs.utilities import projection_totals, response_cache
+from programs.utilities.audit_log import serialize_instance
+from programs.utilities.career_rankings import refresh_career_rankings
+from programs.utilities.cip_index import cip_index
+from programs.utilities.facets import FACETS
+from programs.utilities.generation import get_generation
+from programs.utilities.import_hashes import ImportHashes
+from programs.utilities.program_careers import get_program_careers, refresh_program_careers
+from programs.utilities.search_index import program_search_index
+from programs.utilities.program_documents import check_program_documents, refresh_program_documents
+from programs.utilities.response_cache import invalidate_response_cache
+from programs.utilities.projection_totals import aggregate_projection_totals, get_projection_totals
+
+
+class ProgramAPITestMixin(object):
+    """
+    Creates a set of programs with every relationship
+    the ProgramSerializer touches populated.
+    """
+    program_count = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        level = Level.objects.create(name='Bachelors')
+        career = Career.objects.create(name='Undergraduate', abbr='UGRD')
+        degree = Degree.objects.create(name='BS')
+        term = AcademicTerm.objects.create(full_name='Fall 2024')
+        college = College.objects.create(full_name='College of Sciences', short_name='COS')
+        department = Department.objects.create(full_name='Department of Biology')
+        description_type = ProgramDescriptionType.objects.create(name=settings.EXCERPT_DESCRIPTION_TYPE_SOURCE)
+        profile_type = ProgramProfileType.objects.create(name='Main Site', root_url='https://www.ucf.edu/degree/')
+
+        area = CIP(name='BIOLOGICAL AND BIOMEDICAL SCIENCES.', description='Area', code='26')
+        area.save()
+        subarea = CIP(name='BIOLOGY, GENERAL.', description='Subarea', code='26.01')
+        subarea.save()
+        precise = CIP(name='Biology/Biological Sciences, General.', description='Precise', code='26.0101')
+        precise.save()
+
+        for i in range(cls.program_count):
+            program = Program.objects.create(
+                name=f'Biology {i}',
+                plan_code=f'BIO{i}-BS',
+                level=level,
+                career=career,
+                degree=degree,
+                start_term=term
+            )
+            program.colleges.add(college)
+            program.departments.add(department)
+            program.cip.add(precise)
+
+            # Subplans have no profiles of their own, so their
+            # primary profile URL falls back to the profile type
+            Program.objects.create(
+                name=f'Biology {i} Online Track',
+                plan_code=f'BIO{i}-BS',
+                subplan_code='ZON',
+                level=level,
+                career=career,
+                degree=degree,
+                online=True,
+                parent_program=program
+            )
+
+            ProgramDescription.objects.create(
+                description_type=description_type,
+                description='<p>Study living things.</p>',
+                program=program
+            )
+
+            ProgramProfile.objects.create(
+                profile_type=profile_type,
+                url=f'https://www.ucf.edu/degree/biology-{i}/',
+                primary=True,
+                program=program
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, url, params):
+        # The CIP index, profile rules, search statistics and
+        # cache generations are built or read once, so warm
+        # them up before counting queries
+        cip_index.ensure_built()
+        ProgramProfileType.objects.get_profile_rules()
+        program_search_index.get_stats()
+        get_generation(response_cache.GENERATION_CACHE_KEY)
+        get_generation(projection_totals.GENERATION_CACHE_KEY)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, 200)
+
+        return len(ctx.captured_queries)
+
+
+class ProgramListQueryCountTests(ProgramAPITestMixin, TestCase):
+    def test_list_query_count_is_constant(self):
+        url = reverse('api.programs.list')
+
+        small = self.count_queries(url, {'limit': 2})
+        large = self.count_queries(url, {'limit': 20})
+
+        self.assertEqual(small, large)
+
+    def test_list_with_fields_query_count_is_constant(self):
+        url = reverse('api.programs.list')
+        params = {'fields': 'id,name,excerpt,has_online,primary_profile_url'}
+
+        small = self.count_queries(url, dict(params, limit=2))
+        large = self.count_queries(url, dict(params, limit=20))
+
+        self.assertEqual(small, large)
+
+    def test_list_values(self):
+        response = self.client.get(
+            reverse('api.programs.search'),
+            {'subplan_code__isnull': True, 'limit': 1}
+        )
+        program = response.json()['results'][0]
+
+        self.assertEqual(program['excerpt'], 'Study living things.')
+        self.assertTrue(program['has_online'])
+        self.assertEqual(program['primary_profile_url'], 'https://www.ucf.edu/degree/biology-0/')
+        self.assertEqual(program['area_of_interest'], 'Biological And Biomedical Sciences.')
+        self.assertEqual(program['subarea_of_interest'], 'Biology, General.')
+
+    def test_primary_profile_url_fallback(self):
+        parent = Program.objects.filter(parent_program__isnull=True).first()
+        response = self.client.get(
+            reverse('api.programs.search'),
+            {'parent_program': parent.pk, 'limit': 1}
+        )
+        program = response.json()['results'][0]
+
+        self.assertEqual(program['primary_profile_url'], 'https://www.ucf.edu/degree/')
+
+
+class ProgramSearchQueryCountTests(ProgramAPITestMixin, TestCase):
+    def test_search_query_count_is_constant(self):
+        url = reverse('api.programs.search')
+
+        small = self.count_queries(url, {'search': 'biology', 'limit': 2})
+        large = self.count_queries(url, {'search': 'biology', 'limit': 20})
+
+        self.assertEqual(small, large)
+
+    def test_search_with_fieldset_query_count_is_constant(self):
+        url = reverse('api.programs.search')
+
+        small = self.count_queries(url, {'search': 'biology', 'fieldset': 'identifiers', 'limit': 2})
+        large = self.count_queries(url, {'search': 'biology', 'fieldset': 'identifiers', 'limit': 20})
+
+        self.assertEqual(small, large)
+
+
+class ProgramDetailQueryCountTests(ProgramAPITestMixin, TestCase):
+    def test_detail_query_count_is_constant(self):
+        programs = Program.objects.filter(parent_program__isnull=True).order_by('pk')
+
+        first = self.count_queries(
+            reverse('api.programs.detail', kwargs={'id': programs[0].pk}),
+            {}
+        )
+        last = self.count_queries(
+            reverse('api.programs.detail', kwargs={'id': programs[len(programs) - 1].pk}),
+            {}
+        )
+
+        self.assertEqual(first, last)
+
+
+class ProgramResponseCacheTests(ProgramAPITestMixin, TestCase):
+    def test_repeated_request_served_from_cache(self):
+        url = reverse('api.programs.list')
+
+        self.count_queries(url, {'limit': 5})
+
+        self.assertEqual(self.count_queries(url, {'limit': 5}), 0)
+
+    def test_matching_etag_returns_not_modified(self):
+        url = reverse('api.programs.list')
+        response = self.client.get(url, {'limit': 5})
+
+        etag = response['ETag']
+        cached = self.client.get(url, {'limit': 5}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], etag)
+
+    def test_program_save_invalidates_responses(self):
+        program = Program.objects.filter(parent_program__isnull=True).first()
+        url = reverse('api.programs.detail', kwargs={'id': program.pk})
+        etag = self.client.get(url)['ETag']
+
+        program.name = 'Marine Biology'
+        program.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['name'], 'Marine Biology')
+
+    def test_bulk_update_invalidated_explicitly(self):
+        url = reverse('api.programs.list')
+        etag = self.client.get(url, {'limit': 5})['ETag']
+
+        Program.objects.update(excerpt='Bulk updated.')
+        invalidate_response_cache()
+
+        response = self.client.get(url, {'limit': 5}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['excerpt'], 'Bulk updated.')
+
+    @override_settings(CACHE_GENERATION_CHECK_INTERVAL=0)
+    def test_invalidation_from_another_process(self):
+        url = reverse('api.programs.list')
+        etag = self.client.get(url, {'limit': 5})['ETag']
+
+        # Another process bumps the generation in the database,
+        # leaving this process' cache untouched
+        Program.objects.update(excerpt='Imported.')
+        CacheGeneration.objects.filter(key='programs.response_cache.generation').update(generation='0' * 32)
+
+        response = self.client.get(url, {'limit': 5}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['excerpt'], 'Imported.')
+
+
+class ProgramKeysetPaginationTests(ProgramAPITestMixin, TestCase):
+    def get_page(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+
+        return response.json()
+
+    def test_limit_offset_is_default(self):
+        page = self.get_page(reverse('api.programs.list'), {'limit': 5})
+
+        self.assertEqual(page['count'], Program.objects.count())
+        self.assertIn('offset=5', page['next'])
+
+    def test_cursor_walks_every_program_once(self):
+        page = self.get_page(reverse('api.programs.list'), {'cursor': '', 'limit': 5})
+        self.assertNotIn('count', page)
+        self.assertIsNone(page['previous'])
+
+        ids = [x['id'] for x in page['results']]
+        while page['next']:
+            page = self.get_page(page['next'])
+            ids += [x['id'] for x in page['results']]
+
+        self.assertEqual(ids, list(Program.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_previous_link_returns_previous_page(self):
+        url = reverse('api.programs.list')
+        first = self.get_page(url, {'cursor': '', 'limit': 5})
+        second = self.get_page(first['next'])
+        previous = self.get_page(second['previous'])
+
+        self.assertEqual(previous['results'], first['results'])
+
+    def test_count_is_opt_in(self):
+        page = self.get_page(reverse('api.programs.list'), {'cursor': '', 'with_count': 'true'})
+
+        self.assertEqual(page['count'], Program.objects.count())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('api.programs.list'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_malformed_cursor(self):
+        for data in [5, [5], [5, False, 1], {'id': 5}, [None, False], ['abc', False], [[5], False], [5, 'yes']]:
+            cursor = base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+            response = self.client.get(reverse('api.programs.list'), {'cursor': cursor})
+
+            self.assertEqual(response.status_code, 404, data)
+
+    def test_cursor_rejected_for_search_and_ordering(self):
+        url = reverse('api.programs.search')
+
+        for params in [{'search': 'biology'}, {'ordering': 'name'}, {'ordering': '-id'}]:
+            response = self.client.get(url, dict(params, cursor=''))
+
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('cursor', response.json())
+
+        # Searches keep their ranking with limit and offset
+        response = self.client.get(url, {'search': 'biology 1', 'limit': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(x['name'].startswith('Biology 1') for x in response.json()['results']))
+
+        page = self.get_page(url, {'ordering': 'id', 'cursor': '', 'limit': 5})
+        self.assertEqual(len(page['results']), 5)
+
+
+class ProgramResourcesTests(ProgramAPITestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super(ProgramResourcesTests, cls).setUpTestData()
+
+        precise = CIP.objects.get(code='26.0101')
+        soc = SOC.objects.create(name='Biologists', code='19-1020')
+        soc.cip.add(precise)
+
+        for report in [settings.PROJ_CURRENT_REPORT, '0000']:
+            EmploymentProjection.objects.create(
+                soc=soc, report=report, begin_employment=100, end_employment=110,
+                change=10, change_percentage=10, openings=5
+            )
+
+        earlier = AcademicYear.objects.create(code='2021', display='2021-2022')
+        later = AcademicYear.objects.create(code='2022', display='2022-2023')
+        outcomes = [
+            ProgramOutcomeStat.objects.create(academic_year=x, cip=precise, avg_annual_earnings=50000)
+            for x in [later, earlier]
+        ]
+
+        job = JobPosition.objects.create(name='Biologist')
+        deadline = ApplicationDeadline.objects.create(
+            admission_term=AdmissionTerm.objects.create(name='Fall'),
+            career=Career.objects.get(name='Undergraduate'),
+            deadline_type=AdmissionDeadlineType.objects.create(name='Domestic'),
+            month=5,
+            day=1
+        )
+
+        for program in Program.objects.filter(parent_program__isnull=True):
+            program.outcomes.add(*outcomes)
+            program.jobs.add(job)
+            program.application_deadlines.add(deadline)
+
+    def test_expanded_resources_match_linked_views(self):
+        program = Program.objects.filter(parent_program__isnull=True).first()
+        detail = self.client.get(
+            reverse('api.programs.detail', kwargs={'id': program.pk}),
+            {'expand': 'outcomes,projection_totals,careers,application_deadlines'}
+        ).json()
+
+        for name, view in [
+            ('outcomes', 'api.programs.outcomes'),
+            ('projection_totals', 'api.programs.projections'),
+            ('careers', 'api.programs.careers'),
+            ('application_deadlines', 'api.programs.deadlines')
+        ]:
+            linked = self.client.get(reverse(view, kwargs={'id': program.pk})).json()
+            self.assertEqual(detail[name], linked, name)
+
+        self.assertEqual(detail['outcomes']['latest']['academic_year_code'], '2022')
+        self.assertEqual(detail['projection_totals']['openings'], 5)
+
+    def test_unexpanded_resources_are_links(self):
+        program = Program.objects.filter(parent_program__isnull=True).first()
+        detail = self.client.get(reverse('api.programs.detail', kwargs={'id': program.pk})).json()
+
+        self.assertTrue(detail['careers'].endswith(f"/programs/{program.pk}/careers/"))
+
+    def test_bulk_query_count_is_constant(self):
+        url = reverse('api.programs.bulk')
+        ids = list(Program.objects.order_by('pk').values_list('pk', flat=True))
+
+        small = self.count_queries(url, {'ids': ','.join(str(x) for x in ids[:2])})
+        large = self.count_queries(url, {'ids': ','.join(str(x) for x in ids[:20])})
+
+        self.assertEqual(small, large)
+
+    def test_list_expand_query_count_is_constant(self):
+        url = reverse('api.programs.list')
+        params = {'expand': 'outcomes,projection_totals,careers,application_deadlines'}
+
+        small = self.count_queries(url, dict(params, limit=2))
+        large = self.count_queries(url, dict(params, limit=20))
+
+        self.assertEqual(small, large)
+
+    def test_projection_totals_single_query(self):
+        ids = list(Program.objects.values_list('pk', flat=True))
+
+        with self.assertNumQueries(1):
+            totals = aggregate_projection_totals(ids)
+
+        parent = Program.objects.filter(parent_program__isnull=True).first()
+        self.assertEqual(totals[parent.pk]['begin_employment'], 100)
+        self.assertEqual(totals[parent.pk]['begin_year'], f"20{settings.PROJ_CURRENT_REPORT[:2]}")
+        self.assertIsNone(totals[parent.subplans.first().pk]['openings'])
+
+    def test_projection_totals_cached_until_projections_change(self):
+        program = Program.objects.filter(parent_program__isnull=True).first()
+        get_projection_totals([program.pk])
+
+        with self.assertNumQueries(0):
+            get_projection_totals([program.pk])
+
+        EmploymentProjection.objects.filter(report=settings.PROJ_CURRENT_REPORT).update(openings=7)
+        EmploymentProjection.objects.filter(report=settings.PROJ_CURRENT_REPORT).first().save()
+
+        self.assertEqual(get_projection_totals([program.pk])[program.pk]['openings'], 7)
+
+    @override_settings(CACHE_GENERATION_CHECK_INTERVAL=0)
+    def test_projection_totals_invalidated_from_another_process(self):
+        program = Program.objects.filter(parent_program__isnull=True).first()
+        get_projection_totals([program.pk])
+
+        EmploymentProjection.objects.filter(report=settings.PROJ_CURRENT_REPORT).update(openings=9)
+        CacheGeneration.objects.filter(key=projection_totals.GENERATION_CACHE_KEY).update(generation='0' * 32)
+
+        self.assertEqual(get_projection_totals([program.pk])[program.pk]['openings'], 9)
+
+    @override_settings(PROJECTION_TOTALS_CACHE_TIMEOUT=60)
+    def test_projection_totals_cache_timeout(self):
+        program = Program.objects.filter(parent_program__isnull=True).first()
+
+        with mock.patch.object(projection_totals.cache, 'set_many') as set_many:
+            get_projection_totals([program.pk])
+
+        self.assertEqual(set_many.call_args[1]['timeout'], 60)
+
+    def test_bulk_projection_totals(self):
+        programs = Program.objects.filter(parent_program__isnull=True).order_by('pk')[:3]
+        response = self.client.get(
+            reverse('api.programs.projections.bulk'),
+            {'ids': ','.join(str(x.pk) for x in programs)}
+        ).json()
+
+        for program in programs:
+            single = self.client.get(reverse('api.programs.projections', kwargs={'id': program.pk})).json()
+            self.assertEqual(response[str(program.pk)], single)
+
+    def test_bulk_rejects_invalid_ids(self):
+        response = self.client.get(reverse('api.programs.bulk'), {'ids': '1,abc'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ProgramSearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        level = Level.objects.create(name='Bachelors')
+        career = Career.objects.create(name='Undergraduate')
+        degree = Degree.objects.create(name='BS')
+        cls.college = College.objects.create(full_name='College of Sciences', short_name='COS')
+
+        cls.biology = Program.objects.create(name='Biology', plan_code='BIO-BS', level=level, career=career, degree=degree)
+        cls.biomedical = Program.objects.create(name='Biomedical Sciences', plan_code='BMS-BS', level=level, career=career, degree=degree)
+        cls.chemistry = Program.objects.create(name='Chemistry', plan_code='CHM-BS', level=level, career=career, degree=degree)
+
+        ProgramDescription.objects.create(
+            description_type=ProgramDescriptionType.objects.create(name='Catalog Description'),
+            description='<p>Chemistry for biology majors.</p>',
+            program=cls.chemistry
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search_ids(self, params):
+        response = self.client.get(reverse('api.programs.search'), params)
+        self.assertEqual(response.status_code, 200)
+
+        return [x['id'] for x in response.json()['results']]
+
+    def test_results_ranked_by_score(self):
+        ids = self.search_ids({'search': 'biology'})
+
+        # The name match outranks the description match
+        self.assertEqual(ids, [self.biology.pk, self.chemistry.pk])
+
+    def test_last_term_matches_prefix(self):
+        ids = self.search_ids({'search': 'bio'})
+
+        self.assertEqual(set(ids), {self.biology.pk, self.biomedical.pk, self.chemistry.pk})
+        self.assertEqual(set(ids[:2]), {self.biology.pk, self.biomedical.pk})
+
+    def test_short_last_term_matches_exactly(self):
+        self.assertEqual(self.search_ids({'search': 'bi'}), [])
+        self.assertEqual(self.search_ids({'search': 'sciences b'}), [])
+
+    def test_every_match_counted(self):
+        for i in range(30):
+            Program.objects.create(
+                name=f'Biology {i}',
+                plan_code=f'BIO{i}-BS',
+                level=self.biology.level,
+                career=self.biology.career,
+                degree=self.biology.degree
+            )
+
+        response = self.client.get(reverse('api.programs.search'), {'search': 'biology', 'limit': 5})
+
+        self.assertEqual(response.json()['count'], 32)
+        self.assertEqual(len(program_search_index.search('biology')), 32)
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search_ids({'search': 'biomedical sci'}), [self.biomedical.pk])
+        self.assertEqual(self.search_ids({'search': 'unknown'}), [])
+
+    def test_index_updated_on_change(self):
+        self.chemistry.colleges.add(self.college)
+        self.assertEqual(self.search_ids({'search': 'sciences'}), [self.biomedical.pk, self.chemistry.pk])
+
+        self.biology.name = 'Zoology'
+        self.biology.save()
+
+        self.assertEqual(self.search_ids({'search': 'zoology'}), [self.biology.pk])
+
+    def test_ordering_by_name(self):
+        ids = self.search_ids({'search': 'bio', 'ordering': 'name'})
+
+        self.assertEqual(ids, [self.biology.pk, self.biomedical.pk, self.chemistry.pk])
+
+    def test_rebuild_command(self):
+        ProgramSearchTerm.objects.all().delete()
+
+        call_command('rebuild-program-search-index', stdout=StringIO())
+
+        self.assertEqual(self.search_ids({'search': 'chemistry'}), [self.chemistry.pk])
+
+    def test_name_fallback_before_index_built(self):
+        ProgramSearchTerm.objects.all().delete()
+        program_search_index.invalidate()
+
+        self.assertEqual(self.search_ids({'search': 'biology'}), [self.biology.pk])
+        self.assertEqual(self.search_ids({'search': 'BIO'}), [self.biology.pk, self.biomedical.pk])
+
+
+class ProgramSearchDocumentTests(ProgramAPITestMixin, TestCase):
+    def get_results(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+
+        return response.json()['results']
+
+    def assert_documents_match(self, url, params):
+        expected = self.get_results(url, params)
+
+        cache.clear()
+        with override_settings(PROGRAM_SEARCH_DOCUMENTS=True):
+            actual = self.get_results(url, params)
+
+        self.assertTrue(expected)
+        self.assertEqual(actual, expected)
+
+    def test_list_served_from_documents(self):
+        self.assert_documents_match(reverse('api.programs.list'), {'limit': 50})
+
+    def test_search_served_from_documents(self):
+        college = College.objects.first()
+
+        self.assert_documents_match(reverse('api.programs.search'), {'search': 'biology', 'limit': 50})
+        self.assert_documents_match(reverse('api.programs.search'), {'colleges': college.pk, 'subplan_code__isnull': True})
+        self.assert_documents_match(reverse('api.programs.search'), {'online': True, 'fields': 'id,name,primary_profile_url'})
+
+    @override_settings(PROGRAM_SEARCH_DOCUMENTS=True)
+    def test_documents_query_count(self):
+        url = reverse('api.programs.search')
+
+        # One COUNT for pagination plus the page itself
+        self.assertEqual(self.count_queries(url, {'online': True, 'limit': 20}), 2)
+
+    def test_documents_refreshed_on_change(self):
+        program = Program.objects.filter(parent_program__isnull=True).first()
+        program.name = 'Marine Biology'
+        program.save()
+
+        # Subplans list their parent program by name
+        self.assertEqual(check_program_documents()['stale'], [])
+
+        program.colleges.clear()
+        document = ProgramSearchDocument.objects.get(pk=program.pk)
+
+        self.assertEqual(document.payload['name'], 'Marine Biology')
+        self.assertEqual(document.payload['colleges'], [])
+        self.assertEqual(document.college_ids, '')
+
+    def test_check_command_reports_drift(self):
+        ProgramSearchDocument.objects.filter(pk=Program.objects.first().pk).delete()
+        ProgramSearchDocument.objects.update(name='Stale')
+
+        with self.assertRaises(CommandError):
+            call_command('check-program-documents', stdout=StringIO())
+
+        call_command('check-program-documents', '--fix', stdout=StringIO())
+
+        self.assertEqual(check_program_documents(), {'missing': [], 'stale': [], 'orphaned': []})
+
+
+class ProgramFacetTests(ProgramAPITestMixin, TestCase):
+    def get_facets(self, params):
+        response = self.client.get(reverse('api.programs.search'), params)
+        self.assertEqual(response.status_code, 200)
+
+        return response.json().get('facets')
+
+    def test_facets_are_opt_in(self):
+        self.assertIsNone(self.get_facets({'limit': 1}))
+
+    def test_facet_counts(self):
+        college = College.objects.get()
+        facets = self.get_facets({'facets': 'true', 'subplan_code__isnull': True, 'limit': 1})
+
+        self.assertEqual(
+            facets['colleges'],
+            [{'value': college.pk, 'label': college.full_name, 'count': self.program_count}]
+        )
+        self.assertEqual(facets['online'], [{'value': False, 'label': False, 'count': self.program_count}])
+
+        # Subplans have no colleges of their own
+        facets = self.get_facets({'facets': 'colleges,online', 'limit': 1})
+
+        self.assertEqual(set(facets.keys()), {'colleges', 'online'})
+        self.assertEqual(facets['colleges'][0]['count'], self.program_count)
+        self.assertEqual(
+            [(x['value'], x['count']) for x in facets['online']],
+            [(False, self.program_count), (True, self.program_count)]
+        )
+
+    def test_facets_follow_search(self):
+        medicine = College.objects.create(full_name='College of Medicine')
+        for program in Program.objects.filter(parent_program__isnull=True)[:2]:
+            program.colleges.add(medicine)
+
+        # Subplans match too, but have no colleges
+        facets = self.get_facets({'facets': 'colleges', 'search': 'biology', 'limit': 1})
+
+        self.assertEqual(
+            [(x['label'], x['count']) for x in facets['colleges']],
+            [('College of Sciences', self.program_count), ('College of Medicine', 2)]
+        )
+
+        # Too short to be expanded, so only Biology 1 matches
+        facets = self.get_facets({'facets': 'colleges', 'search': 'biology 1', 'limit': 1})
+
+        self.assertEqual(
+            [(x['label'], x['count']) for x in facets['colleges']],
+            [('College of Medicine', 1), ('College of Sciences', 1)]
+        )
+
+    def test_facets_query_count(self):
+        url = reverse('api.programs.search')
+
+        without = self.count_queries(url, {'online': True, 'limit': 20})
+        small = self.count_queries(url, {'online': True, 'limit': 2, 'facets': 'true'})
+        large = self.count_queries(url, {'online': True, 'limit': 20, 'facets': 'true'})
+
+        # One grouped query per facet
+        self.assertEqual(small, large)
+        self.assertEqual(large, without + len(FACETS))
+
+    def test_facets_from_documents(self):
+        params = {'facets': 'true', 'search': 'biology', 'limit': 1}
+        expected = self.get_facets(params)
+
+        cache.clear()
+        with override_settings(PROGRAM_SEARCH_DOCUMENTS=True):
+            self.assertEqual(self.get_facets(params), expected)
+
+
+class ProgramCareerRankingTests(ProgramAPITestMixin, TestCase):
+    def setUp(self):
+        super(ProgramCareerRankingTests, self).setUp()
+        self.program = Program.objects.filter(parent_program__isnull=True).order_by('pk').first()
+        self.nurse = JobPosition.objects.create(name='Nurse')
+        self.biologist = JobPosition.objects.create(name='Biologist')
+        self.teacher = JobPosition.objects.create(name='Teacher')
+
+        for job in (self.nurse, self.biologist, self.teacher):
+            self.program.jobs.add(job)
+
+        WeightedJobPosition.objects.create(program=self.program, job=self.nurse, weight=0.5)
+        WeightedJobPosition.objects.create(program=self.program, job=self.biologist, weight=0.9)
+
+    def get_careers(self, program):
+        response = self.client.get(reverse('api.programs.careers.ranked', kwargs={'id': program.pk}))
+        self.assertEqual(response.status_code, 200)
+
+        return response.json()
+
+    def test_ranked_by_weight(self):
+        self.assertEqual(self.get_careers(self.program), ['Biologist', 'Nurse'])
+
+    def test_ranking_query_count(self):
+        url = reverse('api.programs.careers.ranked', kwargs={'id': self.program.pk})
+        self.assertEqual(self.count_queries(url, {}), 1)
+
+    def test_unranked_fallback(self):
+        other = Program.objects.filter(parent_program__isnull=True).order_by('pk')[1]
+        other.jobs.add(self.teacher, self.nurse)
+
+        self.assertEqual(self.get_careers(other), ['Nurse', 'Teacher'])
+
+        response = self.client.get(reverse('api.programs.careers.ranked', kwargs={'id': 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_ranking_refreshes(self):
+        weighted = WeightedJobPosition.objects.get(job=self.nurse)
+        weighted.weight = 1.0
+        weighted.save()
+
+        self.assertEqual(self.get_careers(self.program), ['Nurse', 'Biologist'])
+
+        self.nurse.name = 'Registered Nurse'
+        self.nurse.save()
+
+        self.assertEqual(self.get_careers(self.program), ['Registered Nurse', 'Biologist'])
+
+        weighted.delete()
+
+        self.assertEqual(self.get_careers(self.program), ['Biologist'])
+
+    def test_bulk(self):
+        other = Program.objects.filter(parent_program__isnull=True).order_by('pk')[1]
+        other.jobs.add(self.teacher)
+
+        url = reverse('api.programs.careers.ranked.bulk')
+        response = self.client.get(url, {'ids': f'{self.program.pk},{other.pk},0'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            str(self.program.pk): ['Biologist', 'Nurse'],
+            str(other.pk): ['Teacher']
+        })
+
+        self.assertEqual(self.count_queries(url, {'ids': f'{self.program.pk},{other.pk}'}), 3)
+
+        response = self.client.get(url, {'ids': ','.join(str(x) for x in range(1, 202))})
+        self.assertEqual(response.status_code, 400)
+
+    def test_refresh_all(self):
+        ProgramCareerRanking.objects.all().delete()
+
+        self.assertEqual(refresh_career_rankings(), 1)
+        self.assertEqual(ProgramCareerRanking.objects.get().careers, ['Biologist', 'Nurse'])
+
+    def test_import_refreshes_rankings(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as csv_file:
+            csv_file.write(
+                'program_id,career,weight\n'
+                f'{self.program.pk},Teacher,0.95\n'
+                f'{self.program.pk},Nurse,0.1\n'
+                f'{self.program.pk},Nurse,0.2\n'
+                f'{self.program.pk},Astronaut,0.99\n'
+            )
+            csv_file.flush()
+
+            stderr = StringIO()
+            call_command('import-career-weights', csv_file.name, stderr=stderr)
+
+        self.assertIn('JobPosition with name Astronaut does not exist.', stderr.getvalue())
+        self.assertEqual(self.get_careers(self.program), ['Teacher', 'Nurse'])
+        self.assertEqual(WeightedJobPosition.objects.get(job=self.nurse).weight, 0.2)
+
+
+class ProgramCareerTests(ProgramAPITestMixin, TestCase):
+    def setUp(self):
+        super(ProgramCareerTests, self).setUp()
+        self.program = Program.objects.filter(parent_program__isnull=True).order_by('pk').first()
+        self.nurse = JobPosition.objects.create(name='Nurse')
+        self.biologist = JobPosition.objects.create(name='Biologist')
+
+        self.soc = SOC.objects.create(name='Biologists', code='19-1020')
+        self.soc.cip.add(CIP.objects.get(code='26.0101'))
+        self.soc.jobs.add(self.biologist)
+
+    def get_sources(self):
+        return set(
+            ProgramCareer.objects.filter(program=self.program).values_list('job__name', 'source')
+        )
+
+    def test_sources(self):
+        self.program.jobs.add(self.nurse)
+        WeightedJobPosition.objects.create(program=self.program, job=self.nurse, weight=0.5)
+
+        self.assertEqual(self.get_sources(), {
+            ('Nurse', ProgramCareer.SOURCE_MANUAL),
+            ('Nurse', ProgramCareer.SOURCE_WEIGHTED),
+            ('Biologist', ProgramCareer.SOURCE_SOC)
+        })
+        self.assertEqual(list(self.program.careers.values_list('name', flat=True)), ['Biologist'])
+
+        self.program.jobs.remove(self.nurse)
+        self.program.cip.clear()
+
+        self.assertEqual(self.get_sources(), {('Nurse', ProgramCareer.SOURCE_WEIGHTED)})
+
+    def test_refresh_writes_changes(self):
+        ProgramCareer.objects.all().delete()
+
+        self.assertEqual(
+            refresh_program_careers(),
+            {'created': self.program_count, 'deleted': 0}
+        )
+        self.assertEqual(refresh_program_careers(), {'created': 0, 'deleted': 0})
+
+        self.soc.jobs.add(self.nurse)
+        self.soc.jobs.remove(self.biologist)
+
+        # The signals already applied the changes
+        self.assertEqual(refresh_program_careers(), {'created': 0, 'deleted': 0})
+
+    def test_occupation_changes(self):
+        cip = CIP.objects.get(code='26.0101')
+
+        def soc_careers():
+            return {name for name, source in self.get_sources() if source == ProgramCareer.SOURCE_SOC}
+
+        self.assertEqual(soc_careers(), {'Biologist'})
+
+        self.soc.jobs.add(self.nurse)
+        self.assertEqual(soc_careers(), {'Biologist', 'Nurse'})
+
+        self.biologist.occupations.remove(self.soc)
+        self.assertEqual(soc_careers(), {'Nurse'})
+
+        self.nurse.occupations.clear()
+        self.assertEqual(soc_careers(), set())
+
+        self.soc.jobs.add(self.biologist)
+        cip.occupations.remove(self.soc)
+        self.assertEqual(soc_careers(), set())
+
+        self.soc.cip.add(cip)
+        self.assertEqual(soc_careers(), {'Biologist'})
+
+        self.soc.cip.clear()
+        self.assertEqual(soc_careers(), set())
+
+    def test_ambiguous_cip(self):
+        other = CIP(name='Biology, Other.', description='Precise', code='26.0199')
+        other.save()
+        self.program.cip.add(other)
+
+        refresh_program_careers()
+
+        self.assertFalse(self.program.careers.exists())
+
+    def test_lookup_query_count(self):
+        self.program.jobs.add(self.nurse)
+        refresh_program_careers()
+
+        program_ids = list(Program.objects.values_list('pk', flat=True))
+
+        with self.assertNumQueries(1):
+            careers = get_program_careers(program_ids)
+
+        self.assertEqual(careers[self.program.pk], ['Biologist', 'Nurse'])
+
+        with self.assertNumQueries(1):
+            careers = get_program_careers([self.program.pk], sources=[ProgramCareer.SOURCE_MANUAL])
+
+        self.assertEqual(careers, {self.program.pk: ['Nurse']})
+
+
+class ProgramImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='importer')
+
+        cip = CIP(name='Biology/Biological Sciences, General.', description='Precise', code='26.0101')
+        cip.save()
+
+    def get_plan(self, plan_code, name, subplans=(), **kwargs):
+        plan = {
+            'College_Full': 'College of Sciences',
+            'CollegeShort': 'COS',
+            'Plan': plan_code,
+            'PlanName': name,
+            'Career': 'UGRD',
+            'Level': 'Bachelors',
+            'Dept_Full': 'Department of Biology',
+            'CIP': '26.0101',
+            'Active Locations': ['Main Campus'],
+            'Meta Data': [{'Degree': 'BS', 'Status': 'A', 'TermStart': 'Fall 2024', 'UCFOnline': '0'}],
+            'SubPlans': [
+                {
+                    'Subplan': x,
+                    'Subplan_Name': f'{name} {x} Track',
+                    'Active Locations': ['Main Campus'],
+                    'Meta Data': [{'Degree': 'BS', 'Status': 'A', 'TermStart': 'Fall 2024', 'UCFOnline': '0'}]
+                }
+                for x in subplans
+            ]
+        }
+        plan.update(kwargs)
+
+        return plan
+
+    def get_feed(self, count):
+        return [self.get_plan(f'BIO{i}-BS', f'Biology {i}', subplans=['ZON']) for i in range(count)]
+
+    def run_import(self, feed, *args):
+        with mock.patch('requests.get') as get:
+            get.return_value.json.return_value = feed
+            with override_settings(IMPORT_USER_ID=self.user.pk):
+                call_command('import-programs', 'https://apim.example.com/', *args, stdout=StringIO(), stderr=StringIO())
+
+        return ProgramImportRecord.objects.latest('pk')
+
+    def test_serialized_log_data_matches_auditlog(self):
+        self.run_import(self.get_feed(1))
+
+        program = Program.objects.get(plan_code='BIO0-BS', subplan_code__isnull=True)
+        program.name = 'Marine Biology'
+        program.save()
+
+        entry = LogEntry.objects.get_for_object(program).filter(action=LogEntry.Action.UPDATE).latest('pk')
+
+        data = serialize_instance(program)
+        expected = entry.serialized_data
+
+        # auditlog serializes before auto_now fields are set
+        data['fields'].pop('modified')
+        expected['fields'].pop('modified')
+
+        self.assertEqual(data, expected)
+        self.assertIsNone(serialize_instance(program.level))
+
+    def test_creates_programs(self):
+        record = self.run_import(self.get_feed(3))
+
+        self.assertEqual(record.programs_processed, 6)
+        self.assertEqual(record.programs_created.count(), 6)
+        self.assertEqual(ProgramAuditData.objects.count(), 6)
+        self.assertEqual(
+            LogEntry.objects.get_for_model(Program).filter(action=LogEntry.Action.CREATE).count(),
+            6
+        )
+
+        subplan = Program.objects.get(plan_code='BIO1-BS', subplan_code='ZON')
+        self.assertEqual(subplan.parent_program.name, 'Biology 1')
+        self.assertTrue(subplan.online)
+        self.assertEqual(list(subplan.colleges.values_list('short_name', flat=True)), ['COS'])
+        self.assertEqual(list(subplan.cip.values_list('code', flat=True)), ['26.0101'])
+        self.assertEqual(subplan.start_term.full_name, 'Fall 2024')
+
+        # Signals are skipped, so derived data is refreshed in bulk
+        self.assertEqual(ProgramSearchDocument.objects.count(), 6)
+        self.assertTrue(ProgramSearchTerm.objects.filter(program=subplan).exists())
+
+    def test_unchanged_import(self):
+        self.run_import(self.get_feed(3))
+        entries = LogEntry.objects.count()
+
+        record = self.run_import(self.get_feed(3))
+
+        self.assertEqual(record.programs_created.count(), 0)
+        self.assertEqual(record.programs_modified.count(), 0)
+        self.assertEqual(LogEntry.objects.count(), entries)
+
+    def test_query_count(self):
+        self.run_import(self.get_feed(2))
+
+        with CaptureQueriesContext(connection) as small:
+            self.run_import(self.get_feed(2))
+
+        self.run_import(self.get_feed(10))
+
+        with CaptureQueriesContext(connection) as large:
+            self.run_import(self.get_feed(10))
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_changes(self):
+        self.run_import(self.get_feed(3))
+
+        feed = self.get_feed(2)
+        feed[0] = self.get_plan(
+            'BIO0-BS',
+            'Biology Zero',
+            subplans=['ZON'],
+            College_Full='College of Medicine',
+            CollegeShort='COM'
+        )
+
+        record = self.run_import(feed)
+        program = Program.objects.get(plan_code='BIO0-BS', subplan_code__isnull=True)
+        subplan = program.subplans.get()
+
+        self.assertEqual(program.name, 'Biology Zero')
+        self.assertEqual(list(program.colleges.values_list('short_name', flat=True)), ['COM'])
+        self.assertEqual(list(subplan.colleges.values_list('short_name', flat=True)), ['COM'])
+
+        stale = Program.objects.filter(plan_code='BIO2-BS')
+        self.assertFalse(any(x.valid for x in stale))
+        self.assertEqual(set(record.programs_invalidated.all()), set(stale))
+        self.assertEqual(set(record.programs_modified.all()), {program, subplan} | set(stale))
+
+        entry = LogEntry.objects.get_for_object(program).filter(action=LogEntry.Action.UPDATE).get()
+        self.assertEqual(json.loads(entry.changes)['name'], ['Biology 0', 'Biology Zero'])
+
+        # Invalidated programs are revalidated once they return
+        record = self.run_import(self.get_feed(3))
+
+        self.assertTrue(all(x.valid for x in Program.objects.all()))
+        self.assertEqual(set(record.programs_revalidated.all()), set(stale))
+
+    def test_import_hashes(self):
+        program = Program.objects.create(
+            name='Biology',
+            plan_code='BIO-BS',
+            level=Level.objects.create(name='Bachelors'),
+            career=Career.objects.create(name='Undergraduate'),
+            degree=Degree.objects.create(name='BS')
+        )
+
+        hashes = ImportHashes('test')
+        self.assertFalse(hashes.is_unchanged(program.pk, {'a': 1, 'b': 2}))
+
+        hashes.update(program.pk, {'a': 1, 'b': 2})
+        self.assertEqual(hashes.save(), 1)
+
+        hashes = ImportHashes('test')
+        self.assertTrue(hashes.is_unchanged(program.pk, {'b': 2, 'a': 1}))
+        self.assertFalse(hashes.is_unchanged(program.pk, {'a': 1, 'b': 3}))
+        self.assertFalse(ImportHashes('other').is_unchanged(program.pk, {'a': 1, 'b': 2}))
+        self.assertFalse(ImportHashes('test', full=True).is_unchanged(program.pk, {'a': 1, 'b': 2}))
+
+    def test_unchanged_plans_skipped(self):
+        self.run_import(self.get_feed(3))
+
+        feed = self.get_feed(3)
+        feed[1]['PlanName'] = 'Biology One'
+
+        with mock.patch.object(Program.objects, 'bulk_update', wraps=Program.objects.bulk_update) as bulk_update:
+            record = self.run_import(feed)
+
+        updated = bulk_update.call_args_list[0][0][0]
+
+        self.assertEqual(record.programs_processed, 6)
+        self.assertEqual(set(x.plan_code for x in updated), {'BIO1-BS'})
+        self.assertEqual(record.programs_invalidated.count(), 0)
+
+        record = self.run_import(feed, '--full')
+        self.assertEqual(record.programs_modified.count(), 0)
+
+        # Programs invalidated outside of the feed are
+        # reprocessed even though their plan is unchanged
+        Program.objects.filter(plan_code='BIO2-BS').update(valid=False)
+        record = self.run_import(feed)
+
+        self.assertEqual(record.programs_revalidated.count(), 2)
+
+    def run_tuition_import(self, fees, *args):
+        schedules = [
+            {'Program': 'UnderGrad', 'FeeType': 'SCH', 'FeeName': 'Tuition'},
+            {'Program': 'Grad', 'FeeType': 'SCH', 'FeeName': 'Tuition'}
+        ]
+
+        def get(session, url, params=None, timeout=None):
+            query = parse_qs(urlparse(url).query)
+            response = mock.Mock()
+
+            if 'program' in query:
+                response.json.return_value = fees.get(query['program'][0], [])
+            else:
+                response.json.return_value = schedules
+
+            return response
+
+        with mock.patch.object(requests.Session, 'get', autospec=True, side_effect=get) as session_get:
+            call_command('import-tuition', 'https://tuition.example.com/', *args, stdout=StringIO())
+
+        return session_get
+
+    def test_tuition_import(self):
+        level = Level.objects.create(name='Bachelors')
+        career = Career.objects.create(name='Undergraduate')
+        degree = Degree.objects.create(name='BS')
+
+        programs = [
+            Program.objects.create(name=f'Biology {i}', plan_code=f'BIO{i}-BS', level=level, career=career, degree=degree)
+            for i in range(3)
+        ]
+        graduate = Program.objects.create(
+            name='Biology',
+            plan_code='BIO-MS',
+            level=Level.objects.create(name='Masters'),
+            career=career,
+            degree=degree
+        )
+
+        TuitionOverride.objects.create(tuition_code='UnderGrad', plan_code='BIO2-BS', skip=True)
+
+        fees = {
+            'UnderGrad': [
+                {'Program': 'UnderGrad', 'FeeName': 'Tuition', 'MaxResidentFee': 100.5, 'MaxNonResidentFee': 400},
+                {'Program': 'UnderGrad', 'FeeName': 'Activity Fee', 'MaxResidentFee': 10, 'MaxNonResidentFee': 10},
+                {'Program': 'UnderGrad', 'FeeName': 'Parking (Per Term)', 'MaxResidentFee': 50, 'MaxNonResidentFee': 50}
+            ]
+        }
+
+        session_get = self.run_tuition_import(fees)
+
+        # The schedule list, then one request per schedule
+        self.assertEqual(session_get.call_count, 3)
+
+        for program in programs[:2]:
+            program.refresh_from_db()
+            self.assertEqual(program.resident_tuition, Decimal('110.50'))
+            self.assertEqual(program.nonresident_tuition, Decimal('410.00'))
+            self.assertEqual(program.tuition_type, 'SCH')
+
+        # Skipped programs and schedules without fees are left alone
+        programs[2].refresh_from_db()
+        graduate.refresh_from_db()
+        self.assertIsNone(programs[2].resident_tuition)
+        self.assertIsNone(graduate.resident_tuition)
+
+        entry = LogEntry.objects.get_for_object(programs[0]).get(action=LogEntry.Action.UPDATE)
+        self.assertEqual(json.loads(entry.changes)['resident_tuition'], ['None', '110.5'])
+        self.assertEqual(
+            ProgramSearchDocument.objects.get(pk=programs[0].pk).payload['resident_tuition'],
+            '110.50'
+        )
+
+        # Unchanged schedules are not written again
+        with mock.patch.object(Program.objects, 'bulk_update', wraps=Program.objects.bulk_update) as bulk_update:
+            self.run_tuition_import(fees)
+
+        self.assertEqual(bulk_update.call_args_list[0][0][0], [])
+        self.assertEqual(LogEntry.objects.get_for_object(programs[0]).count(), 2)
+
+    def test_tuition_import_request_error(self):
+        with mock.patch.object(requests.Session, 'get', side_effect=requests.ConnectionError('refused')):
+            with self.assertRaises(CommandError):
+                call_command('import-tuition', 'https://tuition.example.com/', stdout=StringIO())
+
+
+@override_settings(GRADUATE_SLATE_ENDPOINTS={'guids': {'endpoint': 'https://slate.example.com/', 'username': '', 'password': ''}})
+class ImportSlateGuidsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        level = Level.objects.create(name='Masters')
+        career = Career.objects.create(name='Graduate')
+        degree = Degree.objects.create(name='MS')
+
+        cls.biology = Program.objects.create(
+            name='Biology', plan_code='BIO-MS', level=level, career=career, degree=degree, graduate_slate_id='guid-1'
+        )
+        cls.chemistry = Program.objects.create(
+            name='Chemistry', plan_code='CHM-MS', level=level, career=career, degree=degree, graduate_slate_id='guid-2'
+        )
+
+    def run_import(self, rows):
+        with mock.patch('requests.get') as get:
+            get.return_value.text = json.dumps({'row': rows})
+            with mock.patch('sys.stdout', new_callable=StringIO):
+                call_command('import-slate-guids', '--graduate=True')
+
+    def test_unchanged_guids_not_saved(self):
+        with mock.patch.object(Program, 'save') as save:
+            self.run_import([
+                {'PLAN': 'BIO-MS', 'SUBPLAN': None, 'GUID': 'guid-1'},
+                {'PLAN': 'CHM-MS', 'SUBPLAN': None, 'GUID': 'guid-3'}
+            ])
+
+        self.assertEqual(save.call_count, 1)
+
+    def test_missing_guids_cleared(self):
+        refresh_program_documents([self.biology.pk, self.chemistry.pk])
+
+        self.run_import([{'PLAN': 'BIO-MS', 'SUBPLAN': None, 'GUID': 'guid-1'}])
+
+        self.chemistry.refresh_from_db()
+        self.assertIsNone(self.chemistry.graduate_slate_id)
+        self.assertIsNone(ProgramSearchDocument.objects.get(pk=self.chemistry.pk).payload['graduate_slate_id'])
+        self.assertEqual(ProgramSearchDocument.objects.get(pk=self.biology.pk).payload['graduate_slate_id'], 'guid-1')
+
+
+class CIPIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for code, name in [('26', 'Area'), ('26.01', 'Subarea'), ('26.0101', 'Precise'), ('26.0102', 'Other')]:
+            cip = CIP(name=name, description=name, code=code)
+            cip.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hierarchy_lookups(self):
+        precise = CIP.objects.get(code='26.0101')
+
+        self.assertEqual(cip_index.get_area(precise).code, '26')
+        self.assertEqual(cip_index.get_subarea(precise).code, '26.01')
+        self.assertEqual(cip_index.get_precise(precise), precise)
+        self.assertIsNone(cip_index.get_by_code('27', settings.CIP_CURRENT_VERSION))
+
+    def test_index_invalidated_on_save(self):
+        self.assertEqual(cip_index.get_by_code('26', settings.CIP_CURRENT_VERSION).name, 'Area')
+
+        area = CIP.objects.get(code='26')
+        area.name = 'Renamed Area'
+        area.save()
+
+        self.assertEqual(cip_index.get_by_code('26', settings.CIP_CURRENT_VERSION).name, 'Renamed Area')
+
+    @override_settings(CACHE_GENERATION_CHECK_INTERVAL=0)
+    def test_index_invalidated_from_another_process(self):
+        self.assertEqual(cip_index.get_by_code('26', settings.CIP_CURRENT_VERSION).name, 'Area')
+
+        CIP.objects.filter(code='26').update(name='Imported Area')
+        CacheGeneration.objects.filter(key=cip_index.cache_key).update(generation='0' * 32)
+
+        self.assertEqual(cip_index.get_by_code('26', settings.CIP_CURRENT_VERSION).name, 'Imported Area')
+
+    def test_cip_list_has_no_per_row_queries(self):
+        cip_index.ensure_built()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('api.cip.list'))
+
+        self.assertEqual(response.status_code, 200)
+        # One COUNT for pagination plus the page itself
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        details = {x['code']: x for x in response.json()['results']}
+        self.assertEqual(details['26.0101']['area_detail']['code'], '26')
+        self.assertEqual(details['26.0101']['subarea_detail']['code'], '26.01')
+        self.assertIsNone(details['26.0101']['precise_detail'])
+
+
+class ProgramExcerptTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = Program.objects.create(
+            name='Biology',
+            plan_code='BIO-BS',
+            level=Level.objects.create(name='Bachelors'),
+            career=Career.objects.create(name='Undergraduate'),
+            degree=Degree.objects.create(name='BS')
+        )
+        cls.source_type = ProgramDescriptionType.objects.create(name=settings.EXCERPT_DESCRIPTION_TYPE_SOURCE)
+        cls.other_type = ProgramDescriptionType.objects.create(name='Catalog Description')
+
+    def test_excerpt_set_on_source_description_save(self):
+        ProgramDescription.objects.create(
+            description_type=self.source_type,
+            description='<p>The <strong>study</strong> of life.</p>',
+            program=self.program
+        )
+        ProgramDescription.objects.create(
+            description_type=self.other_type,
+            description='<p>Ignored.</p>',
+            program=self.program
+        )
+
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.excerpt, 'The study of life.')
+
+    def test_excerpt_cleared_on_source_description_delete(self):
+        description = ProgramDescription.objects.create(
+            description_type=self.source_type,
+            description='<p>The study of life.</p>',
+            program=self.program
+        )
+        description.delete()
+
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.excerpt, '')
+
+    def test_rebuild_excerpts_command(self):
+        ProgramDescription.objects.create(
+            description_type=self.source_type,
+            description='<p>' + ' '.join(['word'] * 30) + '</p>',
+            program=self.program
+        )
+        Program.objects.update(excerpt='stale')
+
+        call_command('rebuild-excerpts', stdout=StringIO(), stderr=StringIO())
+
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.excerpt, ' '.join(['word'] * 25) + '...')
+
+
+@override_settings(PROGRAM_PROFILE=[
+    {'conditions': [{'field': 'online', 'value': True}], 'value': 'Online'},
+    {'conditions': [], 'value': 'Main Site'}
+])
+class ProgramProfileRuleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        level = Level.objects.create(name='Bachelors')
+        career = Career.objects.create(name='Undergraduate')
+        degree = Degree.objects.create(name='BS')
+
+        cls.main_site = ProgramProfileType.objects.create(name='Main Site', root_url='https://www.ucf.edu/degree/')
+        cls.online = ProgramProfileType.objects.create(name='Online', root_url='https://www.ucf.edu/online/')
+
+        cls.campus_program = Program.objects.create(
+            name='Biology', plan_code='BIO-BS', level=level, career=career, degree=degree
+        )
+        cls.online_program = Program.objects.create(
+            name='Biology Online', plan_code='BIO-BS', subplan_code='ZON',
+            level=level, career=career, degree=degree, online=True
+        )
+
+        ProgramProfile.objects.create(profile_type=cls.main_site, url='https://www.ucf.edu/degree/bio/', program=cls.online_program, primary=True)
+        ProgramProfile.objects.create(profile_type=cls.online, url='https://www.ucf.edu/online/bio/', program=cls.online_program)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_primary_profile_type(self):
+        self.assertEqual(self.campus_program.primary_profile_type, self.main_site)
+        self.assertEqual(self.online_program.primary_profile_type, self.online)
+
+    def test_get_primary_profile_urls(self):
+        ProgramProfileType.objects.get_profile_rules()
+
+        # One query for the programs, one for their profiles
+        with self.assertNumQueries(2):
+            urls = Program.get_primary_profile_urls(Program.objects.all())
+
+        self.assertEqual(urls[self.campus_program.pk], 'https://www.ucf.edu/degree/')
+        self.assertEqual(urls[self.online_program.pk], 'https://www.ucf.edu/degree/bio/')
+
+    def test_process_profiles_command(self):
+        call_command('process-profiles', stdout=StringIO())
+
+        primary = self.online_program.profiles.get(primary=True)
+        self.assertEqual(primary.profile_type, self.online)
+
+    @override_settings(CACHE_GENERATION_CHECK_INTERVAL=0)
+    def test_rules_invalidated_from_another_process(self):
+        self.assertEqual(len(ProgramProfileType.objects.get_profile_rules()), 2)
+
+        ProgramProfileType.objects.filter(pk=self.online.pk).update(name='Online (Retired)')
+        CacheGeneration.objects.filter(key=ProgramProfileType.objects.rules_cache_key).update(generation='0' * 32)
+
+        rules = ProgramProfileType.objects.get_profile_rules()
+        self.assertEqual([x.profile_type for x in rules], [self.main_site])
+
+    def test_profile_type_save_refreshes_affected_documents(self):
+        with mock.patch('programs.signals.refresh_program_documents') as refresh:
+            self.online.root_url = 'https://www.ucf.edu/online/degrees/'
+            self.online.save()
+
+        # The campus program neither has an Online profile
+        # nor matches the Online rule
+        self.assertEqual(refresh.call_args[0][0], {self.online_program.pk})
+
+        with mock.patch('programs.signals.refresh_program_documents') as refresh:
+            self.main_site.root_url = 'https://www.ucf.edu/degrees/'
+            self.main_site.save()
+
+        self.assertEqual(refresh.call_args[0][0], {self.campus_program.pk, self.online_program.pk})
+
+    def test_profile_type_rename_refreshes_previous_fallbacks(self):
+        with mock.patch('programs.signals.refresh_program_documents') as refresh:
+            self.main_site.name = 'Degree Site'
+            self.main_site.save()
+
+        self.assertIn(self.campus_program.pk, refresh.call_args[0][0])
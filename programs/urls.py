@@ -32,7 +32,7 @@ urlpatterns = [
         ),
     url(
         r'^programs/(?P<id>\d+)/careers/ranked/$',
-        ProgramCareerView.as_view(),
+        ProgramRankedCareerView.as_view(),
         name='api.programs.careers.ranked'
     ),
     url(
@@ -49,6 +49,18 @@ urlpatterns = [
         ProgramSearchView.as_view(),
         name='api.programs.search'
         ),
+    url(r'^programs/projections/$',
+        ProgramProjectionTotalsBulkView.as_view(),
+        name='api.programs.projections.bulk'
+        ),
+    url(r'^programs/careers/ranked/$',
+        ProgramRankedCareerBulkView.as_view(),
+        name='api.programs.careers.ranked.bulk'
+        ),
+    url(r'^programs/bulk/$',
+        ProgramBulkView.as_view(),
+        name='api.programs.bulk'
+        ),
     url(r'^colleges/$',
         CollegeListView.as_view(),
         name='api.colleges.list'
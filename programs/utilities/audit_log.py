@@ -0,0 +1,91 @@
+import copy
+import json
+
+from auditlog.diff import mask_str, model_instance_diff
+from auditlog.models import LogEntry
+from auditlog.registry import auditlog
+from django.contrib.contenttypes.models import ContentType
+from django.core import serializers
+from django.utils.encoding import smart_str
+
+
+def serialize_instance(instance):
+    """
+    Returns the serialized data auditlog stores with the
+    log entries of an instance, following the options the
+    model was registered with, or None if the model is
+    not registered to serialize its data.
+    """
+    model = instance.__class__
+
+    if not auditlog.contains(model):
+        return None
+
+    options = auditlog.get_serialize_options(model)
+
+    if not options['serialize_data']:
+        return None
+
+    model_fields = auditlog.get_model_fields(model)
+    kwargs = options['serialize_kwargs']
+
+    if options['serialize_auditlog_fields_only']:
+        field_names = [x.name for x in model._meta.fields]
+        include_fields = model_fields['include_fields'] or field_names
+        kwargs.setdefault('fields', list(set(include_fields).difference(model_fields['exclude_fields'])))
+
+    # Values set in memory may not be typed yet, which
+    # the serializer relies on
+    instance = copy.copy(instance)
+    for field in instance._meta.fields:
+        if not field.is_relation:
+            setattr(instance, field.attname, field.to_python(getattr(instance, field.attname)))
+
+    data = json.loads(serializers.serialize('json', [instance], **kwargs))[0]
+
+    data['fields'] = {
+        key: mask_str(value) if isinstance(value, str) and key in model_fields['mask_fields'] else value
+        for key, value in data['fields'].items()
+    }
+
+    return data
+
+
+def build_log_entry(old, new, actor_id=None):
+    """
+    Returns the audit log entry auditlog would write when
+    saving `new` over `old`, or when creating `new` if
+    `old` is None. Returns None when nothing changed.
+    """
+    changes = model_instance_diff(old, new)
+
+    if not changes:
+        return None
+
+    return LogEntry(
+        content_type=ContentType.objects.get_for_model(new),
+        object_pk=new.pk,
+        object_id=new.pk,
+        object_repr=smart_str(new),
+        serialized_data=serialize_instance(new),
+        action=LogEntry.Action.CREATE if old is None else LogEntry.Action.UPDATE,
+        changes=json.dumps(changes),
+        actor_id=actor_id
+    )
+
+
+def bulk_log_changes(changes, actor_id=None, batch_size=500) -> int:
+    """
+    Writes the audit log entries of a list of
+    `(old, new)` instance pairs in batches, for
+    changes saved without model signals. Returns
+    the number of entries written.
+    """
+    entries = [
+        x for x in (build_log_entry(old, new, actor_id) for old, new in changes)
+        if x is not None
+    ]
+
+    LogEntry.objects.bulk_create(entries, batch_size=batch_size)
+
+    return len(entries)
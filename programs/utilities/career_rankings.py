@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from programs.models import ProgramCareer, ProgramCareerRanking, WeightedJobPosition
+from programs.utilities.program_careers import get_program_careers
+
+
+def build_career_rankings(program_ids=None) -> dict:
+    """
+    Returns the names of the weighted job positions of
+    each program, highest weight first, keyed by program
+    ID. Ties are broken by name.
+    """
+    weighted = WeightedJobPosition.objects.order_by('program_id', '-weight', 'job__name')
+
+    if program_ids is not None:
+        weighted = weighted.filter(program_id__in=program_ids)
+
+    rankings = defaultdict(list)
+
+    for program_id, name in weighted.values_list('program_id', 'job__name'):
+        if name not in rankings[program_id]:
+            rankings[program_id].append(name)
+
+    return dict(rankings)
+
+
+def refresh_career_rankings(program_ids=None) -> int:
+    """
+    Rebuilds the career rankings of the programs with
+    the given IDs, or of every program, and returns the
+    number of rankings written.
+    """
+    if program_ids is not None:
+        program_ids = set(program_ids)
+
+        if not program_ids:
+            return 0
+
+    rankings = build_career_rankings(program_ids)
+    existing = ProgramCareerRanking.objects.all()
+
+    if program_ids is not None:
+        existing = existing.filter(program_id__in=program_ids)
+
+    with transaction.atomic():
+        existing.delete()
+        ProgramCareerRanking.objects.bulk_create([
+            ProgramCareerRanking(program_id=program_id, careers=careers)
+            for program_id, careers in rankings.items()
+        ], batch_size=500)
+
+    return len(rankings)
+
+
+def get_ranked_careers(program_ids) -> dict:
+    """
+    Returns the ranked career names of each of the given
+    programs, keyed by program ID. Programs without
+    weighted job positions list their jobs unranked.
+    """
+    program_ids = set(program_ids)
+
+    retval = dict(
+        ProgramCareerRanking.objects.filter(program_id__in=program_ids).values_list('program_id', 'careers')
+    )
+
+    unranked = program_ids - set(retval.keys())
+
+    if unranked:
+        retval.update(get_program_careers(unranked, sources=[ProgramCareer.SOURCE_MANUAL]))
+
+    return retval
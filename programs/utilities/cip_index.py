@@ -0,0 +1,106 @@
+from threading import Lock
+
+from programs.models import CIP
+from programs.utilities.generation import get_generation, bump_generation
+
+
+class CIPIndex(object):
+    """
+    In-process index of the CIP hierarchy
+    (area -> subarea -> precise), keyed by CIP version.
+
+    The CIP table is small and only changes when CIPs
+    are imported or edited, so the whole table is loaded
+    once per process and reused until the generation
+    stored in the database is bumped by `invalidate()`.
+    Other processes rebuild their index within
+    CACHE_GENERATION_CHECK_INTERVAL seconds of a bump.
+    """
+    cache_key = 'programs.cip_index.generation'
+
+    def __init__(self):
+        self.generation = None
+        self.codes = {}
+        self.tree = {}
+        self.lock = Lock()
+
+    def invalidate(self):
+        """
+        Marks the index as stale in every process
+        """
+        bump_generation(self.cache_key)
+
+    def ensure_built(self):
+        """
+        Rebuilds the index if it has not been built
+        yet, or if it has been invalidated.
+        """
+        generation = get_generation(self.cache_key)
+
+        if self.generation == generation:
+            return
+
+        with self.lock:
+            if self.generation == generation:
+                return
+
+            codes = {}
+            tree = {}
+
+            for cip in CIP.objects.all():
+                codes.setdefault(cip.version, {}).setdefault(cip.code, cip)
+                tree.setdefault(cip.version, {}) \
+                    .setdefault(cip.area, {}) \
+                    .setdefault(cip.subarea, {}) \
+                    .setdefault(cip.precise, []) \
+                    .append(cip)
+
+            self.codes = codes
+            self.tree = tree
+            self.generation = generation
+
+    def get_by_code(self, code, version) -> CIP:
+        """
+        Returns the CIP with the given code and version,
+        or None if no such CIP exists.
+        """
+        self.ensure_built()
+        return self.codes.get(version, {}).get(code)
+
+    def get_node(self, version, area, subarea=0, precise=0) -> CIP:
+        """
+        Returns the CIP found at the given point in the
+        hierarchy. Returns None if no CIP, or more than
+        one CIP, exists at that point.
+        """
+        self.ensure_built()
+        matches = self.tree.get(version, {}) \
+            .get(area, {}) \
+            .get(subarea, {}) \
+            .get(precise, [])
+
+        if len(matches) != 1:
+            return None
+
+        return matches[0]
+
+    def get_area(self, cip) -> CIP:
+        """
+        Returns the top-level area CIP of the given CIP
+        """
+        return self.get_node(cip.version, cip.area)
+
+    def get_subarea(self, cip) -> CIP:
+        """
+        Returns the subarea CIP of the given CIP
+        """
+        return self.get_node(cip.version, cip.area, cip.subarea)
+
+    def get_precise(self, cip) -> CIP:
+        """
+        Returns the precise CIP of the given CIP
+        """
+        return self.get_node(cip.version, cip.area, cip.subarea, cip.precise)
+
+
+cip_index = CIPIndex()
@@ -0,0 +1,61 @@
+from django.db.models import Count
+
+from programs.models import Program
+
+
+# The facets programs can be counted by, along with
+# the ID and name columns of each facet's values
+FACETS = {
+    'colleges': ('colleges__id', 'colleges__full_name'),
+    'level': ('level_id', 'level__name'),
+    'career': ('career_id', 'career__name'),
+    'degree': ('degree_id', 'degree__name'),
+    'online': ('online', None)
+}
+
+
+def get_program_facets(queryset, names=None) -> dict:
+    """
+    Returns the number of programs in the given queryset
+    for each value of each facet. Each facet is counted
+    in the database, with one grouped query over the
+    matching programs.
+
+    The queryset may be of programs or of program search
+    documents, since both are keyed by program ID.
+    """
+    names = [x for x in FACETS if names is None or x in names]
+
+    if not names:
+        return {}
+
+    programs = Program.objects.filter(pk__in=queryset.order_by().values('pk'))
+    retval = {}
+
+    for name in names:
+        id_column, name_column = FACETS[name]
+        columns = [x for x in (id_column, name_column) if x is not None]
+
+        # Programs without a college aren't counted
+        # in the colleges facet
+        rows = programs.filter(
+            **{f"{id_column}__isnull": False}
+        ).values(
+            *columns
+        ).annotate(
+            count=Count('pk', distinct=True)
+        ).order_by()
+
+        retval[name] = sorted(
+            [
+                {
+                    'value': row[id_column],
+                    'label': row[name_column] if name_column else row[id_column],
+                    'count': row['count']
+                }
+                for row in rows
+            ],
+            key=lambda x: (-x['count'], str(x['label']))
+        )
+
+    return retval
@@ -0,0 +1,68 @@
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+
+def get_generation_check_interval() -> int:
+    """
+    Returns how long, in seconds, a process reuses a
+    generation before reading it from the database again.
+    """
+    return getattr(settings, 'CACHE_GENERATION_CHECK_INTERVAL', 5)
+
+
+def get_local_key(key: str) -> str:
+    return f"programs.generation.{key}"
+
+
+def get_generation(key: str) -> str:
+    """
+    Returns the current generation stored under the
+    given key, creating one if it does not exist.
+
+    Generations are used to tell every process that
+    locally held data has gone stale. They are stored in
+    the database, so a bump made by a management command
+    reaches every web worker whether or not the workers
+    share a cache. Each process keeps the generation it
+    read in its cache for up to
+    CACHE_GENERATION_CHECK_INTERVAL seconds.
+    """
+    local_key = get_local_key(key)
+    generation = cache.get(local_key)
+
+    if generation is not None:
+        return generation
+
+    CacheGeneration = apps.get_model('programs', 'CacheGeneration')
+    generation = CacheGeneration.objects.filter(key=key).values_list('generation', flat=True).first()
+
+    if generation is None:
+        try:
+            with transaction.atomic():
+                generation = CacheGeneration.objects.create(key=key, generation=uuid.uuid4().hex).generation
+        except IntegrityError:
+            # Another process created it first
+            generation = CacheGeneration.objects.get(key=key).generation
+
+    cache.set(local_key, generation, timeout=get_generation_check_interval())
+
+    return generation
+
+
+def bump_generation(key: str) -> str:
+    """
+    Replaces the generation stored under the given
+    key, invalidating anything built against the
+    previous generation.
+    """
+    CacheGeneration = apps.get_model('programs', 'CacheGeneration')
+    generation = uuid.uuid4().hex
+
+    CacheGeneration.objects.update_or_create(key=key, defaults={'generation': generation})
+    cache.set(get_local_key(key), generation, timeout=get_generation_check_interval())
+
+    return generation
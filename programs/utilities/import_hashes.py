@@ -0,0 +1,76 @@
+import hashlib
+import json
+
+from django.db import transaction
+
+from programs.models import ProgramImportHash
+
+
+class ImportHashes(object):
+    """
+    The hashes of the source records an importer last
+    processed, by program. Records whose hash has not
+    changed since are skipped, unless `full` is set.
+    New hashes are only written by `save`, so records
+    are reprocessed if the import fails.
+    """
+    def __init__(self, source, full=False):
+        self.source = source
+        self.full = full
+        self.hashes = dict(
+            ProgramImportHash.objects.filter(source=source).values_list('program_id', 'hash')
+        )
+        self.changed = {}
+        self.unchanged_count = 0
+
+    @staticmethod
+    def get_hash(data) -> str:
+        """
+        Returns a stable hash of any JSON serializable data
+        """
+        content = json.dumps(data, sort_keys=True, default=str)
+
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def is_unchanged(self, program_id, data) -> bool:
+        """
+        Returns whether the given source record of a
+        program is the same as when it was last processed.
+        """
+        if self.full or program_id is None:
+            return False
+
+        unchanged = self.hashes.get(program_id) == self.get_hash(data)
+
+        if unchanged:
+            self.unchanged_count += 1
+
+        return unchanged
+
+    def update(self, program_id, data):
+        """
+        Records the source record a program was processed from
+        """
+        value = self.get_hash(data)
+
+        if self.hashes.get(program_id) != value:
+            self.changed[program_id] = value
+
+    def save(self) -> int:
+        """
+        Writes the hashes recorded since the last save and
+        returns how many were written.
+        """
+        changed = self.changed
+
+        with transaction.atomic():
+            ProgramImportHash.objects.filter(source=self.source, program_id__in=changed.keys()).delete()
+            ProgramImportHash.objects.bulk_create([
+                ProgramImportHash(program_id=program_id, source=self.source, hash=value)
+                for program_id, value in changed.items()
+            ], batch_size=500)
+
+        self.hashes.update(changed)
+        self.changed = {}
+
+        return len(changed)
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from programs.models import Program, ProgramCareer, WeightedJobPosition
+
+
+def get_manual_jobs(program_ids=None):
+    through = Program.jobs.through.objects.all()
+
+    if program_ids is not None:
+        through = through.filter(program_id__in=program_ids)
+
+    return through.values_list('program_id', 'jobposition_id')
+
+
+def get_soc_jobs(program_ids=None):
+    """
+    Returns the jobs of the current occupations of each
+    program's current CIP. Programs with more than one
+    current CIP have no current CIP, so they are left out.
+    """
+    through = Program.cip.through.objects.filter(cip__version=settings.CIP_CURRENT_VERSION)
+
+    if program_ids is not None:
+        through = through.filter(program_id__in=program_ids)
+
+    ambiguous = through.values('program_id').annotate(cips=Count('cip_id')).filter(cips__gt=1).values('program_id')
+
+    return through.exclude(
+        program_id__in=ambiguous
+    ).filter(
+        cip__occupations__version=settings.SOC_CURRENT_VERSION,
+        cip__occupations__jobs__isnull=False
+    ).values_list(
+        'program_id', 'cip__occupations__jobs'
+    )
+
+
+def get_weighted_jobs(program_ids=None):
+    weighted = WeightedJobPosition.objects.all()
+
+    if program_ids is not None:
+        weighted = weighted.filter(program_id__in=program_ids)
+
+    return weighted.values_list('program_id', 'job_id')
+
+
+source_jobs = {
+    ProgramCareer.SOURCE_MANUAL: get_manual_jobs,
+    ProgramCareer.SOURCE_SOC: get_soc_jobs,
+    ProgramCareer.SOURCE_WEIGHTED: get_weighted_jobs
+}
+
+
+def refresh_program_careers(program_ids=None, sources=None, batch_size=500) -> dict:
+    """
+    Recomputes the careers of the programs with the given
+    IDs, or of every program, from the given sources, or
+    from every source. Only rows that changed are written.
+    Returns the number of rows created and deleted.
+    """
+    if program_ids is not None:
+        program_ids = set(program_ids)
+
+        if not program_ids:
+            return {'created': 0, 'deleted': 0}
+
+    sources = sources or list(source_jobs.keys())
+    created = []
+    deleted = []
+
+    for source in sources:
+        jobs = set(source_jobs[source](program_ids))
+
+        existing = ProgramCareer.objects.filter(source=source)
+
+        if program_ids is not None:
+            existing = existing.filter(program_id__in=program_ids)
+
+        existing = {(x[1], x[2]): x[0] for x in existing.values_list('pk', 'program_id', 'job_id')}
+
+        deleted.extend(pk for key, pk in existing.items() if key not in jobs)
+        created.extend(
+            ProgramCareer(program_id=program_id, job_id=job_id, source=source)
+            for program_id, job_id in jobs if (program_id, job_id) not in existing
+        )
+
+    with transaction.atomic():
+        for i in range(0, len(deleted), batch_size):
+            ProgramCareer.objects.filter(pk__in=deleted[i:i + batch_size]).delete()
+
+        ProgramCareer.objects.bulk_create(created, batch_size=batch_size)
+
+    return {'created': len(created), 'deleted': len(deleted)}
+
+
+def get_program_careers(program_ids, sources=None) -> dict:
+    """
+    Returns the distinct job names of each of the given
+    programs from the given sources, or from every
+    source, keyed by program ID.
+    """
+    program_ids = set(program_ids)
+    retval = {x: [] for x in program_ids}
+
+    careers = ProgramCareer.objects.filter(program_id__in=program_ids)
+
+    if sources is not None:
+        careers = careers.filter(source__in=sources)
+
+    careers = careers.order_by('program_id', 'job__name').values_list('program_id', 'job__name')
+
+    for program_id, name in careers:
+        if name not in retval[program_id]:
+            retval[program_id].append(name)
+
+    return retval
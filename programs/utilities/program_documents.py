@@ -0,0 +1,145 @@
+import json
+import warnings
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from programs.models import Program, ProgramSearchDocument
+from programs.serializers import ProgramSerializer
+
+
+def serialize_programs(programs) -> dict:
+    """
+    Returns the full serialized representation of each
+    of the given programs, keyed by program ID. Links to
+    other API resources are relative, since there is no
+    request to build them from.
+    """
+    queryset = ProgramSerializer.setup_eager_loading(
+        Program.objects.filter(pk__in=[x.pk for x in programs]),
+        ProgramSerializer.Meta.fields
+    )
+
+    # Without a request the dynamic fields mixins
+    # warn that there are no query params to read
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        data = ProgramSerializer(queryset, many=True, context={'request': None}).data
+
+    # Round trip through JSON so payloads compare equal
+    # to the ones loaded back from the database
+    return {x['id']: json.loads(json.dumps(x, cls=DjangoJSONEncoder)) for x in data}
+
+
+def build_documents(programs) -> list:
+    """
+    Returns the unsaved documents of the given programs
+    """
+    programs = list(programs)
+    payloads = serialize_programs(programs)
+
+    return [
+        ProgramSearchDocument(
+            id=program.pk,
+            name=program.name,
+            plan_code=program.plan_code,
+            subplan_code=program.subplan_code,
+            level_id=program.level_id,
+            career_id=program.career_id,
+            degree_id=program.degree_id,
+            parent_program_id=program.parent_program_id,
+            online=program.online,
+            valid=program.valid,
+            active=program.active,
+            has_locations=program.has_locations,
+            college_ids=join_ids(x.pk for x in program.colleges.all()),
+            department_ids=join_ids(x.pk for x in program.departments.all()),
+            payload=payloads[program.pk]
+        )
+        for program in programs
+    ]
+
+
+def join_ids(ids) -> str:
+    ids = sorted(ids)
+
+    return f"|{'|'.join(str(x) for x in ids)}|" if ids else ''
+
+
+def get_programs(program_ids=None):
+    programs = Program.objects.prefetch_related('colleges', 'departments')
+
+    if program_ids is not None:
+        programs = programs.filter(pk__in=program_ids)
+
+    return programs
+
+
+def refresh_program_documents(program_ids):
+    """
+    Rebuilds the documents of the programs with the given
+    IDs, and removes those of programs that no longer exist.
+    """
+    program_ids = set(program_ids)
+
+    if not program_ids:
+        return
+
+    documents = build_documents(get_programs(program_ids))
+
+    with transaction.atomic():
+        ProgramSearchDocument.objects.filter(id__in=program_ids).delete()
+        ProgramSearchDocument.objects.bulk_create(documents)
+
+
+def rebuild_program_documents(batch_size=200) -> int:
+    """
+    Rebuilds every program document and returns
+    the number of documents written.
+    """
+    count = 0
+    program_ids = list(Program.objects.order_by('pk').values_list('pk', flat=True))
+
+    with transaction.atomic():
+        ProgramSearchDocument.objects.all().delete()
+
+        for i in range(0, len(program_ids), batch_size):
+            documents = build_documents(get_programs(program_ids[i:i + batch_size]))
+            ProgramSearchDocument.objects.bulk_create(documents)
+            count += len(documents)
+
+    return count
+
+
+def check_program_documents(batch_size=200) -> dict:
+    """
+    Compares every stored document against one built from
+    the current program data, and returns the IDs of the
+    programs whose documents are missing or out of date,
+    and of the documents with no matching program.
+    """
+    fields = [
+        x.name for x in ProgramSearchDocument._meta.get_fields()
+        if x.name not in ('id', 'updated')
+    ]
+
+    program_ids = list(Program.objects.order_by('pk').values_list('pk', flat=True))
+    document_ids = set(ProgramSearchDocument.objects.values_list('id', flat=True))
+
+    retval = {
+        'missing': [x for x in program_ids if x not in document_ids],
+        'stale': [],
+        'orphaned': sorted(document_ids - set(program_ids))
+    }
+
+    for i in range(0, len(program_ids), batch_size):
+        batch = [x for x in program_ids[i:i + batch_size] if x in document_ids]
+        stored = ProgramSearchDocument.objects.in_bulk(batch)
+
+        for expected in build_documents(get_programs(batch)):
+            actual = stored[expected.id]
+
+            if any(getattr(actual, x) != getattr(expected, x) for x in fields):
+                retval['stale'].append(expected.id)
+
+    return retval
@@ -0,0 +1,112 @@
+from programs.models import Program
+from programs.utilities.projection_totals import get_projection_totals
+
+
+class ProgramResources(object):
+    """
+    Loads the sub-resources linked from a program
+    (outcomes, projection totals, careers and application
+    deadlines) for a whole set of programs at once.
+
+    Each resource is loaded with a fixed number of queries
+    across every program ID, regardless of how many
+    programs are requested.
+    """
+    names = (
+        'outcomes',
+        'projection_totals',
+        'careers',
+        'application_deadlines'
+    )
+
+    def __init__(self, programs, names=None):
+        self.programs = list(programs)
+        self.program_ids = [x.pk for x in self.programs]
+        self.names = [x for x in self.names if names is None or x in names]
+
+    def load(self) -> dict:
+        """
+        Returns the requested resources of
+        each program, keyed by program ID.
+        """
+        retval = {x: {} for x in self.program_ids}
+
+        for name in self.names:
+            loaded = getattr(self, f"load_{name}")()
+
+            for program_id, value in loaded.items():
+                retval[program_id][name] = value
+
+        return retval
+
+    def load_outcomes(self) -> dict:
+        """
+        Returns the outcome stats of each program, along
+        with the stat of the latest academic year.
+        """
+        retval = {x: {'by_year': [], 'latest': None} for x in self.program_ids}
+
+        through = Program.outcomes.through.objects.filter(
+            program_id__in=self.program_ids
+        ).select_related(
+            'programoutcomestat__academic_year'
+        ).order_by('pk')
+
+        for row in through:
+            outcomes = retval[row.program_id]
+            stat = row.programoutcomestat
+            outcomes['by_year'].append(stat)
+
+            latest = outcomes['latest']
+            if latest is None or stat.academic_year.code > latest.academic_year.code:
+                outcomes['latest'] = stat
+
+        return retval
+
+    def load_projection_totals(self) -> dict:
+        """
+        Returns the employment projection totals of the
+        current report for each program.
+        """
+        return get_projection_totals(self.program_ids)
+
+    def load_careers(self) -> dict:
+        """
+        Returns the distinct job names of each program.
+        """
+        retval = {x: [] for x in self.program_ids}
+
+        through = Program.jobs.through.objects.filter(
+            program_id__in=self.program_ids
+        ).values_list('program_id', 'jobposition__name').order_by('pk')
+
+        for program_id, name in through:
+            if name not in retval[program_id]:
+                retval[program_id].append(name)
+
+        return retval
+
+    def load_application_deadlines(self) -> dict:
+        """
+        Returns the application deadlines and
+        requirements of each program.
+        """
+        retval = {
+            x.pk: {
+                'application_deadlines': [],
+                'application_requirements': x.application_requirements if x.application_requirements else []
+            }
+            for x in self.programs
+        }
+
+        through = Program.application_deadlines.through.objects.filter(
+            program_id__in=self.program_ids
+        ).select_related(
+            'applicationdeadline__admission_term',
+            'applicationdeadline__deadline_type'
+        ).order_by('pk')
+
+        for row in through:
+            retval[row.program_id]['application_deadlines'].append(row.applicationdeadline)
+
+        return retval
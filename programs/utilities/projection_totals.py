@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+
+from programs.models import EmploymentProjection, Program
+from programs.utilities.generation import get_generation, bump_generation
+
+
+GENERATION_CACHE_KEY = 'programs.projection_totals.generation'
+
+EMPTY_TOTALS = {
+    'begin_employment': None,
+    'end_employment': None,
+    'change': None,
+    'change_percentage': None,
+    'openings': None,
+    'begin_year': None,
+    'end_year': None
+}
+
+
+def get_projection_totals_cache_timeout() -> int:
+    """
+    Returns how long, in seconds, cached projection
+    totals are kept.
+    """
+    return getattr(settings, 'PROJECTION_TOTALS_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def get_cache_key(program_id, generation) -> str:
+    return f"programs.projection_totals.{settings.PROJ_CURRENT_REPORT}.{generation}.{program_id}"
+
+
+def get_projection_totals(program_ids) -> dict:
+    """
+    Returns the employment projection totals of the
+    current report for each of the given programs, keyed
+    by program ID.
+
+    Totals are cached per program and report for up to
+    PROJECTION_TOTALS_CACHE_TIMEOUT seconds. Programs
+    missing from the cache are aggregated together in a
+    single grouped query over Program -> CIP -> SOC ->
+    EmploymentProjection.
+    """
+    program_ids = list(program_ids)
+    generation = get_generation(GENERATION_CACHE_KEY)
+
+    keys = {get_cache_key(x, generation): x for x in program_ids}
+    cached = cache.get_many(list(keys.keys()))
+
+    retval = {keys[key]: value for key, value in cached.items()}
+    missing = [x for x in program_ids if x not in retval]
+
+    if missing:
+        totals = aggregate_projection_totals(missing)
+        cache.set_many(
+            {get_cache_key(x, generation): totals[x] for x in missing},
+            timeout=get_projection_totals_cache_timeout()
+        )
+        retval.update(totals)
+
+    return retval
+
+
+def aggregate_projection_totals(program_ids) -> dict:
+    """
+    Aggregates the projection totals of the given
+    programs without going through the cache.
+    """
+    report = settings.PROJ_CURRENT_REPORT
+
+    # Programs without exactly one current CIP
+    # have no current occupations, and so no totals
+    single_cip = Program.objects.filter(
+        pk__in=program_ids
+    ).annotate(
+        current_cip_count=Count('cip', filter=Q(cip__version=settings.CIP_CURRENT_VERSION))
+    ).filter(
+        current_cip_count=1
+    ).values('pk')
+
+    rows = EmploymentProjection.objects.filter(
+        report=report,
+        soc__version=settings.SOC_CURRENT_VERSION,
+        soc__cip__version=settings.CIP_CURRENT_VERSION,
+        soc__cip__program__in=single_cip
+    ).values(
+        'soc__cip__program'
+    ).annotate(
+        begin_employment=Sum('begin_employment'),
+        end_employment=Sum('end_employment'),
+        change=Sum('change'),
+        change_percentage=Avg('change_percentage'),
+        openings=Sum('openings')
+    ).order_by()
+
+    retval = {x: dict(EMPTY_TOTALS) for x in program_ids}
+
+    for row in rows:
+        program_id = row.pop('soc__cip__program')
+        row['begin_year'] = f"20{report[:2]}"
+        row['end_year'] = f"20{report[2:4]}"
+        retval[program_id] = row
+
+    return retval
+
+
+def invalidate_projection_totals():
+    """
+    Invalidates every cached projection total
+    """
+    bump_generation(GENERATION_CACHE_KEY)
@@ -0,0 +1,59 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+from programs.utilities.generation import get_generation, bump_generation
+
+
+GENERATION_CACHE_KEY = 'programs.response_cache.generation'
+
+
+def get_response_cache_timeout() -> int:
+    """
+    Returns how long, in seconds, cached program
+    API responses are kept.
+    """
+    return getattr(settings, 'PROGRAM_RESPONSE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def get_response_cache_key(request) -> str:
+    """
+    Returns the cache key of a request, built from the
+    absolute path, the normalized query params, the
+    authentication state and the rendered format, scoped
+    to the current response cache generation.
+    """
+    params = sorted(
+        (key, value)
+        for key in request.query_params.keys()
+        for value in request.query_params.getlist(key)
+    )
+
+    raw = json.dumps([
+        request.build_absolute_uri(request.path),
+        params,
+        request.user.is_authenticated,
+        request.accepted_renderer.format
+    ])
+
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    generation = get_generation(GENERATION_CACHE_KEY)
+
+    return f"programs.response.{generation}.{digest}"
+
+
+def get_cached_response_data(key):
+    return cache.get(key)
+
+
+def set_cached_response_data(key, data):
+    cache.set(key, data, timeout=get_response_cache_timeout())
+
+
+def invalidate_response_cache():
+    """
+    Invalidates every cached program API response
+    """
+    bump_generation(GENERATION_CACHE_KEY)
@@ -0,0 +1,267 @@
+import math
+import re
+from collections import defaultdict
+
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q, Sum
+from unidecode import unidecode
+
+from programs.models import CIP, Program, ProgramDescription, ProgramSearchTerm
+from programs.utilities.generation import get_generation, bump_generation
+
+
+class ProgramSearchIndex(object):
+    """
+    Inverted index over the searchable text of programs,
+    stored in the ProgramSearchTerm table so it works the
+    same on every database backend.
+
+    Programs are ranked with BM25, using field weighted
+    term frequencies (a match in the name counts for more
+    than one in a description). The last word of a query
+    is also matched as a prefix once it is at least
+    `min_prefix_length` characters long, so partially
+    typed queries return results. Every matching program
+    is ranked, so counts and facets cover the full match
+    set.
+    """
+    cache_key = 'programs.search_index.generation'
+
+    # The weight each occurrence of a term has, by field
+    field_weights = {
+        'name': 5.0,
+        'degree': 2.0,
+        'cip': 2.0,
+        'colleges': 1.0,
+        'departments': 1.0,
+        'jobs': 1.0,
+        'descriptions': 0.5
+    }
+
+    stop_words = {'a', 'an', 'and', 'for', 'in', 'of', 'or', 'the', 'to'}
+
+    # BM25 parameters
+    k1 = 1.2
+    b = 0.75
+
+    # Prefix matches rank below exact ones
+    prefix_weight = 0.75
+
+    # The shortest last term expanded as a prefix; shorter
+    # ones would match most of the index
+    min_prefix_length = 3
+
+    term_max_length = 100
+
+    def tokenize(self, text) -> list:
+        """
+        Returns the normalized terms of the given text
+        """
+        if not text:
+            return []
+
+        text = unidecode(str(text)).lower()
+
+        return [x[:self.term_max_length] for x in re.findall(r'[a-z0-9]+', text)]
+
+    def get_queryset(self):
+        """
+        Returns the programs queryset with everything
+        needed to build documents loaded up front.
+        """
+        return Program.objects.select_related(
+            'degree'
+        ).prefetch_related(
+            Prefetch('cip', queryset=CIP.objects.filter(version=settings.CIP_CURRENT_VERSION)),
+            'colleges',
+            'departments',
+            'jobs',
+            Prefetch('descriptions', queryset=ProgramDescription.objects.only('program_id', 'description'))
+        )
+
+    def get_fields(self, program) -> dict:
+        """
+        Returns the searchable text of a program, by field
+        """
+        return {
+            'name': [program.name],
+            'degree': [program.degree.name],
+            'cip': [x.name for x in program.cip.all()],
+            'colleges': [x.full_name for x in program.colleges.all()],
+            'departments': [x.full_name for x in program.departments.all()],
+            'jobs': [x.name for x in program.jobs.all()],
+            'descriptions': [
+                BeautifulSoup(x.description, 'html.parser').get_text(' ')
+                for x in program.descriptions.all()
+            ]
+        }
+
+    def build_postings(self, program) -> list:
+        """
+        Returns the unsaved postings of a program
+        """
+        frequencies = defaultdict(float)
+
+        for field, values in self.get_fields(program).items():
+            weight = self.field_weights[field]
+
+            for value in values:
+                for term in self.tokenize(value):
+                    frequencies[term] += weight
+
+        document_length = sum(frequencies.values())
+
+        return [
+            ProgramSearchTerm(
+                program_id=program.pk,
+                term=term,
+                frequency=frequency,
+                document_length=document_length
+            )
+            for term, frequency in frequencies.items()
+        ]
+
+    def index_programs(self, program_ids):
+        """
+        Re-indexes the programs with the given IDs
+        """
+        program_ids = list(program_ids)
+        programs = self.get_queryset().filter(pk__in=program_ids)
+
+        postings = []
+        for program in programs:
+            postings += self.build_postings(program)
+
+        with transaction.atomic():
+            ProgramSearchTerm.objects.filter(program_id__in=program_ids).delete()
+            ProgramSearchTerm.objects.bulk_create(postings, batch_size=1000)
+
+        self.invalidate()
+
+    def rebuild(self, batch_size=200) -> int:
+        """
+        Rebuilds the whole index and returns the
+        number of postings written.
+        """
+        count = 0
+
+        with transaction.atomic():
+            ProgramSearchTerm.objects.all().delete()
+
+            program_ids = list(Program.objects.values_list('pk', flat=True))
+
+            for i in range(0, len(program_ids), batch_size):
+                postings = []
+                for program in self.get_queryset().filter(pk__in=program_ids[i:i + batch_size]):
+                    postings += self.build_postings(program)
+
+                ProgramSearchTerm.objects.bulk_create(postings, batch_size=1000)
+                count += len(postings)
+
+        self.invalidate()
+
+        return count
+
+    def invalidate(self):
+        """
+        Marks the cached collection statistics as stale
+        """
+        bump_generation(self.cache_key)
+
+    def get_stats(self):
+        """
+        Returns the number of indexed programs and their
+        average document length, cached until the index
+        changes.
+        """
+        key = f"programs.search_index.stats.{get_generation(self.cache_key)}"
+        stats = cache.get(key)
+
+        if stats is None:
+            aggregate = ProgramSearchTerm.objects.aggregate(
+                documents=Count('program', distinct=True),
+                length=Sum('frequency')
+            )
+            documents = aggregate['documents'] or 0
+            stats = (documents, (aggregate['length'] or 0) / documents if documents else 0)
+            cache.set(key, stats, timeout=None)
+
+        return stats
+
+    def is_built(self) -> bool:
+        """
+        Returns whether any program has been indexed
+        """
+        return self.get_stats()[0] > 0
+
+    def get_query_terms(self, query) -> list:
+        terms = self.tokenize(query)
+        filtered = [x for x in terms if x not in self.stop_words]
+
+        # Only drop stop words when something is left to search for
+        return filtered if filtered else terms
+
+    def search(self, query) -> dict:
+        """
+        Returns the BM25 score of each program matching
+        every term of the query, keyed by program ID.
+        """
+        terms = self.get_query_terms(query)
+
+        if not terms:
+            return {}
+
+        exact = terms[:-1]
+        prefix = terms[-1]
+        expand = len(prefix) >= self.min_prefix_length
+
+        postings = ProgramSearchTerm.objects.filter(
+            Q(term__in=exact) | (Q(term__startswith=prefix) if expand else Q(term=prefix))
+        ).values_list('program_id', 'term', 'frequency', 'document_length')
+
+        # Group postings by the query term they match
+        matches = {x: defaultdict(list) for x in terms}
+
+        for program_id, term, frequency, document_length in postings:
+            if term in matches and term != prefix:
+                matches[term][program_id].append((1.0, frequency, document_length))
+            if term == prefix or (expand and term.startswith(prefix)):
+                weight = 1.0 if term == prefix else self.prefix_weight
+                matches[prefix][program_id].append((weight, frequency, document_length))
+
+        program_ids = None
+        for term in terms:
+            found = set(matches[term].keys())
+            program_ids = found if program_ids is None else program_ids & found
+
+        if not program_ids:
+            return {}
+
+        documents, average_length = self.get_stats()
+
+        scores = defaultdict(float)
+
+        for term in terms:
+            document_frequency = len(matches[term])
+            idf = math.log(1 + (documents - document_frequency + 0.5) / (document_frequency + 0.5))
+
+            for program_id in program_ids:
+                # A prefix may expand to several terms in the same
+                # program; only its best match counts
+                scores[program_id] += max(
+                    weight * idf * self.get_term_score(frequency, document_length, average_length)
+                    for weight, frequency, document_length in matches[term][program_id]
+                )
+
+        return dict(sorted(scores.items(), key=lambda x: (-x[1], x[0])))
+
+    def get_term_score(self, frequency, document_length, average_length) -> float:
+        normalized = 1 - self.b + self.b * (document_length / average_length if average_length else 1)
+
+        return frequency * (self.k1 + 1) / (frequency + self.k1 * normalized)
+
+
+program_search_index = ProgramSearchIndex()
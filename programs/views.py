@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 
 
+import hashlib
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -12,6 +16,16 @@ from django_filters.rest_framework import DjangoFilterBackend
 from programs.models import *
 from programs.serializers import *
 from programs.filters import *
+from core.pagination import KeysetPaginationMixin
+from programs.utilities.career_rankings import get_ranked_careers
+from programs.utilities.facets import FACETS, get_program_facets
+from programs.utilities.program_resources import ProgramResources
+from programs.utilities.projection_totals import get_projection_totals
+from programs.utilities.response_cache import (
+    get_response_cache_key,
+    get_cached_response_data,
+    set_cached_response_data
+)
 
 
 # Mixins
@@ -34,17 +48,142 @@ class MultipleFieldLookupMixin(object):
         return obj
 
 
+class ProgramQueryPlanMixin(object):
+    """
+    Loads the related data needed by the fields being
+    requested (including `fields`, `omit` and `fieldset`
+    params) so that programs are serialized in a constant
+    number of queries, regardless of page size.
+    """
+    def get_queryset(self):
+        queryset = super(ProgramQueryPlanMixin, self).get_queryset()
+        fields = self.get_serializer().fields.keys()
+
+        return self.get_serializer_class().setup_eager_loading(queryset, fields)
+
+
+class ProgramExpandMixin(object):
+    """
+    Passes the linked resources listed in the `expand`
+    param (e.g. `?expand=outcomes,careers`) to the
+    serializer, which returns them inline instead of
+    as URLs.
+    """
+    default_expand = []
+
+    def get_expand(self):
+        expand = self.request.query_params.get('expand', None)
+
+        if expand is None:
+            return list(self.default_expand)
+
+        return [x.strip() for x in expand.split(',') if x.strip()]
+
+    def get_serializer_context(self):
+        context = super(ProgramExpandMixin, self).get_serializer_context()
+        context['expand'] = self.get_expand()
+
+        return context
+
+
+class ProgramDocumentMixin(object):
+    """
+    Serves programs from their search documents when
+    PROGRAM_SEARCH_DOCUMENTS is enabled, so listing and
+    filtering programs reads a single table. Requests
+    expanding linked resources are served from the
+    normalized models.
+    """
+    document_filter_class = None
+
+    def use_documents(self):
+        if not getattr(settings, 'PROGRAM_SEARCH_DOCUMENTS', False):
+            return False
+
+        return not self.get_expand()
+
+    @property
+    def filterset_class(self):
+        if self.use_documents():
+            return self.document_filter_class
+
+        return getattr(self, 'filter_class', None)
+
+    def get_queryset(self):
+        if self.use_documents():
+            return ProgramSearchDocument.objects.all()
+
+        return super(ProgramDocumentMixin, self).get_queryset()
+
+    def get_serializer_class(self):
+        if self.use_documents():
+            return ProgramDocumentSerializer
+
+        return super(ProgramDocumentMixin, self).get_serializer_class()
+
+
+class CachedResponseMixin(object):
+    """
+    Caches the serialized data of read-only views until
+    program data changes, and answers requests carrying a
+    matching If-None-Match header with a 304 Not Modified.
+
+    The ETag is derived from the cache key, which is scoped
+    to the current response cache generation, so it changes
+    whenever the cache is invalidated.
+    """
+    def get(self, request, *args, **kwargs):
+        key = get_response_cache_key(request)
+        etag = '"{0}"'.format(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+        if etag in self.get_if_none_match(request):
+            return Response(status=304, headers={'ETag': etag})
+
+        data = get_cached_response_data(key)
+
+        if data is None:
+            response = super(CachedResponseMixin, self).get(request, *args, **kwargs)
+
+            if response.status_code != 200:
+                return response
+
+            set_cached_response_data(key, response.data)
+        else:
+            response = Response(data)
+
+        response['ETag'] = etag
+        return response
+
+    def get_if_none_match(self, request):
+        """
+        Returns the list of ETags provided in the
+        If-None-Match header of the request.
+        """
+        header = request.META.get('HTTP_IF_NONE_MATCH', '')
+
+        return [
+            x.strip()[2:] if x.strip().startswith('W/') else x.strip()
+            for x in header.split(',')
+            if x.strip()
+        ]
+
+
 class LimitedPaginationMixin(LimitOffsetPagination):
     default_limit = 25
     max_limit = 50
 
 
+class LimitedKeysetPagination(KeysetPaginationMixin, LimitedPaginationMixin):
+    pass
+
+
 class CoreAPI(APIView):
 
     def get(self, request, format=None):
         return Response({
             'programs': reverse('api.programs.list', request=request),
             'programs-search': reverse('api.programs.search', request=request),
+            'programs-bulk': reverse('api.programs.bulk', request=request),
             'colleges': reverse('api.colleges.list', request=request),
             'colleges-search': reverse('api.colleges.search', request=request),
             'departments': reverse('api.departments.list', request=request),
@@ -98,18 +237,89 @@ class JobListView(generics.ListAPIView):
     serializer_class = JobPositionSerializer
 
 
-class ProgramListView(generics.ListAPIView):
+class ProgramListView(CachedResponseMixin, ProgramExpandMixin, ProgramDocumentMixin, ProgramQueryPlanMixin, generics.ListAPIView):
     queryset = Program.objects.all()
     serializer_class = ProgramSerializer
-    pagination_class = LimitedPaginationMixin
+    pagination_class = LimitedKeysetPagination
 
 
 class ProgramSearchView(ProgramListView):
+    """
+    Filters and searches programs. Counts of the matching
+    programs by college, level, career, degree and online
+    flag are included when `facets` is set, either to
+    `true` for every facet or to a list of facets, e.g.
+    `?facets=colleges,level`.
+    """
     filter_class = ProgramFilter
-    pagination_class = LimitedPaginationMixin
+    document_filter_class = ProgramSearchDocumentFilter
+    filter_backends = [DjangoFilterBackend, ProgramSearchOrderingFilter]
+    ordering_fields = ['score', 'name', 'id']
+    pagination_class = LimitedKeysetPagination
+
+    def get_facet_names(self):
+        facets = self.request.query_params.get('facets', None)
 
+        if not facets or facets.lower() in ('0', 'false'):
+            return []
 
-class ProgramDetailView(generics.RetrieveAPIView):
+        if facets.lower() in ('1', 'true'):
+            return list(FACETS.keys())
+
+        return [x.strip() for x in facets.split(',') if x.strip() in FACETS]
+
+    def list(self, request, *args, **kwargs):
+        response = super(ProgramSearchView, self).list(request, *args, **kwargs)
+        names = self.get_facet_names()
+
+        if names and isinstance(response.data, dict):
+            queryset = self.filter_queryset(self.get_queryset())
+            response.data['facets'] = get_program_facets(queryset, names)
+
+        return response
+
+
+class ProgramIDsMixin(object):
+    """
+    Reads the list of program IDs requested in
+    the `ids` param, e.g. `?ids=1,2,3`.
+    """
+    max_ids = 50
+
+    def get_ids(self):
+        ids = self.request.query_params.get('ids', '')
+
+        try:
+            ids = [int(x) for x in ids.split(',') if x.strip()]
+        except ValueError:
+            raise ValidationError({'ids': 'Program IDs must be integers.'})
+
+        if len(ids) > self.max_ids:
+            raise ValidationError({'ids': f"No more than {self.max_ids} program IDs may be requested at once."})
+
+        return ids
+
+
+class ProgramBulkView(ProgramIDsMixin, ProgramListView):
+    """
+    Returns the programs listed in the `ids` param
+    (e.g. `?ids=1,2,3`) with all of their linked
+    resources inline, unless `expand` says otherwise.
+    """
+    pagination_class = None
+
+    def use_documents(self):
+        return False
+
+    default_expand = ProgramResources.names
+
+    def get_queryset(self):
+        queryset = super(ProgramBulkView, self).get_queryset()
+
+        return queryset.filter(pk__in=self.get_ids()).order_by('pk')
+
+
+class ProgramDetailView(CachedResponseMixin, ProgramExpandMixin, ProgramQueryPlanMixin, generics.RetrieveAPIView):
     queryset = Program.objects.all()
     lookup_field = 'id'
     serializer_class = ProgramSerializer
@@ -199,23 +409,29 @@ class ProgramOutcomeView(APIView):
 
 class ProgramProjectionTotalsView(APIView):
     def get(self, request, format=None, **kwargs):
-        program = Program.objects.get(id=kwargs['id'])
+        program = get_object_or_404(Program, id=kwargs['id'])
+        totals = get_projection_totals([program.pk])
+
+        serializer = EmploymentProjectionTotalsSerializer(totals[program.pk], many=False)
+        return Response(serializer.data)
 
-        obj = program.current_projections.aggregate(
-            begin_employment=Sum('begin_employment'),
-            end_employment=Sum('end_employment'),
-            change=Sum('change'),
-            change_percentage=Avg('change_percentage'),
-            openings=Sum('openings')
-        )
 
-        first_projection = program.current_projections.first()
+class ProgramProjectionTotalsBulkView(ProgramIDsMixin, APIView):
+    """
+    Returns the projection totals of the programs
+    listed in the `ids` param (e.g. `?ids=1,2,3`),
+    keyed by program ID.
+    """
+    max_ids = 200
 
-        obj['begin_year'] = first_projection.report_year_begin if first_projection is not None else None
-        obj['end_year'] = first_projection.report_year_end if first_projection is not None else None
+    def get(self, request, format=None, **kwargs):
+        program_ids = Program.objects.filter(pk__in=self.get_ids()).values_list('pk', flat=True)
+        totals = get_projection_totals(program_ids)
 
-        serializer = EmploymentProjectionTotalsSerializer(obj, many=False)
-        return Response(serializer.data)
+        return Response({
+            program_id: EmploymentProjectionTotalsSerializer(value, many=False).data
+            for program_id, value in sorted(totals.items())
+        })
 
 
 class ProgramCareerView(APIView):
@@ -224,6 +440,40 @@ class ProgramCareerView(APIView):
 
         return Response(program.jobs.values_list('name', flat=True).distinct())
 
+
+class ProgramRankedCareerView(APIView):
+    """
+    Returns the names of a program's careers, highest
+    weight first. Programs without weighted careers
+    list their jobs unranked.
+    """
+    def get(self, request, format=None, **kwargs):
+        program_id = int(kwargs['id'])
+        careers = get_ranked_careers([program_id])[program_id]
+
+        # Only look the program up when there is
+        # nothing to tell it apart from a missing one
+        if not careers:
+            get_object_or_404(Program, id=program_id)
+
+        return Response(careers)
+
+
+class ProgramRankedCareerBulkView(ProgramIDsMixin, APIView):
+    """
+    Returns the ranked careers of the programs listed
+    in the `ids` param (e.g. `?ids=1,2,3`), keyed by
+    program ID.
+    """
+    max_ids = 200
+
+    def get(self, request, format=None, **kwargs):
+        program_ids = Program.objects.filter(pk__in=self.get_ids()).values_list('pk', flat=True)
+        careers = get_ranked_careers(program_ids)
+
+        return Response(dict(sorted(careers.items())))
+
+
 class ApplicationDeadlinesView(APIView):
     def get(self, request, format=None, **kwargs):
         program = Program.objects.get(id=kwargs['id'])
@@ -1,12 +1,15 @@
 from django.db.models import Count
 
 from rest_framework import generics
+
+from core.pagination import KeysetPagination
 from research.serializers import *
 
 # Create your views here.
 class ResearcherListView(generics.ListAPIView):
     queryset = Researcher.objects.all()
     serializer_class = ResearcherSerializer
+    pagination_class = KeysetPagination
 
 class ResearcherDetailView(generics.RetrieveAPIView):
     queryset = Researcher.objects.all()
@@ -232,6 +232,40 @@ PROGRAM_PROFILE = [
 
 EXCERPT_DESCRIPTION_TYPE_SOURCE = 'Source Catalog Description'
 
+# The number of seconds program API responses are cached for.
+# Cached responses are also invalidated whenever program data changes.
+PROGRAM_RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# The number of seconds the employment projection totals of
+# a program are cached for. Cached totals are also invalidated
+# whenever employment projections change.
+PROJECTION_TOTALS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# The number of seconds a process trusts the cache generations
+# it has read before checking the database for newer ones. Data
+# changed by another process (e.g. an import run from cron) is
+# served stale for at most this long.
+CACHE_GENERATION_CHECK_INTERVAL = 5
+
+# Rebuild the in-process autocomplete index in a background
+# thread after it is invalidated, serving the previous index
+# until the rebuild is done. When disabled, the first lookup
+# after an invalidation rebuilds the index itself.
+AUTOCOMPLETE_BACKGROUND_REBUILD = True
+
+# Serve program list/search requests from the denormalized
+# program search documents. Run `python manage.py
+# rebuild-program-documents` before enabling.
+PROGRAM_SEARCH_DOCUMENTS = False
+
+# The number of recent requests per URL name the request
+# metrics dashboard reports percentiles over.
+REQUEST_METRICS_SAMPLE_SIZE = 1000
+
+# Log every query of requests taking longer than this many
+# milliseconds. Set to None to disable.
+REQUEST_METRICS_SLOW_QUERY_LOG_THRESHOLD = None
+
 # Default program application deadline data to load during the
 # application deadline importer against all programs (by career, level):
 PROGRAM_APPLICATION_DEADLINES = [
@@ -1,5 +1,8 @@
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
 from teledata.models import *
+from core.utils.autocomplete import autocomplete_index
 import settings
 import logging
 import re
@@ -9,35 +12,56 @@ from django.utils import timezone
 from collections import namedtuple
 
 import MySQLdb
+import MySQLdb.cursors
 
 class Command(BaseCommand):
     conn = None
     help = 'Imports teledata from the shadow tables provided by IKM'
 
-    last_updated  = timezone.now()
-    bldg_created  = 0
-    bldg_updated  = 0
-    bldg_skipped  = 0
-    bldg_error    = 0
-    org_created   = 0
-    org_updated   = 0
-    org_skipped   = 0
-    org_error     = 0
-    org_deleted   = 0
-    dept_created  = 0
-    dept_updated  = 0
-    dept_skipped  = 0
-    dept_error    = 0
-    dept_deleted  = 0
-    staff_created = 0
-    staff_updated = 0
-    staff_skipped = 0
-    staff_error   = 0
-    staff_deleted = 0
-    logger        = logging.getLogger(__name__)
+    last_updated    = timezone.now()
+    bldg_created    = 0
+    bldg_updated    = 0
+    bldg_unchanged  = 0
+    bldg_skipped    = 0
+    bldg_error      = 0
+    org_created     = 0
+    org_updated     = 0
+    org_unchanged   = 0
+    org_skipped     = 0
+    org_error       = 0
+    org_deleted     = 0
+    dept_created    = 0
+    dept_updated    = 0
+    dept_unchanged  = 0
+    dept_skipped    = 0
+    dept_error      = 0
+    dept_deleted    = 0
+    staff_created   = 0
+    staff_updated   = 0
+    staff_unchanged = 0
+    staff_skipped   = 0
+    staff_error     = 0
+    staff_deleted   = 0
+    logger          = logging.getLogger(__name__)
 
     def add_arguments(self, parser):
-        pass
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            dest='rebuild',
+            help='Rebuilds every combined teledata record instead of only those of the rows the import touched.',
+            default=False,
+            required=False
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            help='The number of rows read from the source database and written at a time.',
+            default=1000,
+            required=False
+        )
 
     @property
     def connection_data(self):
@@ -135,179 +159,182 @@ FROM
 
         return self.conn
 
-    def import_bldgs(self, data):
-        for item in data:
+    def fetch_rows(self, query):
+        """
+        Streams the rows of a query with a server side
+        cursor, so the source tables are never held in
+        memory all at once.
+        """
+        cursor = self.connection.cursor(MySQLdb.cursors.SSCursor)
+
+        try:
+            cursor.execute(query)
+
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+
+                if not rows:
+                    break
+
+                yield from rows
+        finally:
+            cursor.close()
+
+    def load_existing(self):
+        """
+        Loads every existing record by import ID, so
+        rows are matched and diffed in memory.
+        """
+        self.records = {}
+        self.existing = {}
+        self.seen = {}
+
+        for model in (Building, Organization, Department, Staff):
+            self.records[model] = list(model.objects.iterator())
+            self.existing[model] = {x.import_id: x for x in self.records[model]}
+            self.seen[model] = set()
+
+    def get_pk(self, model, import_id):
+        record = self.existing[model].get(import_id)
+
+        return record.pk if record else None
+
+    def import_rows(self, model, prefix, rows):
+        """
+        Creates the records of new (import_id, values) pairs
+        and updates those whose values changed. Unchanged
+        records are left alone, and records that can't be
+        saved are logged and counted as errors.
+        """
+        existing = self.existing[model]
+        has_last_updated = any(x.name == 'last_updated' for x in model._meta.concrete_fields)
+        created = []
+        updated = []
+        fields = set()
+
+        for import_id, values in rows:
+            self.seen[model].add(import_id)
+            record = existing.get(import_id)
+
+            if record is None:
+                record = model(import_id=import_id, **values)
+                changed = list(values.keys())
+            else:
+                changed = [key for key, value in values.items() if getattr(record, key) != value]
+
+                if not changed:
+                    setattr(self, f'{prefix}_unchanged', getattr(self, f'{prefix}_unchanged') + 1)
+                    continue
+
+                for key in changed:
+                    setattr(record, key, values[key])
+
+            if has_last_updated:
+                record.last_updated = self.last_updated
+
+            error = get_field_error(record)
+
+            if error:
+                self.logger.error('Cannot save {0} {1}. {2}'.format(model._meta.verbose_name, import_id, error))
+                setattr(self, f'{prefix}_error', getattr(self, f'{prefix}_error') + 1)
+                continue
+
+            if record.pk is None:
+                created.append(record)
+            else:
+                updated.append(record)
+                fields.update(changed)
+
+        self.bulk_create(model, created)
+
+        if updated:
+            if has_last_updated:
+                fields.add('last_updated')
+
+            model.objects.bulk_update(updated, sorted(fields), batch_size=self.batch_size)
+
+        for record in created:
+            existing[record.import_id] = record
+
+        self.touched[model].update(x.pk for x in created + updated)
+
+        setattr(self, f'{prefix}_created', len(created))
+        setattr(self, f'{prefix}_updated', len(updated))
+
+    def bulk_create(self, model, records):
+        if not records:
+            return
+
+        last_pk = model.objects.aggregate(last_pk=Max('pk'))['last_pk'] or 0
+
+        model.objects.bulk_create(records, batch_size=self.batch_size)
+
+        # Not every database returns the IDs of bulk created rows
+        if any(x.pk is None for x in records):
+            pks = dict(model.objects.filter(pk__gt=last_pk).values_list('import_id', 'pk'))
+
+            for record in records:
+                record.pk = pks[record.import_id]
+
+    def get_bldg_rows(self):
+        for item in self.fetch_rows(self.bldg_query):
             # Require name and abrev
             if item[1] is None or item[3] is None:
                 self.bldg_skipped += 1
                 continue
 
-            try:
-                existing = Building.objects.get(import_id=item[0])
-                existing.name = item[1]
-                existing.description = item[2]
-                existing.abbr = item[3]
-
-                try:
-                    existing.save()
-                except Exception as e:
-                    self.logger.error(str(e))
-                    self.bldg_error += 1
-
-                self.bldg_updated += 1
-
-            except Building.DoesNotExist:
-                new = Building(
-                    name=item[1],
-                    description=item[2],
-                    abbr=item[3],
-                    import_id=item[0]
-                )
-
-                try:
-                    new.save()
-                except Exception as e:
-                    self.logger.error(str(e))
-                    self.bldg_error += 1
-
-                self.bldg_created += 1
-
-    def import_orgs(self, data):
-        for item in data:
+            yield item[0], {
+                'name': item[1],
+                'description': item[2],
+                'abbr': item[3]
+            }
+
+    def get_org_rows(self):
+        for item in self.fetch_rows(self.org_query):
             # Require name
             if item[1] is None:
                 self.org_skipped += 1
                 continue
 
-            try:
-                existing = Organization.objects.get(import_id=item[0])
-                existing.name = item[1]
-                existing.room = item[3]
-                existing.postal = item[4]
-                existing.phone = item[5]
-                existing.fax = item[6]
-                existing.primary_comment = item[7]
-                existing.secondary_comment = item[8]
-                existing.url = item[9]
-                existing.last_updated = self.last_updated
-                existing.import_id = item[0]
-
-                try:
-                    existing.save()
-                except Exception as e:
-                    self.logger.error(str(e))
-                    self.org_error += 1
-
-
-                self.org_updated += 1
-
-            except Organization.DoesNotExist:
-                try:
-                    bldg = Building.objects.get(import_id=item[2])
-                except Building.DoesNotExist:
-                    bldg = None
-
-                new = Organization(
-                    name = item[1],
-                    bldg = bldg,
-                    room = item[3],
-                    postal = item[4],
-                    phone = item[5],
-                    fax = item[6],
-                    primary_comment = item[7],
-                    secondary_comment = item[8],
-                    url = item[9],
-                    last_updated = self.last_updated,
-                    import_id = item[0]
-                )
-
-                try:
-                    new.save()
-                except Exception as e:
-                    self.logger.error(str(e))
-                    self.org_error += 1
-
-                self.org_created += 1
-
-    def import_depts(self, data):
-        for item in data:
+            yield item[0], {
+                'name': item[1],
+                'bldg_id': self.get_pk(Building, item[2]),
+                'room': item[3],
+                'postal': item[4],
+                'phone': item[5],
+                'fax': item[6],
+                'primary_comment': item[7],
+                'secondary_comment': item[8],
+                'url': item[9]
+            }
+
+    def get_dept_rows(self):
+        for item in self.fetch_rows(self.dept_query):
             # Require name
             if item[3] is None:
                 self.dept_skipped += 1
                 continue
 
-            try:
-                org = Organization.objects.get(import_id=item[1])
-            except Organization.DoesNotExist:
-                org = None
-
-            try:
-                bldg = Building.objects.get(import_id=item[4])
-            except Building.DoesNotExist:
-                bldg = None
-
-            try:
-                existing = Department.objects.get(import_id=item[0])
-                existing.org = org
-                existing.list_order = item[2]
-                existing.name = item[3]
-                existing.bldg = bldg
-                existing.room = item[5]
-                existing.phone = item[6]
-                existing.fax = item[7]
-                existing.primary_comment = item[8]
-                existing.secondary_comment = item[9]
-                existing.last_updated = self.last_updated
-
-                try:
-                    existing.save()
-                except Exception as e:
-                    self.logger.error(str(e))
-                    self.dept_error += 1
-
-                self.dept_updated += 1
-
-            except Department.DoesNotExist:
-                new = Department(
-                    org=org,
-                    list_order=item[2],
-                    name=item[3],
-                    bldg=bldg,
-                    room=item[5],
-                    phone=item[6],
-                    fax=item[7],
-                    primary_comment=item[8],
-                    secondary_comment=item[9],
-                    last_updated=self.last_updated,
-                    import_id=item[0]
-                )
-
-                self.bldg_created += 1
-
-                try:
-                    new.save()
-                except Exception as e:
-                    self.logger.error(str(e))
-                    self.dept_error += 1
-
-    def import_staff(self, data):
+            yield item[0], {
+                'org_id': self.get_pk(Organization, item[1]),
+                'list_order': item[2],
+                'name': item[3],
+                'bldg_id': self.get_pk(Building, item[4]),
+                'room': item[5],
+                'phone': item[6],
+                'fax': item[7],
+                'primary_comment': item[8],
+                'secondary_comment': item[9]
+            }
+
+    def get_staff_rows(self):
         emplid_re = re.compile(r"\d{7}")
 
-        for item in data:
+        for item in self.fetch_rows(self.staff_query):
             if item[1] is None or item[4] is None:
                 self.staff_skipped += 1
                 continue
 
-            try:
-                dept = Department.objects.get(import_id=item[7])
-            except Department.DoesNotExist:
-                dept = None
-
-            try:
-                bldg = Building.objects.get(import_id=item[10])
-            except Building.DoesNotExist:
-                bldg = None
-
             if item[16] in [1, "1"]:
                 alpha = True
             else:
@@ -321,131 +348,115 @@ FROM
                 email = None
                 email_machine = None
 
+            employee_id = None
+
             if item[6] is not None:
                 employee_id = (item[6].strip()
                     if emplid_re.fullmatch(item[6].strip()) is not None
                     else None)
 
-            try:
-                existing = Staff.objects.get(import_id=item[0])
-                existing.alpha = alpha
-                existing.last_name = item[1]
-                existing.suffix = item[2]
-                existing.name_title = item[3]
-                existing.first_name = item[4]
-                existing.middle = item[5]
-                existing.employee_id = employee_id
-                existing.dept = dept
-                existing.job_position = item[8]
-                existing.bldg = bldg
-                existing.room = item[11]
-                existing.phone = item[12]
-                existing.email = email
-                existing.email_machine = email_machine
-                existing.postal = item[15]
-                existing.last_updated = self.last_updated
-                existing.cellphone = item[17]
-
-                try:
-                    existing.save()
-                except Exception as e:
-                    self.logger.error(str(e))
-                    self.staff_error += 1
-
-                self.staff_updated += 1
-
-            except Staff.DoesNotExist:
-                new = Staff(
-                    alpha=alpha,
-                    last_name=item[1],
-                    suffix=item[2],
-                    name_title=item[3],
-                    first_name=item[4],
-                    middle=item[5],
-                    employee_id=employee_id,
-                    dept=dept,
-                    job_position=item[8],
-                    bldg=bldg,
-                    room=item[11],
-                    phone=item[12],
-                    email=email,
-                    email_machine=email_machine,
-                    postal=item[15],
-                    last_updated=self.last_updated,
-                    cellphone=item[17],
-                    import_id=item[0]
-                )
-
-                try:
-                    new.save()
-                except Exception as e:
-                    self.logger.error(str(e))
-                    self.staff_error += 1
-
-                self.staff_created += 1
+            yield item[0], {
+                'alpha': alpha,
+                'last_name': item[1],
+                'suffix': item[2],
+                'name_title': item[3],
+                'first_name': item[4],
+                'middle': item[5],
+                'employee_id': employee_id,
+                'dept_id': self.get_pk(Department, item[7]),
+                'job_position': item[8],
+                'bldg_id': self.get_pk(Building, item[10]),
+                'room': item[11],
+                'phone': item[12],
+                'email': email,
+                'email_machine': email_machine,
+                'postal': item[15],
+                'cellphone': item[17]
+            }
 
     def delete_stale(self):
-        stale_orgs  = Organization.objects.filter(last_updated__lt=self.last_updated)
-        stale_depts = Department.objects.filter(last_updated__lt=self.last_updated)
-        stale_staff = Staff.objects.filter(last_updated__lt=self.last_updated)
+        """
+        Deletes the imported records of rows that are no
+        longer in the source tables, or that were skipped.
+        """
+        stale = {}
+
+        for model in (Organization, Department, Staff):
+            stale[model] = [
+                x.pk for x in self.records[model]
+                if x.last_updated is not None
+                and x.last_updated < self.last_updated
+                and x.import_id not in self.seen[model]
+            ]
 
-        self.org_deleted = stale_orgs.count()
-        self.dept_deleted = stale_depts.count()
-        self.staff_deleted = stale_staff.count()
+            # Records of deleted rows are removed by the sync
+            self.touched[model].update(stale[model])
 
-        stale_orgs.delete()
-        stale_depts.delete()
-        stale_staff.delete()
+        self.org_deleted = len(stale[Organization])
+        self.dept_deleted = len(stale[Department])
+        self.staff_deleted = len(stale[Staff])
+
+        for model, pks in stale.items():
+            for i in range(0, len(pks), self.batch_size):
+                model.objects.filter(pk__in=pks[i:i + self.batch_size]).delete()
 
     def print_stats(self):
         stats = """
 Buildings
 ---------
-Updated: {0}
-Created: {1}
-Skipped: {2}
-Errors : {3}
+Updated  : {0}
+Created  : {1}
+Unchanged: {2}
+Skipped  : {3}
+Errors   : {4}
 
 Organizations
 -------------
-Updated: {4}
-Created: {5}
-Skipped: {6}
-Errors : {7}
-Deleted: {8}
+Updated  : {5}
+Created  : {6}
+Unchanged: {7}
+Skipped  : {8}
+Errors   : {9}
+Deleted  : {10}
 
 Departments
 -----------
-Updated: {9}
-Created: {10}
-Skipped: {11}
-Errors : {12}
-Deleted: {13}
+Updated  : {11}
+Created  : {12}
+Unchanged: {13}
+Skipped  : {14}
+Errors   : {15}
+Deleted  : {16}
 
 Staff
 -----
-Updated: {14}
-Created: {15}
-Skipped: {16}
-Errors : {17}
-Deleted: {18}
+Updated  : {17}
+Created  : {18}
+Unchanged: {19}
+Skipped  : {20}
+Errors   : {21}
+Deleted  : {22}
         """.format(
             self.bldg_updated,
             self.bldg_created,
-            self.bldg_error,
+            self.bldg_unchanged,
             self.bldg_skipped,
+            self.bldg_error,
             self.org_updated,
             self.org_created,
+            self.org_unchanged,
             self.org_skipped,
             self.org_error,
             self.org_deleted,
             self.dept_updated,
             self.dept_created,
+            self.dept_unchanged,
             self.dept_skipped,
             self.dept_error,
             self.dept_deleted,
             self.staff_updated,
             self.staff_created,
+            self.staff_unchanged,
             self.staff_skipped,
             self.staff_error,
             self.staff_deleted
@@ -454,43 +465,51 @@ Deleted: {18}
         print(stats)
 
     def handle(self, *args, **options):
-        # Get the Building Data
-        bldg_query = """
-
-        """
-        cursor = self.connection.cursor()
-
-        # Get data and import buildings
-        cursor.execute(self.bldg_query)
-        bldg_data = cursor.fetchall()
-
-        self.import_bldgs(bldg_data)
+        self.batch_size = options['batch_size']
+        self.touched = {
+            Building: set(),
+            Organization: set(),
+            Department: set(),
+            Staff: set()
+        }
+
+        # Deleting stale rows cascades to their dependents,
+        # so the combined records are synced once afterwards
+        # rather than each time a row is deleted
+        with transaction.atomic(), deferred_sync():
+            self.import_data()
+
+        if options['rebuild']:
+            combined_created = CombinedTeledata.objects.update_data()
+            print("Rebuilt {0} combined teledata records.".format(combined_created))
+        else:
+            combined = CombinedTeledata.objects.sync_records(
+                staff_ids=self.touched[Staff],
+                organization_ids=self.touched[Organization],
+                department_ids=self.touched[Department],
+                building_ids=self.touched[Building]
+            )
+            print("Combined teledata records created: {created}, updated: {updated}, deleted: {deleted}".format(**combined))
 
-        # Get data and import organizations
-        cursor.execute(self.org_query)
-        org_data = cursor.fetchall()
+        # The combined table is written in bulk, which skips
+        # the signals that keep the autocomplete index fresh
+        autocomplete_index.invalidate()
 
-        self.import_orgs(org_data)
+        self.print_stats()
 
-        # Get data and import departments
-        cursor.execute(self.dept_query)
-        dept_data = cursor.fetchall()
+        print("All done!")
 
-        self.import_depts(dept_data)
+        self.connection.close()
 
-        # Get data and import staff
-        cursor.execute(self.staff_query)
-        staff_data = cursor.fetchall()
+    def import_data(self):
+        self.load_existing()
 
-        self.import_staff(staff_data)
+        # Each table is imported after the tables it refers
+        # to, so their new records can be looked up
+        self.import_rows(Building, 'bldg', self.get_bldg_rows())
+        self.import_rows(Organization, 'org', self.get_org_rows())
+        self.import_rows(Department, 'dept', self.get_dept_rows())
+        self.import_rows(Staff, 'staff', self.get_staff_rows())
 
         # Delete all stale data
         self.delete_stale()
-
-        CombinedTeledata.objects.update_data()
-
-        self.print_stats()
-
-        print("All done!")
-
-        self.connection.close()
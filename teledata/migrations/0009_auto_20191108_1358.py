@@ -4,10 +4,11 @@
 
 from django.db import migrations, models
 
-import teledata
-
 def forward_migration(apps, schema_editor):
-    teledata.models.CombinedTeledata.objects.update_data()
+    # The combined table used to be rebuilt here with the current
+    # model, which reads tables and columns that later migrations
+    # create. It is rebuilt by import-teledata instead.
+    pass
 
 def reverse_migration(apps, schema_editor):
     pass
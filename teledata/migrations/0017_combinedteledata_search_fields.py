@@ -0,0 +1,70 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:53
+
+from django.db import migrations, models
+
+from core.utils.phonetics import normalize_name, soundex
+
+
+class Migration(migrations.Migration):
+
+    def forward(apps, schema_editor):
+        CombinedTeledata = apps.get_model('teledata', 'CombinedTeledata')
+        records = list(CombinedTeledata.objects.all())
+
+        for record in records:
+            record.name_soundex = soundex(record.name)
+            record.first_name_soundex = soundex(record.first_name)
+            record.last_name_soundex = soundex(record.last_name)
+            record.name_normalized = normalize_name(record.name)
+            record.first_name_normalized = normalize_name(record.first_name)
+            record.last_name_normalized = normalize_name(record.last_name)
+
+        CombinedTeledata.objects.bulk_update(records, [
+            'name_soundex',
+            'first_name_soundex',
+            'last_name_soundex',
+            'name_normalized',
+            'first_name_normalized',
+            'last_name_normalized'
+        ], batch_size=1000)
+
+    dependencies = [
+        ('teledata', '0016_staff_employee_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='combinedteledata',
+            name='first_name_normalized',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='combinedteledata',
+            name='first_name_soundex',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='combinedteledata',
+            name='last_name_normalized',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='combinedteledata',
+            name='last_name_soundex',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='combinedteledata',
+            name='name_normalized',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='combinedteledata',
+            name='name_soundex',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.RunPython(
+            forward,
+            reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teledata', '0017_combinedteledata_search_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='combinedteledata',
+            name='dept_id',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='combinedteledata',
+            name='email',
+            field=models.EmailField(blank=True, db_index=True, max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='combinedteledata',
+            name='org_id',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='combinedteledata',
+            name='phone',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+    ]
@@ -2,18 +2,24 @@
 
 
 import logging
+import operator
 
 import re
 
-from django.db import models
-from django.db.models import F, When, Case, Value, Expression
+from contextlib import contextmanager
+from functools import reduce
+from itertools import chain
+
+from django.db import connections, models, transaction
+from django.db.models import F, Q, When, Case, Value, Expression
 from django_mysql.models import QuerySet, QuerySetMixin
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes import fields
 
+from core.utils.phonetics import normalize_name, soundex
 from units.models import Unit
 
 logger = logging.getLogger(__name__)
@@ -73,6 +79,24 @@ class MatchAgainst(Expression):
         self.expressions = expressions
 
 
+def get_field_error(instance):
+    """
+    Returns why an instance can't be saved when one of
+    its values is missing or too long for its column,
+    for instances written in bulk, or None.
+    """
+    for field in instance._meta.concrete_fields:
+        value = getattr(instance, field.attname)
+
+        if value is None:
+            if not field.null and not field.primary_key:
+                return '{0} is required.'.format(field.name)
+        elif field.max_length and len(str(value)) > field.max_length:
+            return '{0} is longer than {1} characters.'.format(field.name, field.max_length)
+
+    return None
+
+
 # Table Models
 
 class Keyword(models.Model):
@@ -266,7 +290,7 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
         if phone_matches:
             queryset = self.phone_match(phone_matches)
         else:
-            queryset = self.general_match(search_query)
+            queryset = self.candidate_match(search_query)
 
         return queryset
 
@@ -287,7 +311,26 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
 
         return CombinedTeledata.objects.filter(phone__endswith=search_query).extra(select = {'score': 30})
 
-    def general_match(self, search_query):
+    @property
+    def supports_fulltext(self) -> bool:
+        """
+        Whether the database can score MATCH() AGAINST().
+        Elsewhere, like the SQLite databases used in
+        development, searches are scored without it.
+        """
+        return connections[self.db].vendor == 'mysql'
+
+    def get_score(self, search_query, keyword_match):
+        """
+        Returns the expression search results are scored
+        and ranked by. Records matching the `keyword_match`
+        Q object score as having the query as a keyword.
+        """
+        # Names are compared against their precomputed
+        # normalized and Soundex columns, which are indexed
+        normalized_query = normalize_name(search_query)
+        query_soundex = soundex(search_query)
+
         match_score = MatchAgainst(
             [
                 F('first_name'),
@@ -307,25 +350,16 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
 
         keyword_score = Case(
             When(
-                keywords_combined__phrase=search_query,
+                keyword_match,
                 then=100
             ),
             default=0,
             output_field=models.DecimalField()
         )
 
-        keyword_like_score = Case(
-            When(
-                keywords_combined__phrase__icontains=search_query,
-                then=30
-            ),
-            default=0,
-            output_field=models.DecimalField()
-        )
-
         full_name_score = Case(
             When(
-                name=search_query,
+                name_normalized=normalized_query,
                 then=15
             ),
             default=0,
@@ -352,7 +386,7 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
 
         first_name_score = Case(
             When(
-                first_name=search_query,
+                first_name_normalized=normalized_query,
                 then=13
             ),
             default=0,
@@ -361,7 +395,7 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
 
         last_name_score = Case(
             When(
-                last_name=search_query,
+                last_name_normalized=normalized_query,
                 then=13
             ),
             default=0,
@@ -370,7 +404,7 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
 
         name_sounds_score = Case(
             When(
-                name__sounds_like=search_query,
+                name_soundex=query_soundex,
                 then=12
             ),
             default=0,
@@ -379,7 +413,7 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
 
         last_name_sounds_score = Case(
             When(
-                last_name__sounds_like=search_query,
+                last_name_soundex=query_soundex,
                 then=8
             ),
             default=0,
@@ -388,7 +422,7 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
 
         first_name_sounds_score = Case(
             When(
-                first_name__sounds_like=search_query,
+                first_name_soundex=query_soundex,
                 then=8
             ),
             default=0,
@@ -431,113 +465,444 @@ class CombinedTeledataManager(models.Manager, QuerySetMixin):
             output_field=models.DecimalField()
         )
 
+        scores = [
+            keyword_score,
+            full_name_score,
+            phone_score,
+            email_score,
+            first_name_score,
+            last_name_score,
+            name_sounds_score,
+            last_name_sounds_score,
+            first_name_sounds_score,
+            department_score,
+            organization_score,
+            department_like_score,
+            organization_like_score
+        ]
+
+        if self.supports_fulltext:
+            scores = [match_score, match_name_score] + scores
+
+        return reduce(operator.add, scores)
+
+    def general_match(self, search_query):
+        """
+        Scores every record. Joining the keywords of each
+        record can return a record more than once. Kept as
+        the reference `candidate_match` is checked against.
+        """
         queryset = self.annotate(
-            score=(
-                match_score +
-                match_name_score +
-                keyword_score +
-                full_name_score +
-                phone_score +
-                email_score +
-                first_name_score +
-                last_name_score +
-                name_sounds_score +
-                last_name_sounds_score +
-                first_name_sounds_score +
-                department_score +
-                organization_score +
-                department_like_score +
-                organization_like_score
-            )
+            score=self.get_score(search_query, Q(keywords_combined__phrase=search_query))
         ).filter(
             score__gt=0
         ).distinct()
 
         return queryset
 
-    def update_data(self):
+    def get_candidate_filter(self, search_query) -> Q:
         """
-        Causes the table to retrieve data from the various
-        aggregate tables
-        """
-        staff = Staff.objects.all()
-        orgs  = Organization.objects.all()
-        depts = Department.objects.all()
-
-        existing = self.all()
-        if existing.count():
-            existing.delete()
-
-        if staff.count():
-            for s in staff:
-                record = CombinedTeledata(
-                    id=s.id,
-                    alpha=s.alpha,
-                    name=s.name,
-                    first_name=s.first_name,
-                    last_name=s.last_name,
-                    sort_name=s.sort_name,
-                    email=s.email,
-                    phone=s.phone,
-                    postal=s.postal,
-                    job_position=s.job_position,
-                    department=s.dept.name,
-                    dept_id=s.dept.id,
-                    organization=s.dept.org.name,
-                    org_id=s.dept.org.id,
-                    building=s.bldg.name,
-                    bldg_id=s.bldg.import_id,
-                    room=s.room,
-                    from_table='staff'
+        Returns a Q object matching every record that can
+        score above zero for a query. Each lookup is a
+        subquery that can use an index, so records are
+        never scored just to find out they don't match,
+        and no IDs are loaded in between.
+        """
+        normalized_query = normalize_name(search_query)
+        query_soundex = soundex(search_query)
+
+        # Department and organization names are copied onto
+        # records, so matching names are found in their much
+        # smaller tables and records are looked up by ID
+        department_ids = Department.objects.filter(name__icontains=search_query).values('pk')
+        organization_ids = Organization.objects.filter(name__icontains=search_query).values('pk')
+
+        lookups = [
+            self.filter(
+                Q(name_normalized=normalized_query) |
+                Q(first_name_normalized=normalized_query) |
+                Q(last_name_normalized=normalized_query)
+            ),
+            self.filter(
+                Q(name_soundex=query_soundex) |
+                Q(first_name_soundex=query_soundex) |
+                Q(last_name_soundex=query_soundex)
+            ),
+            self.filter(Q(phone=search_query) | Q(email=search_query)),
+            self.filter(from_table='staff', dept_id__in=department_ids),
+            self.filter(org_id__in=organization_ids)
+        ]
+
+        if self.supports_fulltext:
+            lookups.append(
+                self.alias(
+                    match=MatchAgainst([F('first_name'), F('last_name')], Value(search_query), models.DecimalField()),
+                    match_name=MatchAgainst([F('name')], Value(search_query), models.DecimalField())
+                ).filter(
+                    Q(match__gt=0) | Q(match_name__gt=0)
                 )
+            )
+
+        return reduce(operator.or_, [Q(pkid__in=x.values('pkid')) for x in lookups])
+
+    def candidate_match(self, search_query):
+        """
+        Scores only the records that can match a query,
+        the same way `general_match` scores every record.
+        Keyword matches are looked up in a subquery, so
+        each record is returned once, with its best score.
+        """
+        keyword_match = Q(pkid__in=self.filter(keywords_combined__phrase=search_query).values('pkid'))
+
+        queryset = self.filter(
+            self.get_candidate_filter(search_query) | keyword_match
+        ).annotate(
+            score=self.get_score(search_query, keyword_match)
+        ).filter(
+            score__gt=0
+        )
+
+        return queryset
+
+    def get_staff_records(self, ids=None):
+        staff = Staff.objects.select_related('dept__org', 'bldg')
+
+        if ids is not None:
+            staff = staff.filter(pk__in=ids)
+
+        for s in staff.iterator():
+            record = CombinedTeledata(
+                id=s.id,
+                alpha=s.alpha,
+                name=s.name,
+                first_name=s.first_name,
+                last_name=s.last_name,
+                sort_name=s.sort_name,
+                email=s.email,
+                phone=s.phone,
+                postal=s.postal,
+                job_position=s.job_position,
+                department=s.dept.name,
+                dept_id=s.dept.id,
+                organization=s.dept.org.name,
+                org_id=s.dept.org.id,
+                building=s.bldg.name,
+                bldg_id=s.bldg.import_id,
+                room=s.room,
+                from_table='staff',
+                active=s.active
+            )
+
+            record.set_search_fields()
+
+            yield record
+
+    def get_organization_records(self, ids=None):
+        orgs = Organization.objects.select_related('bldg')
+
+        if ids is not None:
+            orgs = orgs.filter(pk__in=ids)
+
+        for o in orgs.iterator():
+            record = CombinedTeledata(
+                id=o.id,
+                name=o.name,
+                sort_name=o.name,
+                phone=o.phone,
+                fax=o.fax,
+                building=o.bldg.name,
+                bldg_id=o.bldg.import_id,
+                room=o.room,
+                from_table='organizations',
+                active=o.active
+            )
+
+            record.set_search_fields()
+
+            yield record
+
+    def get_department_records(self, ids=None):
+        depts = Department.objects.select_related('org', 'bldg')
+
+        if ids is not None:
+            depts = depts.filter(pk__in=ids)
+
+        for d in depts.iterator():
+            record = CombinedTeledata(
+                id=d.id,
+                name=d.name,
+                sort_name=d.name,
+                phone=d.phone,
+                fax=d.fax,
+                organization=d.org.name,
+                org_id=d.org.id,
+                building=d.bldg.name,
+                bldg_id=d.bldg.import_id,
+                room=d.room,
+                from_table='departments',
+                active=d.active
+            )
+
+            record.set_search_fields()
+
+            yield record
+
+    def get_keyword_ids(self, ids=None) -> dict:
+        """
+        Returns the IDs of the keywords of every staff,
+        organization and department record, or of the
+        records with the given IDs by from_table, keyed
+        by the record's from_table and ID.
+        """
+        content_types = ContentType.objects.get_for_models(Staff, Organization, Department)
+        from_tables = {
+            content_types[Staff].pk: 'staff',
+            content_types[Organization].pk: 'organizations',
+            content_types[Department].pk: 'departments'
+        }
+
+        retval = {}
+
+        if ids is None:
+            keywords = Keyword.objects.filter(content_type_id__in=from_tables.keys())
+        else:
+            query = Q(pk__in=[])
+
+            for content_type_id, from_table in from_tables.items():
+                query |= Q(content_type_id=content_type_id, object_id__in=ids[from_table])
+
+            keywords = Keyword.objects.filter(query)
+
+        keywords = keywords.values_list('content_type_id', 'object_id', 'pk')
 
-                try:
-                    record.save(doing_import=True)
-                    record.keywords_combined.set(s.keywords.all())
-                except Exception as e:
-                    logger.error(str(e))
-
-        if orgs.count():
-            for o in orgs:
-                record = CombinedTeledata(
-                    id=o.id,
-                    name=o.name,
-                    sort_name=o.name,
-                    phone=o.phone,
-                    fax=o.fax,
-                    building=o.bldg.name,
-                    bldg_id=o.bldg.import_id,
-                    room=o.room,
-                    from_table='organizations'
+        for content_type_id, object_id, pk in keywords:
+            retval.setdefault((from_tables[content_type_id], object_id), []).append(pk)
+
+        return retval
+
+    def is_valid_record(self, record) -> bool:
+        """
+        Returns whether a record can be saved, logging the
+        reason when it can't. Records are written in bulk,
+        so one bad value would otherwise fail the rebuild.
+        """
+        error = get_field_error(record)
+
+        if error:
+            logger.error('Cannot create {0} record {1}. {2}'.format(record.from_table, record.id, error))
+            return False
+
+        return True
+
+    def delete_records(self, pkids=None, batch_size=1000):
+        """
+        Deletes the records with the given IDs, or every
+        record, with explicit DELETE statements, so records
+        are not loaded and no delete signal is sent for each.
+        Their keyword links must be deleted first.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        column = connection.ops.quote_name(self.model._meta.pk.column)
+
+        with connection.cursor() as cursor:
+            if pkids is None:
+                cursor.execute(f"DELETE FROM {table}")
+                return
+
+            pkids = list(pkids)
+
+            for i in range(0, len(pkids), batch_size):
+                batch = pkids[i:i + batch_size]
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(batch))})",
+                    batch
                 )
 
-                try:
-                    record.save(doing_import=True)
-                    record.keywords_combined.set(o.keywords.all())
-                except Exception as e:
-                    logger.error(str(e))
-
-        if depts.count():
-            for d in depts:
-                record = CombinedTeledata(
-                    id=d.id,
-                    name=d.name,
-                    sort_name=d.name,
-                    phone=d.phone,
-                    fax=d.fax,
-                    organization=d.org.name,
-                    org_id=d.org.id,
-                    building=d.bldg.name,
-                    bldg_id=d.bldg.import_id,
-                    room=d.room,
-                    from_table='departments'
+    def update_data(self, batch_size=1000) -> int:
+        """
+        Causes the table to retrieve data from the various
+        aggregate tables. The new records and their keywords
+        replace the old ones in a single transaction, so
+        searches never see a partially populated table.
+        Bulk writes skip model signals, so callers must
+        invalidate anything built from the table. Returns
+        the number of records created.
+        """
+        Through = CombinedTeledata.keywords_combined.through
+
+        keyword_ids = self.get_keyword_ids()
+        pkid = (self.aggregate(max_pkid=models.Max('pkid'))['max_pkid'] or 0) + 1
+
+        records = []
+        keywords_combined = []
+
+        for records_from_table in (
+            self.get_staff_records(),
+            self.get_organization_records(),
+            self.get_department_records()
+        ):
+            for record in records_from_table:
+                if not self.is_valid_record(record):
+                    continue
+
+                # Primary keys are set up front so the keyword
+                # links can be written without reading them back
+                record.pkid = pkid
+                pkid += 1
+                records.append(record)
+
+                keywords_combined.extend(
+                    Through(combinedteledata_id=record.pkid, keyword_id=x)
+                    for x in keyword_ids.get((record.from_table, record.id), [])
                 )
 
-                try:
-                    record.save(doing_import=True)
-                    record.keywords_combined.set(d.keywords.all())
-                except Exception as e:
-                    logger.error(str(e))
+        with transaction.atomic():
+            # Nothing listens for deleted keyword links, so
+            # they are deleted in a single query
+            Through.objects.all().delete()
+            self.delete_records()
+
+            self.bulk_create(records, batch_size=batch_size)
+            Through.objects.bulk_create(keywords_combined, batch_size=batch_size)
+
+        return len(records)
+
+
+    def get_affected_ids(self, staff_ids=(), organization_ids=(), department_ids=(), building_ids=()) -> dict:
+        """
+        Returns the IDs of the records built from the given
+        rows, and from the rows that copy their names, keyed
+        by from_table. Records are looked up in the combined
+        table too, so those of deleted rows are included.
+        """
+        building_import_ids = list(Building.objects.filter(pk__in=building_ids).values_list('import_id', flat=True))
+
+        retval = {
+            'staff': set(staff_ids),
+            'organizations': set(organization_ids),
+            'departments': set(department_ids)
+        }
+
+        retval['staff'].update(
+            Staff.objects.filter(
+                Q(dept_id__in=department_ids) |
+                Q(dept__org_id__in=organization_ids) |
+                Q(bldg_id__in=building_ids)
+            ).values_list('pk', flat=True)
+        )
+
+        retval['departments'].update(
+            Department.objects.filter(
+                Q(org_id__in=organization_ids) |
+                Q(bldg_id__in=building_ids)
+            ).values_list('pk', flat=True)
+        )
+
+        retval['organizations'].update(
+            Organization.objects.filter(bldg_id__in=building_ids).values_list('pk', flat=True)
+        )
+
+        combined = self.filter(
+            Q(from_table='staff', dept_id__in=department_ids) |
+            Q(from_table__in=['staff', 'departments'], org_id__in=organization_ids) |
+            Q(bldg_id__in=building_import_ids)
+        ).values_list('from_table', 'id')
+
+        for from_table, pk in combined:
+            retval[from_table].add(pk)
+
+        return retval
+
+    def sync_records(self, staff_ids=(), organization_ids=(), department_ids=(), building_ids=(), batch_size=1000) -> dict:
+        """
+        Brings the records built from the given rows up to
+        date without rebuilding the table. Records of rows
+        that copy a changed name, like the staff of a renamed
+        department, are updated too, and records of deleted
+        rows are removed. Only records and keyword links that
+        changed are written. Returns the number of records
+        created, updated and deleted.
+        """
+        Through = CombinedTeledata.keywords_combined.through
+
+        ids = self.get_affected_ids(staff_ids, organization_ids, department_ids, building_ids)
+
+        if not any(ids.values()):
+            return {'created': 0, 'updated': 0, 'deleted': 0}
+
+        records = [
+            x for x in chain(
+                self.get_staff_records(ids['staff']),
+                self.get_organization_records(ids['organizations']),
+                self.get_department_records(ids['departments'])
+            )
+            if self.is_valid_record(x)
+        ]
+
+        existing = {}
+        deleted = []
+
+        for record in self.filter(
+            Q(from_table='staff', id__in=ids['staff']) |
+            Q(from_table='organizations', id__in=ids['organizations']) |
+            Q(from_table='departments', id__in=ids['departments'])
+        ).order_by('pkid'):
+            key = (record.from_table, record.id)
+
+            # Only one record is kept per row
+            if key in existing:
+                deleted.append(record.pkid)
+            else:
+                existing[key] = record
+
+        fields = [x.attname for x in self.model._meta.concrete_fields if not x.primary_key]
+        pkid = (self.aggregate(max_pkid=models.Max('pkid'))['max_pkid'] or 0) + 1
+        created = []
+        updated = []
+
+        for record in records:
+            current = existing.pop((record.from_table, record.id), None)
+
+            if current is None:
+                record.pkid = pkid
+                pkid += 1
+                created.append(record)
+            else:
+                record.pkid = current.pkid
+
+                if any(getattr(record, x) != getattr(current, x) for x in fields):
+                    updated.append(record)
+
+        # Whatever is left no longer has a row to be built from
+        deleted.extend(x.pkid for x in existing.values())
+
+        keyword_ids = self.get_keyword_ids(ids)
+        links = set(
+            (record.pkid, x)
+            for record in records
+            for x in keyword_ids.get((record.from_table, record.id), [])
+        )
+
+        existing_links = {
+            (x[1], x[2]): x[0] for x in Through.objects.filter(
+                combinedteledata_id__in=[x.pkid for x in records] + deleted
+            ).values_list('pk', 'combinedteledata_id', 'keyword_id')
+        }
+
+        with transaction.atomic():
+            Through.objects.filter(pk__in=[pk for key, pk in existing_links.items() if key not in links]).delete()
+            self.delete_records(deleted, batch_size=batch_size)
+
+            self.bulk_create(created, batch_size=batch_size)
+            self.bulk_update(updated, fields, batch_size=batch_size)
+
+            Through.objects.bulk_create([
+                Through(combinedteledata_id=x[0], keyword_id=x[1])
+                for x in links if x not in existing_links
+            ], batch_size=batch_size)
+
+        return {'created': len(created), 'updated': len(updated), 'deleted': len(deleted)}
 
 
 class CombinedTeledata(models.Model):
@@ -549,19 +914,25 @@ class CombinedTeledata(models.Model):
     first_name = models.CharField(max_length=14, null=True, blank=True)
     last_name = models.CharField(max_length=25, null=True, blank=True)
     sort_name = models.CharField(max_length=255, null=False, blank=False)
-    email = models.EmailField(max_length=50, null=True, blank=True)
-    phone = models.CharField(max_length=255, null=True, blank=True)
+    email = models.EmailField(max_length=50, null=True, blank=True, db_index=True)
+    phone = models.CharField(max_length=255, null=True, blank=True, db_index=True)
     fax = models.CharField(max_length=255, null=True, blank=True)
     postal = models.CharField(max_length=10, null=True, blank=True)
     job_position = models.CharField(max_length=100, null=True, blank=True)
     department = models.CharField(max_length=255, null=True, blank=True)
-    dept_id = models.IntegerField(null=True, blank=True)
+    dept_id = models.IntegerField(null=True, blank=True, db_index=True)
     organization = models.CharField(max_length=255, null=True, blank=True)
-    org_id = models.IntegerField(null=True, blank=True)
+    org_id = models.IntegerField(null=True, blank=True, db_index=True)
     building = models.CharField(max_length=255, null=True, blank=True)
     bldg_id = models.IntegerField(null=True, blank=True)
     room = models.CharField(max_length=255, null=True, blank=True)
     from_table = models.CharField(max_length=255, null=False, blank=False)
+    name_soundex = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    first_name_soundex = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    last_name_soundex = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    name_normalized = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    first_name_normalized = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    last_name_normalized = models.CharField(max_length=255, null=True, blank=True, db_index=True)
     keywords_combined = models.ManyToManyField(Keyword, related_name='combined', db_constraint=False)
     active = models.BooleanField(default=True)
     objects = CombinedTeledataManager()
@@ -572,12 +943,26 @@ class CombinedTeledata(models.Model):
     def __str__(self):
         return self.name
 
+    def set_search_fields(self):
+        """
+        Fills the phonetic and normalized name columns
+        searches compare against, so they don't have to
+        be computed for every row of every search.
+        """
+        self.name_soundex = soundex(self.name)
+        self.first_name_soundex = soundex(self.first_name)
+        self.last_name_soundex = soundex(self.last_name)
+        self.name_normalized = normalize_name(self.name)
+        self.first_name_normalized = normalize_name(self.first_name)
+        self.last_name_normalized = normalize_name(self.last_name)
+
     def save(self, doing_import=False):
         """
         Prevent saving on the model unless the
         doing_import parameter is True
         """
         if doing_import:
+            self.set_search_fields()
             super(CombinedTeledata, self).save()
         else:
             raise NotImplementedError(message="Saving is not possible on this method unless importing.")
@@ -593,34 +978,50 @@ class CombinedTeledata(models.Model):
             raise NotImplementedError(message="Deleting is not possible on this method unless importing.")
 
 
+sync_arguments = {
+    Building: 'building_ids',
+    Organization: 'organization_ids',
+    Department: 'department_ids',
+    Staff: 'staff_ids'
+}
+
+
+@receiver(post_save, sender=Building)
+@receiver(post_delete, sender=Building)
 @receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
 @receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
 @receiver(post_save, sender=Staff)
-def maybe_update_combined_teledata(sender, instance=None, created=False, **kwargs):
+@receiver(post_delete, sender=Staff)
+def sync_combined_teledata(sender, instance=None, raw=False, **kwargs):
     """
-    Updates a corresponding CombinedTeledata object when
-    an Organization, Department or Staff object's
-    'active' flag is modified.
+    Updates the CombinedTeledata objects built from a
+    Building, Organization, Department or Staff object
+    whenever it is saved or deleted.
     """
-    if not created:
-        from_table = ''
-        if sender == Organization:
-            from_table = 'organizations'
-        elif sender == Department:
-            from_table = 'departments'
-        elif sender == Staff:
-            from_table = 'staff'
+    if raw:
+        return
 
-        try:
-            combined = CombinedTeledata.objects.get(
-                id=instance.pk,
-                from_table=from_table
-            )
-            if combined.active != instance.active:
-                combined.active = instance.active
-                combined.save(doing_import=True)
-        except (
-            CombinedTeledata.MultipleObjectsReturned,
-            CombinedTeledata.DoesNotExist
-        ):
-            pass
+    CombinedTeledata.objects.sync_records(**{sync_arguments[sender]: [instance.pk]})
+
+
+@contextmanager
+def deferred_sync():
+    """
+    Disconnects `sync_combined_teledata` for the duration of
+    the block, for imports that save many rows and sync the
+    CombinedTeledata objects they touched afterwards.
+    """
+    signals = (post_save, post_delete)
+
+    for signal in signals:
+        for sender in sync_arguments:
+            signal.disconnect(sync_combined_teledata, sender=sender)
+
+    try:
+        yield
+    finally:
+        for signal in signals:
+            for sender in sync_arguments:
+                signal.connect(sync_combined_teledata, sender=sender)
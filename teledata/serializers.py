@@ -122,3 +122,14 @@ class CombinedTeledataSerializer(serializers.ModelSerializer):
             'active'
         )
         model = CombinedTeledata
+
+
+class CombinedTeledataListSerializer(CombinedTeledataSerializer):
+    """
+    Serializes combined records listed without a
+    search, which have no score.
+    """
+    score = None
+
+    class Meta(CombinedTeledataSerializer.Meta):
+        fields = tuple(x for x in CombinedTeledataSerializer.Meta.fields if x != 'score')
@@ -1,6 +1,282 @@
 # -*- coding: utf-8 -*-
 
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from core.utils.benchmark_data import BenchmarkDataGenerator
+from teledata.models import *
+
+
+class TeledataTestMixin(object):
+    def setUp(self):
+        self.building = Building.objects.create(name='Millican Hall', abbr='MH', import_id=1)
+        self.org = Organization.objects.create(name='Student Affairs', bldg=self.building, phone='407-823-1000')
+        self.dept = Department.objects.create(name='Housing', org=self.org, bldg=self.building, phone='407-823-2000')
+
+    def create_staff(self, count, **kwargs):
+        return [
+            Staff.objects.create(
+                first_name='Alex',
+                last_name=f'Smith{i}',
+                dept=self.dept,
+                bldg=self.building,
+                email=f'alex.smith{i}@ucf.edu',
+                **kwargs
+            )
+            for i in range(count)
+        ]
+
+
+class CombinedTeledataRebuildTests(TeledataTestMixin, TestCase):
+    def test_update_data(self):
+        staff = self.create_staff(2)
+        inactive = self.create_staff(1, active=False)[0]
+
+        keyword = Keyword(phrase='dorms', content_object=self.dept)
+        keyword.save()
+
+        self.assertEqual(CombinedTeledata.objects.update_data(), 5)
+
+        record = CombinedTeledata.objects.get(from_table='staff', id=staff[0].pk)
+        self.assertEqual(record.name, 'Alex Smith0')
+        self.assertEqual(record.sort_name, 'Smith0 Alex')
+        self.assertEqual(record.department, 'Housing')
+        self.assertEqual(record.organization, 'Student Affairs')
+        self.assertEqual(record.building, 'Millican Hall')
+        self.assertEqual(record.bldg_id, 1)
+        self.assertEqual(record.first_name_soundex, 'A420')
+        self.assertEqual(record.last_name_normalized, 'smith0')
+        self.assertFalse(CombinedTeledata.objects.get(from_table='staff', id=inactive.pk).active)
+
+        department = CombinedTeledata.objects.get(from_table='departments', id=self.dept.pk)
+        self.assertEqual(list(department.keywords_combined.all()), [keyword])
+
+        # Rebuilding replaces the records rather than adding to them
+        self.dept.name = 'Housing and Residence Life'
+        self.dept.save()
+        CombinedTeledata.objects.update_data()
+
+        self.assertEqual(CombinedTeledata.objects.count(), 5)
+        self.assertEqual(
+            CombinedTeledata.objects.get(from_table='staff', id=staff[0].pk).department,
+            'Housing and Residence Life'
+        )
+        department = CombinedTeledata.objects.get(from_table='departments', id=self.dept.pk)
+        self.assertEqual(list(department.keywords_combined.all()), [keyword])
+        self.assertEqual(CombinedTeledata.keywords_combined.through.objects.count(), 1)
+
+    def test_invalid_records_skipped(self):
+        self.create_staff(1)
+        Staff.objects.create(first_name='Sam', last_name='Jones', dept=self.dept, bldg=self.building, email=f"{'x' * 50}@ucf.edu")
+
+        with self.assertLogs('teledata.models', level='ERROR'):
+            self.assertEqual(CombinedTeledata.objects.update_data(), 3)
+
+        self.assertFalse(CombinedTeledata.objects.filter(last_name='Jones').exists())
+
+    def test_query_count_is_constant(self):
+        self.create_staff(2)
+
+        with CaptureQueriesContext(connection) as small:
+            CombinedTeledata.objects.update_data()
+
+        self.create_staff(20)
+
+        with CaptureQueriesContext(connection) as large:
+            CombinedTeledata.objects.update_data()
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+class CombinedTeledataSyncTests(TeledataTestMixin, TestCase):
+    def get_record(self, instance, from_table='staff'):
+        return CombinedTeledata.objects.get(from_table=from_table, id=instance.pk)
+
+    def test_sync_on_save(self):
+        staff = self.create_staff(2)
+        CombinedTeledata.objects.update_data()
+        pkids = set(CombinedTeledata.objects.values_list('pkid', flat=True))
+
+        staff[0].phone = '407-823-3000'
+        staff[0].active = False
+        staff[0].save()
+
+        record = self.get_record(staff[0])
+        self.assertEqual(record.phone, '407-823-3000')
+        self.assertFalse(record.active)
+
+        # Renames cascade to the records that copy the name
+        self.dept.name = 'Residence Life'
+        self.dept.save()
+        self.building.name = 'Trevor Colbourn Hall'
+        self.building.save()
+
+        self.assertEqual(self.get_record(self.dept, 'departments').name, 'Residence Life')
+        self.assertEqual(set(x.department for x in CombinedTeledata.objects.filter(from_table='staff')), {'Residence Life'})
+        self.assertEqual(set(CombinedTeledata.objects.values_list('building', flat=True)), {'Trevor Colbourn Hall'})
+        self.assertEqual(set(CombinedTeledata.objects.values_list('pkid', flat=True)), pkids)
+
+    def test_sync_created_and_deleted(self):
+        staff = self.create_staff(2)
+        CombinedTeledata.objects.update_data()
+
+        keyword = Keyword(phrase='resident assistant', content_object=staff[0])
+        keyword.save()
+
+        created = self.create_staff(1)[0]
+        self.assertEqual(self.get_record(created).name, 'Alex Smith0')
+
+        staff[0].first_name = 'Alexis'
+        staff[0].save()
+
+        record = self.get_record(staff[0])
+        self.assertEqual(record.name, 'Alexis Smith0')
+        self.assertEqual(record.name_normalized, 'alexis smith0')
+        self.assertEqual(list(record.keywords_combined.all()), [keyword])
+
+        staff[1].delete()
+        self.assertFalse(CombinedTeledata.objects.filter(from_table='staff', id=staff[1].pk).exists())
+
+        # Deleting an organization removes its departments and staff
+        self.org.delete()
+        self.assertFalse(CombinedTeledata.objects.exists())
+        self.assertFalse(CombinedTeledata.keywords_combined.through.objects.exists())
+
+    def test_deferred_sync(self):
+        staff = self.create_staff(2)
+        CombinedTeledata.objects.update_data()
+
+        with deferred_sync():
+            for x in staff:
+                x.last_name = 'Jones'
+                x.save()
+
+            self.assertEqual(self.get_record(staff[0]).last_name, 'Smith0')
+
+        self.assertEqual(
+            CombinedTeledata.objects.sync_records(staff_ids=[x.pk for x in staff]),
+            {'created': 0, 'updated': 2, 'deleted': 0}
+        )
+        self.assertEqual(self.get_record(staff[0]).last_name, 'Jones')
+
+        # Signals are reconnected after the block
+        staff[0].last_name = 'Lee'
+        staff[0].save()
+        self.assertEqual(self.get_record(staff[0]).last_name, 'Lee')
+        self.assertEqual(CombinedTeledata.objects.sync_records(staff_ids=[x.pk for x in staff]), {'created': 0, 'updated': 0, 'deleted': 0})
+
+
+class CombinedTeledataListTests(TestCase):
+    def test_cursor_walks_every_record_once(self):
+        # `id` repeats across source tables and can be empty
+        records = [
+            CombinedTeledata(id=pk, name=name, sort_name=name, from_table=from_table)
+            for pk, name, from_table in [
+                (1, 'Alex Smith', 'staff'),
+                (1, 'Housing', 'departments'),
+                (None, 'Student Affairs', 'organizations'),
+                (1, 'Sam Lee', 'staff')
+            ]
+        ]
+
+        CombinedTeledata.objects.bulk_create(records)
+
+        url = reverse('api.teledata.combined.list')
+        page = self.client.get(url, {'cursor': '', 'limit': 1}).json()
+        seen = []
+
+        while True:
+            seen += [x['name'] for x in page['results']]
+
+            if not page['next']:
+                break
+
+            page = self.client.get(page['next']).json()
+
+        self.assertEqual(seen, [x.name for x in records])
+        self.assertNotIn('score', page['results'][0])
+
+
+class CombinedTeledataSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        BenchmarkDataGenerator(seed=1, scale=0.01).generate_teledata()
+
+        cls.staff = CombinedTeledata.objects.filter(from_table='staff').order_by('pkid').first()
+        cls.department = CombinedTeledata.objects.filter(from_table='departments').order_by('pkid').first()
+        cls.keyword = Keyword.objects.order_by('pk').first()
+
+    def get_scores(self, queryset) -> dict:
+        """
+        Returns the best score of each record. The reference
+        scorer can return a record once per keyword.
+        """
+        retval = {}
+
+        for pkid, score in queryset.values_list('pkid', 'score'):
+            retval[pkid] = max(score, retval.get(pkid, score))
+
+        return retval
+
+    def assertSameResults(self, search_query):
+        expected = self.get_scores(CombinedTeledata.objects.general_match(search_query))
+        actual = self.get_scores(CombinedTeledata.objects.candidate_match(search_query))
+
+        self.assertEqual(actual, expected, search_query)
+
+        return actual
+
+    def test_search_parity(self):
+        queries = [
+            self.staff.name,
+            self.staff.first_name.upper(),
+            self.staff.last_name,
+            'Smyth',
+            'Jonson',
+            self.staff.email,
+            self.staff.phone,
+            self.department.name,
+            self.department.name[:5].lower(),
+            self.department.organization,
+            self.keyword.phrase,
+            'Building',
+            'Qwxq'
+        ]
+
+        for query in queries:
+            self.assertSameResults(query)
+
+        self.assertEqual(self.assertSameResults('Qwxq'), {})
+        self.assertIn(self.staff.pkid, self.assertSameResults(self.staff.last_name))
+        self.assertGreater(len(self.assertSameResults(self.department.name[:5].lower())), 1)
+
+    def test_keyword_results_not_duplicated(self):
+        department = CombinedTeledata.objects.get(from_table='departments', id=self.keyword.object_id)
+        other = Keyword(phrase='another keyword', content_object=Department.objects.get(pk=department.id))
+        other.save()
+
+        results = list(CombinedTeledata.objects.candidate_match(self.keyword.phrase).values_list('pkid', 'score'))
+
+        self.assertEqual([x[0] for x in results].count(department.pkid), 1)
+        self.assertGreaterEqual(dict(results)[department.pkid], 100)
+
+    def test_candidates_are_indexed_lookups(self):
+        candidates = CombinedTeledata.objects.filter(
+            CombinedTeledata.objects.get_candidate_filter(self.staff.last_name)
+        ).values_list('pkid', flat=True)
+
+        self.assertLess(len(candidates), CombinedTeledata.objects.count())
+        self.assertIn(self.staff.pkid, candidates)
+
+    def test_search_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            list(CombinedTeledata.objects.candidate_match(self.staff.last_name))
+
+    def test_search_view(self):
+        response = self.client.get(reverse('api.teledata.search'), {'search': self.staff.last_name})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.staff.name, [x['name'] for x in response.json()['results']])
@@ -7,6 +7,10 @@ urlpatterns = [
         CombinedTeledataSearchView.as_view(),
         name='api.teledata.search'
         ),
+    url(r'^combined/$',
+        CombinedTeledataListView.as_view(),
+        name='api.teledata.combined.list'
+        ),
     url(r'^buildings/$',
         BuildingListView.as_view(),
         name='api.teledata.buildings.list'
@@ -12,6 +12,7 @@ from teledata.models import *
 from teledata.serializers import *
 from teledata.filters import *
 from teledata.pagination import BackwardsCompatiblePagination
+from core.pagination import KeysetPagination
 
 from rest_framework.filters import OrderingFilter
 
@@ -49,15 +50,25 @@ class OrganizationListView(generics.ListAPIView):
 class StaffListView(generics.ListAPIView):
     queryset = Staff.objects.all()
     serializer_class = StaffSerializer
+    pagination_class = KeysetPagination
 
 
 class CombinedTeledataListView(generics.ListAPIView):
+    """
+    Lists every combined record. `id` repeats across
+    source tables and can be empty, so cursors are
+    keyed by `pkid`.
+    """
     queryset = CombinedTeledata.objects.all()
-    serializer_class = CombinedTeledataSerializer
+    serializer_class = CombinedTeledataListSerializer
+    filter_class = CombinedTeledataFilter
+    filter_backends = [DjangoFilterBackend]
+    pagination_class = KeysetPagination
+    keyset_field = 'pkid'
 
 
 class CombinedTeledataSearchView(CombinedTeledataListView):
-    filter_class = CombinedTeledataFilter
+    serializer_class = CombinedTeledataSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     pagination_class = BackwardsCompatiblePagination
     ordering_fields = ['id', 'score', 'sort_name']